@@ -1,44 +1,61 @@
 import os
-import requests
-import multiprocessing # 🟢 থ্রেডিং বাদ দিয়ে মাল্টিপ্রসেসিং
-from flask import Flask, request, render_template
+import time
+import signal
+import _thread
+import threading
+from flask import Flask, request, render_template, jsonify, Response
 
-# বটের রানার ফাংশন ইমপোর্ট
-# নোট: আমরা শুধু রানার ফাংশন ইমপোর্ট করব, গ্লোবাল কিউ নয়
-from bots.ai_bot import run_bot as run_ai_bot, TOKEN as AI_TOKEN
-from bots.test_bot import run_bot as run_test_bot, TOKEN as TEST_TOKEN
-from bots.info_bot import run_bot as run_info_bot, TOKEN as INFO_TOKEN
+from ingress import BotIngress, RETRY_AFTER
+from supervisor import WorkerSupervisor
+import metrics
+
+# নোট: এখানে কোনো বটের কোড ইমপোর্ট হয় না; বটের তালিকা bots.json এ থাকে
+# এবং প্রতিটি বটের মডিউল শুধু তার নিজের ওয়ার্কার প্রসেসে লোড হয়
+from registry import load_registry
+from webhook_setup import sync_webhooks, WEBHOOK_SECRET
 
 # সার্ভার কনফিগারেশন
-MY_SERVER_URL = "https://heavy-ztum.onrender.com"
+MY_SERVER_URL = os.getenv("SERVER_URL", "https://heavy-ztum.onrender.com")
+# /scale এন্ডপয়েন্টের জন্য গোপন টোকেন (না থাকলে এন্ডপয়েন্ট বন্ধ)
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
 
 app = Flask(__name__)
 
 # এই ডিকশনারিটি প্রসেসগুলোর কিউ (Queue) মনে রাখবে
 PROCESS_QUEUES = {}
 
-def set_webhook(token):
-    """ওয়েব হুক সেট করার ফাংশন"""
-    if MY_SERVER_URL and "http" in MY_SERVER_URL:
-        url = f"{MY_SERVER_URL}/{token}"
-        try:
-            requests.get(f"https://api.telegram.org/bot{token}/setWebhook?url={url}")
-            print(f"✅ Webhook set for: ...{token[-5:]}")
-        except Exception as e:
-            print(f"❌ Webhook failed: {e}")
+# বট প্রসেসগুলো ক্র্যাশ/আটকে গেলে রিস্টার্ট করবে
+SUPERVISOR = WorkerSupervisor()
+
+# শাটডাউন একবারই চলে; দ্বিতীয় সিগন্যাল এলে অপেক্ষা না করে বন্ধ হয়
+_SHUTTING_DOWN = threading.Event()
 
 # --- ডাইনামিক ওয়েব হুক রাউট ---
 @app.route('/<token>', methods=['POST'])
 def global_webhook(token):
+    received = time.time()
+    # WEBHOOK_SECRET থাকলে শুধু টেলিগ্রামের পাঠানো রিকোয়েস্ট গ্রহণ করা হয়
+    if WEBHOOK_SECRET and request.headers.get("X-Telegram-Bot-Api-Secret-Token") != WEBHOOK_SECRET:
+        return "Forbidden", 403
     # চেক করি এই টোকেনটি আমাদের কোনো প্রসেসের সাথে যুক্ত কিনা
     if token in PROCESS_QUEUES:
         try:
-            # খুব দ্রুত ডেটা রিসিভ করে কিউতে ফেলে দেওয়া হয়
-            # Flask এখানে ১ মিলিসেকেন্ডও দেরি করবে না
-            json_update = request.get_json(force=True)
-            target_queue = PROCESS_QUEUES[token]
-            target_queue.put(json_update)
-            
+            # JSON ডিকোড না করেই কাঁচা বাইট কিউতে ফেলে দেওয়া হয়
+            # পার্সিং একবারই হবে, বটের প্রসেসে (orjson দিয়ে)
+            raw_update = request.get_data(cache=False)
+            if not raw_update:
+                return "Empty Update", 400
+            ingress = PROCESS_QUEUES[token]
+            if ingress.closed:
+                # শাটডাউন চলছে: টেলিগ্রাম আপডেটটি পরে (নতুন ইনস্ট্যান্সে) আবার পাঠাবে
+                return "Shutting Down", 503, {"Retry-After": str(RETRY_AFTER)}
+            # আবার পাঠানো (ডুপ্লিকেট) আপডেট কিউতে না দিয়েই 200 পায়; ইনগ্রেস লগ চালু থাকলে
+            # offer() লগে লেখা শেষ করে তবেই ফেরে, লিখতে না পারলে 500 পেয়ে টেলিগ্রাম আবার পাঠায়
+            if not ingress.offer(raw_update, received):
+                # কিউ ভর্তি: টেলিগ্রাম 503 পেলে পরে আবার পাঠাবে
+                print(f"⚠️ {ingress.name} queue full, asking Telegram to retry")
+                return "Queue Full", 503, {"Retry-After": str(RETRY_AFTER)}
+
             return "OK", 200
         except Exception as e:
             print(f"Webhook Error: {e}")
@@ -46,43 +63,109 @@ def global_webhook(token):
     else:
         return "Unknown Bot Token", 404
 
+@app.route('/queues')
+def queue_stats():
+    """প্রতিটি বটের কিউ কতটা ভর্তি এবং কতগুলো আপডেট ফেরত দেওয়া হয়েছে"""
+    return jsonify({ingress.name: ingress.stats() for ingress in PROCESS_QUEUES.values()})
+
+@app.route('/workers')
+def worker_stats():
+    """প্রতিটি বটের ওয়ার্কার প্রসেসগুলোর আপটাইম, রিস্টার্ট সংখ্যা ও হার্টবিট"""
+    return jsonify({ingress.name: ingress.worker_stats() for ingress in PROCESS_QUEUES.values()})
+
+@app.route('/metrics')
+def metrics_export():
+    """সব বট ও তাদের সব ওয়ার্কারের মেট্রিক্স একসাথে (Prometheus টেক্সট ফরম্যাট)"""
+    return Response(metrics.render(PROCESS_QUEUES.values()), mimetype="text/plain; version=0.0.4")
+
+@app.route('/scale/<name>', methods=['POST'])
+def scale_workers(name):
+    """একটি বটের ওয়ার্কার সংখ্যা বদলায় (?count=N); সুপারভাইজার কয়েক সেকেন্ডের মধ্যে কার্যকর করে"""
+    if not ADMIN_TOKEN or request.headers.get("X-Admin-Token") != ADMIN_TOKEN:
+        return "Forbidden", 403
+    ingress = next((item for item in PROCESS_QUEUES.values() if item.name == name), None)
+    if ingress is None:
+        return "Unknown Bot", 404
+    count = request.args.get("count", type=int)
+    if not count:
+        return "Missing count", 400
+    return jsonify({"desired": ingress.scale(count), "max": ingress.max_workers})
+
 @app.route('/')
 def home():
     return render_template('home.html')
 
-def start_process(target_func, token, name):
-    """একটি সম্পূর্ণ আলাদা প্রসেস তৈরি করার ফাংশন"""
-    # ১. এই প্রসেসের জন্য একটি আলাদা কিউ তৈরি
-    queue = multiprocessing.Queue()
+def start_process(target_func, token, name, workers=None):
+    """বটের জন্য এক বা একাধিক সম্পূর্ণ আলাদা প্রসেস তৈরি করার ফাংশন"""
+    # ১. প্রতিটি ওয়ার্কারের জন্য আলাদা সীমিত কিউ তৈরি (BOT_QUEUE_DEPTH),
+    #    আপডেট chat_id অনুযায়ী ওয়ার্কারে ভাগ হবে
+    ingress = BotIngress(name, workers=workers)
     
     # ২. গ্লোবাল ম্যাপে রাখা (যাতে Flask খুঁজে পায়)
-    PROCESS_QUEUES[token] = queue
+    PROCESS_QUEUES[token] = ingress
     
-    # ৩. প্রসেস স্টার্ট করা (আর্গুমেন্ট হিসেবে কিউ পাঠানো হচ্ছে)
-    p = multiprocessing.Process(target=target_func, args=(queue,), name=name)
-    p.start()
-    return p
+    # ৩. প্রসেস স্টার্ট করা (সুপারভাইজার কিউ ও হেলথ প্রোব পাঠায় এবং নজর রাখে)
+    return SUPERVISOR.add(target_func, ingress)
+
+def boot():
+    """
+    বট প্রসেসগুলো চালু করে এবং ওয়েব হুক সেট করে।
+    gunicorn এ wsgi.py থেকে (preload_app) মাস্টার প্রসেসে একবারই কল হয়,
+    ফলে সব ওয়েব ওয়ার্কার একই কিউগুলো উত্তরাধিকার সূত্রে পায়।
+    """
+    print("🚀 Starting Multiprocess Bot System...")
 
-if __name__ == "__main__":
-    # Flask এর রিলোডার সমস্যা এড়াতে মেইন ব্লকে রাখা জরুরি
-    PORT = int(os.environ.get("PORT", "8080"))
+    # ১. bots.json থেকে বটের তালিকা পড়া
+    bots = load_registry()
 
-    print("🚀 Starting Multiprocess Bot System...")
+    # ২. প্রতিটি বটের প্রসেস চালু (টোকেন না থাকলে প্রসেসই তৈরি হয় না)
+    started = []
+    for bot in bots:
+        if not bot.token:
+            print(f"❌ {bot.name}: {bot.token_env} missing, skipped")
+            continue
+        start_process(bot.target, bot.token, bot.name, bot.workers)
+        started.append(bot)
+
+    # ৩. ওয়েব হুক যাচাই (সব বট একসাথে); শুধু বদলালে আবার সেট করা হয়
+    if MY_SERVER_URL and "http" in MY_SERVER_URL:
+        sync_webhooks(MY_SERVER_URL, started)
+
+    # ৪. ক্র্যাশ/আটকে যাওয়া ওয়ার্কার রিস্টার্টের জন্য সুপারভাইজার চালু
+    SUPERVISOR.start()
+
+def begin_shutdown(then):
+    """
+    SIGTERM এ কল হয়: আলাদা থ্রেডে বটগুলো ড্রেন করে (ওয়েব হুক ততক্ষণ 503 দেয়),
+    তারপর then() দিয়ে ওয়েব সার্ভারকে বন্ধ হতে দেয়।
+    সিগন্যাল হ্যান্ডলার থেকেই কল করা যায়, কারণ নিজে কখনো ব্লক করে না।
+    """
+    if _SHUTTING_DOWN.is_set():
+        then()
+        return
+    _SHUTTING_DOWN.set()
+
+    def drain():
+        print("🛑 Shutdown requested, draining bot workers...")
+        try:
+            SUPERVISOR.shutdown()
+        except Exception as e:
+            print(f"Shutdown Error: {e}")
+        then()
 
-    # ১. AI Bot প্রসেস চালু
-    start_process(run_ai_bot, AI_TOKEN, "AI_Bot_Process")
+    threading.Thread(target=drain, name="Shutdown").start()
 
-    # ২. Test Bot প্রসেস চালু
-    start_process(run_test_bot, TEST_TOKEN, "Test_Bot_Process")
+if __name__ == "__main__":
+    # Flask এর রিলোডার সমস্যা এড়াতে মেইন ব্লকে রাখা জরুরি
+    # (লোকাল ডেভেলপমেন্টের জন্য; প্রোডাকশনে: gunicorn -c gunicorn.conf.py)
+    PORT = int(os.environ.get("PORT", "8080"))
 
-    # ৩. Info Bot প্রসেস চালু
-    start_process(run_info_bot, INFO_TOKEN, "Info_Bot_Process")
+    boot()
 
-    # ৪. ওয়েব হুক সেট করা
-    set_webhook(AI_TOKEN)
-    set_webhook(TEST_TOKEN)
-    set_webhook(INFO_TOKEN)
+    # Ctrl+C বা SIGTERM এ বট ড্রেন হওয়ার পর সার্ভার বন্ধ হয়
+    # (gunicorn এ একই কাজ gunicorn.conf.py এর when_ready হুক করে)
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(sig, lambda *_: begin_shutdown(_thread.interrupt_main))
 
     # ৫. সার্ভার রান
-    app.run(host="0.0.0.0", port=PORT)
-
+    app.run(host="0.0.0.0", port=PORT, threaded=True)
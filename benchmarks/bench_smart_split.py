@@ -0,0 +1,95 @@
+"""
+smart_split মাইক্রো-বেঞ্চমার্ক।
+
+মডেলের আসল উত্তরের মাপে (কয়েক KB থেকে ৫০KB) HTML ও সাধারণ লেখায় নতুন
+সিঙ্গেল-পাস স্প্লিটার এবং পুরনো (স্লাইস করে বারবার গোনা) ইমপ্লিমেন্টেশনের
+সময় তুলনা করে।
+
+চালানো:  python -m benchmarks.bench_smart_split [--sizes 4 20 50]
+"""
+import argparse
+import random
+import time
+
+from bots.text_split import smart_split, utf16_len
+
+
+def legacy_smart_split(text, max_len=4000):
+    """তুলনার জন্য আগের ইমপ্লিমেন্টেশন (হুবহু)"""
+    if len(text) <= max_len:
+        return [text]
+    chunks = []
+    while text:
+        if len(text) <= max_len:
+            chunks.append(text)
+            break
+        split_at = text.rfind('\n', 0, max_len)
+        if split_at == -1: split_at = text.rfind(' ', 0, max_len)
+        if split_at == -1: split_at = max_len
+        chunk = text[:split_at]
+        remaining = text[split_at:]
+        if chunk.count('<pre>') > chunk.count('</pre>'):
+            chunk += "</pre>"
+            remaining = "<pre>" + remaining
+        elif chunk.count('<code>') > chunk.count('</code>'):
+            chunk += "</code>"
+            remaining = "<code>" + remaining
+        chunks.append(chunk)
+        text = remaining
+    return chunks
+
+
+_FRAGMENTS = [
+    "The quick brown fox jumps over the lazy dog.",
+    "আমি বাংলায় উত্তর দিচ্ছি, এটি একটি পরীক্ষামূলক বাক্য।",
+    "<b>Important:</b> read the <i>whole</i> answer carefully.",
+    '<a href="https://example.com/docs">documentation link</a>',
+    "Emoji test 😀🚀🎉 with &amp; entities &lt;tag&gt;.",
+    "<pre><code>def hello():\n    return 'world'\n</code></pre>",
+    "\n",
+    "\n\n",
+]
+
+
+def make_model_output(size_kb, seed=42, plain=False):
+    rng = random.Random(seed)
+    fragments = [f for f in _FRAGMENTS if "<" not in f and "&" not in f] if plain else _FRAGMENTS
+    parts = []
+    total = 0
+    target = size_kb * 1024
+    while total < target:
+        fragment = rng.choice(fragments)
+        parts.append(fragment)
+        total += len(fragment)
+    return " ".join(parts)
+
+
+def _time(func, repeat):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = list(func())
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[4, 20, 50], help="লেখার আকার (KB)")
+    parser.add_argument("--max-len", type=int, default=4000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'size':>8} {'kind':>6} {'new (ms)':>10} {'legacy (ms)':>12} {'chunks':>7} {'max utf16':>10}")
+    for size in args.sizes:
+        for kind in ("html", "plain"):
+            text = make_model_output(size, plain=kind == "plain")
+            new_time, chunks = _time(lambda: smart_split(text, args.max_len), args.repeat)
+            old_time, _ = _time(lambda: legacy_smart_split(text, args.max_len), args.repeat)
+            longest = max(utf16_len(chunk) for chunk in chunks)
+            print(f"{size:>6}KB {kind:>6} {new_time * 1000:>10.2f} {old_time * 1000:>12.2f} {len(chunks):>7} {longest:>10}")
+
+
+if __name__ == "__main__":
+    main()
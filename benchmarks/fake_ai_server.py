@@ -0,0 +1,114 @@
+"""
+লোকাল স্টাব AI সার্ভার (API_BASE/ask এর নকল)।
+
+আসল ai.xneko.xyz ছাড়াই স্ট্রিমিং ও সাধারণ উত্তর পরীক্ষা করার জন্য।
+  GET/POST /ask            -> {"status": "success", "text": "..."}
+  GET /ask?stream=1        -> chunked text/plain, টুকরো টুকরো করে
+  GET /ask?stream=1&sse=1  -> text/event-stream (data: {"delta": "..."})
+
+চালানো:  python -m benchmarks.fake_ai_server --port 9000 --chunk-delay 0.2
+তারপর:   AI_API_BASE=http://127.0.0.1:9000 AI_STREAMING=1 দিয়ে বট চালান
+"""
+import argparse
+import json
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+
+def make_answer(question, words):
+    body = " ".join(f"<b>word{i}</b>" if i % 10 == 0 else f"word{i}" for i in range(words))
+    return f"Answer to: {question}\n{body}"
+
+
+class FakeAIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    config = None
+
+    def log_message(self, format, *args):
+        if not self.config.quiet:
+            super().log_message(format, *args)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path != "/ask":
+            self._send_json(404, {"status": "error", "text": "not found"})
+            return
+        query = parse_qs(url.query)
+        question = query.get("q", [""])[0]
+        if query.get("stream", ["0"])[0] == "1":
+            self._stream(question, sse=query.get("sse", ["0"])[0] == "1")
+        else:
+            self._answer(question)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        # বডি পড়ে ফেলা জরুরি, নইলে keep-alive কানেকশন নষ্ট হয়
+        self.rfile.read(length)
+        self._answer("posted prompt")
+
+    def _answer(self, question):
+        time.sleep(self.config.latency)
+        self._send_json(200, {"status": "success", "text": make_answer(question, self.config.words)})
+
+    def _send_json(self, status, data):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _stream(self, question, sse):
+        time.sleep(self.config.latency)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream" if sse else "text/plain; charset=utf-8")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        words = make_answer(question, self.config.words).split(" ")
+        step = max(1, len(words) // self.config.chunks)
+        for idx in range(0, len(words), step):
+            piece = " ".join(words[idx:idx + step]) + " "
+            if sse:
+                piece = f"data: {json.dumps({'delta': piece})}\n\n"
+            self._write_chunk(piece.encode())
+            time.sleep(self.config.chunk_delay)
+        if sse:
+            self._write_chunk(b"data: [DONE]\n\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _write_chunk(self, data):
+        self.wfile.write(f"{len(data):X}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+
+def serve(host="127.0.0.1", port=9000, latency=0.0, chunk_delay=0.1, chunks=20, words=300, quiet=False):
+    """সার্ভার তৈরি করে ফেরত দেয় (serve_forever() কলারের দায়িত্ব)"""
+    FakeAIHandler.config = argparse.Namespace(
+        latency=latency, chunk_delay=chunk_delay, chunks=chunks, words=words, quiet=quiet
+    )
+    return ThreadingHTTPServer((host, port), FakeAIHandler)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--latency", type=float, default=0.0, help="প্রথম বাইটের আগে দেরি (সেকেন্ড)")
+    parser.add_argument("--chunk-delay", type=float, default=0.1, help="প্রতি টুকরোর মাঝে দেরি (সেকেন্ড)")
+    parser.add_argument("--chunks", type=int, default=20, help="উত্তরটি কত টুকরোয় আসবে")
+    parser.add_argument("--words", type=int, default=300, help="উত্তরের দৈর্ঘ্য (শব্দ)")
+    parser.add_argument("--quiet", action="store_true")
+    args = parser.parse_args()
+
+    server = serve(args.host, args.port, args.latency, args.chunk_delay, args.chunks, args.words, args.quiet)
+    print(f"🧪 Fake AI server on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
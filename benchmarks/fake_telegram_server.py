@@ -0,0 +1,206 @@
+"""
+লোকাল স্টাব Telegram Bot API সার্ভার।
+
+বটগুলো TELEGRAM_API_URL=http://127.0.0.1:9100 দিয়ে চালালে আসল টেলিগ্রামের বদলে
+এখানে কল আসে। প্রতিটি কল গোনা হয়, আর sendMessage/editMessageText এর লেখায়
+"#<সংখ্যা>" মার্কার থাকলে সেটি প্রথম কখন দেখা গেল তা রেকর্ড হয়
+(লোড জেনারেটর এখান থেকে এন্ড-টু-এন্ড ল্যাটেন্সি হিসাব করে)।
+  POST /bot<token>/<method>   -> নকল Bot API উত্তর
+  GET  /file/bot<token>/...   -> নকল ছবির বাইট
+  GET  /stats                 -> কলের সংখ্যা ও মার্কার (JSON)
+  POST /reset                 -> সব রেকর্ড মুছে ফেলে
+
+চালানো:  python -m benchmarks.fake_telegram_server --port 9100 --latency 0.05
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+_PATH_RE = re.compile(r"^/bot([^/]+)/(\w+)$")
+_MARK_RE = re.compile(r"#(\d+)")
+
+# getFile এর জন্য নকল JPEG (হেডার + ফাঁকা ডেটা)
+FAKE_PHOTO = b"\xff\xd8\xff\xe0" + b"\0" * (200 * 1024) + b"\xff\xd9"
+
+
+class Recorder:
+    """সব থ্রেড থেকে আসা কলের হিসাব"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.calls = {}
+            self.marks = {}
+            self.webhooks = {}
+            self.message_id = 0
+
+    def record(self, method, text=None):
+        with self._lock:
+            self.calls[method] = self.calls.get(method, 0) + 1
+            if method in ("sendMessage", "editMessageText"):
+                self.message_id += 1
+            if text:
+                now = time.time()
+                for mark in _MARK_RE.findall(text):
+                    self.marks.setdefault(mark, now)
+            return self.message_id
+
+    def stats(self):
+        with self._lock:
+            return {"calls": dict(self.calls), "marks": dict(self.marks)}
+
+
+def _parse_params(handler, body):
+    content_type = handler.headers.get("Content-Type", "")
+    params = {key: values[0] for key, values in parse_qs(urlparse(handler.path).query).items()}
+    if "application/json" in content_type and body:
+        params.update(json.loads(body))
+    elif "application/x-www-form-urlencoded" in content_type and body:
+        params.update({key: values[0] for key, values in parse_qs(body.decode()).items()})
+    elif "multipart/form-data" in content_type and body:
+        # ফাইল আপলোড হলেও লেখার ফিল্ডগুলো আলাদা করে নেওয়া হয়
+        boundary = content_type.split("boundary=")[-1].encode()
+        for part in body.split(b"--" + boundary):
+            head, _, value = part.partition(b"\r\n\r\n")
+            name = re.search(rb'name="([^"]+)"', head)
+            if name and b"filename=" not in head:
+                params[name.group(1).decode()] = value.rstrip(b"\r\n").decode("utf-8", "replace")
+    return params
+
+
+def _int(value, default=0):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+class FakeTelegramHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    config = None
+    recorder = None
+
+    def log_message(self, format, *args):
+        if not self.config.quiet:
+            super().log_message(format, *args)
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if path == "/stats":
+            self._send_json(200, self.recorder.stats())
+        elif path.startswith("/file/bot"):
+            self.recorder.record("downloadFile")
+            self._send_bytes(200, FAKE_PHOTO, "image/jpeg")
+        else:
+            self._api(b"")
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length)
+        if urlparse(self.path).path == "/reset":
+            self.recorder.reset()
+            self._send_json(200, {"ok": True})
+        else:
+            self._api(body)
+
+    def _api(self, body):
+        match = _PATH_RE.match(urlparse(self.path).path)
+        if not match:
+            self._send_json(404, {"ok": False, "error_code": 404, "description": "Not Found"})
+            return
+        token, method = match.groups()
+        params = _parse_params(self, body)
+        if self.config.latency:
+            time.sleep(self.config.latency)
+
+        if method in ("sendMessage", "editMessageText") and random.random() < self.config.flood_rate:
+            # মাঝে মাঝে 429 দিয়ে ফ্লাড কন্ট্রোলের আচরণ পরীক্ষা করা যায়
+            self.recorder.record(method + ":429")
+            self._send_json(429, {
+                "ok": False, "error_code": 429, "description": "Too Many Requests: retry after 1",
+                "parameters": {"retry_after": 1},
+            })
+            return
+
+        message_id = self.recorder.record(method, params.get("text"))
+        self._send_json(200, {"ok": True, "result": self._result(token, method, params, message_id)})
+
+    def _result(self, token, method, params, message_id):
+        now = int(time.time())
+        chat_id = _int(params.get("chat_id"))
+        if method == "getMe":
+            return {"id": _int(token.split(":")[0], 1), "is_bot": True, "first_name": "Bench", "username": "bench_bot"}
+        if method in ("sendMessage", "editMessageText", "sendPhoto"):
+            return {
+                "message_id": _int(params.get("message_id"), message_id),
+                "date": now,
+                "chat": {"id": chat_id, "type": "private" if chat_id >= 0 else "group"},
+                "text": params.get("text", ""),
+            }
+        if method == "getFile":
+            file_id = params.get("file_id", "file")
+            return {"file_id": file_id, "file_unique_id": file_id, "file_size": len(FAKE_PHOTO), "file_path": f"photos/{file_id}.jpg"}
+        if method == "getWebhookInfo":
+            info = self.recorder.webhooks.get(token, {})
+            return {"url": info.get("url", ""), "has_custom_certificate": False, "pending_update_count": 0, **info}
+        if method == "setWebhook":
+            allowed = params.get("allowed_updates")
+            if isinstance(allowed, str):
+                allowed = json.loads(allowed)
+            self.recorder.webhooks[token] = {
+                "url": params.get("url", ""),
+                "max_connections": _int(params.get("max_connections"), 40),
+                "allowed_updates": allowed or [],
+            }
+            return True
+        # sendChatAction, deleteWebhook ইত্যাদি
+        return True
+
+    def _send_json(self, status, data):
+        self._send_bytes(status, json.dumps(data).encode(), "application/json")
+
+    def _send_bytes(self, status, body, content_type):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def serve(host="127.0.0.1", port=9100, latency=0.0, flood_rate=0.0, quiet=False):
+    """সার্ভার তৈরি করে ফেরত দেয় (serve_forever() কলারের দায়িত্ব); server.recorder এ হিসাব থাকে"""
+    FakeTelegramHandler.config = argparse.Namespace(latency=latency, flood_rate=flood_rate, quiet=quiet)
+    FakeTelegramHandler.recorder = Recorder()
+    server = ThreadingHTTPServer((host, port), FakeTelegramHandler)
+    server.daemon_threads = True
+    server.recorder = FakeTelegramHandler.recorder
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency", type=float, default=0.0, help="প্রতিটি Bot API কলের দেরি (সেকেন্ড)")
+    parser.add_argument("--flood-rate", type=float, default=0.0, help="কত অংশ sendMessage এ 429 ফেরত যাবে (0-1)")
+    parser.add_argument("--quiet", action="store_true")
+    args = parser.parse_args()
+
+    server = serve(args.host, args.port, args.latency, args.flood_rate, args.quiet)
+    print(f"🧪 Fake Telegram Bot API on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+"""
+ওয়েব হুক লোড জেনারেটর।
+
+নির্দিষ্ট হারে (--rate আপডেট/সেকেন্ড) বাস্তবসম্মত টেলিগ্রাম আপডেট JSON
+/<token> এ POST করে। প্রতিটি মেসেজে "#<সংখ্যা>" মার্কার থাকে; নকল টেলিগ্রাম
+সার্ভার (fake_telegram_server) সেই মার্কারসহ রিপ্লাই প্রথম কখন পেল তা থেকে
+এন্ড-টু-এন্ড ল্যাটেন্সি হিসাব হয়। চলার সময় /queues থেকে কিউয়ের গভীরতা আর
+/proc থেকে প্রতিটি প্রসেসের মেমরি (RSS) নেওয়া হয়।
+
+চালানো:  python -m benchmarks.load_generator --url http://127.0.0.1:8080 --token <token> \\
+              --telegram http://127.0.0.1:9100 --rate 50 --duration 20
+(পুরো সেটআপ একসাথে চালাতে: python -m benchmarks.run_load)
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+from urllib.request import urlopen
+
+
+def make_update(seq, chat_id, text=None):
+    """টেলিগ্রামের পাঠানো আসল আপডেটের মতো JSON (বাইট)"""
+    user = {"id": chat_id, "is_bot": False, "first_name": "Bench", "language_code": "bn"}
+    return json.dumps({
+        "update_id": 100000 + seq,
+        "message": {
+            "message_id": seq,
+            "from": user,
+            "chat": {"id": chat_id, "first_name": "Bench", "type": "private"},
+            "date": int(time.time()),
+            "text": text or f"bench #{seq} প্রশ্ন: একটি ছোট উত্তর দাও",
+        },
+    }).encode()
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def _get_json(url, timeout=5):
+    with urlopen(url, timeout=timeout) as resp:
+        return json.loads(resp.read())
+
+
+def process_memory(root_pid):
+    """root_pid ও তার সব চাইল্ড প্রসেসের RSS (MB), /proc থেকে (শুধু লিনাক্স)"""
+    children = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # comm এ স্পেস থাকতে পারে, তাই শেষ ')' এর পর থেকে পড়া হয়
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+
+    result = {}
+    stack = [root_pid]
+    while stack:
+        pid = stack.pop()
+        stack.extend(children.get(pid, []))
+        try:
+            with open(f"/proc/{pid}/status") as f:
+                rss = next(int(line.split()[1]) for line in f if line.startswith("VmRSS:"))
+        except (OSError, StopIteration):
+            continue
+        result[pid] = round(rss / 1024, 1)
+    return result
+
+
+class _Sender:
+    """থ্রেড প্রতি একটি keep-alive কানেকশন দিয়ে POST পাঠায়"""
+
+    def __init__(self, url, token):
+        parsed = urlparse(url)
+        self._host = parsed.hostname
+        self._port = parsed.port or 80
+        self._path = f"{parsed.path.rstrip('/')}/{token}"
+        self._local = threading.local()
+
+    def post(self, body):
+        conn = getattr(self._local, "conn", None)
+        for attempt in range(2):
+            if conn is None:
+                conn = self._local.conn = http.client.HTTPConnection(self._host, self._port, timeout=30)
+            try:
+                conn.request("POST", self._path, body, {"Content-Type": "application/json"})
+                resp = conn.getresponse()
+                resp.read()
+                return resp.status
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                conn = self._local.conn = None
+                if attempt:
+                    return 0
+        return 0
+
+
+def run(url, token, telegram, rate=20.0, duration=10.0, chats=0, drain=30.0, concurrency=32, server_pid=None, seed=1):
+    """
+    লোড চালিয়ে ফলাফলের dict ফেরত দেয়।
+    chats=0 হলে প্রতিটি আপডেট আলাদা চ্যাট থেকে আসে; না হলে এতগুলো চ্যাটে ঘুরে ঘুরে।
+    """
+    random.seed(seed)
+    urlopen(f"{telegram}/reset", data=b"").read()
+    sender = _Sender(url, token)
+    total = int(rate * duration)
+    sent_at = {}
+    statuses = {}
+    depth_samples = []
+    memory_peak = {}
+    stop = threading.Event()
+
+    def sample():
+        while not stop.is_set():
+            try:
+                depth_samples.append(sum(bot["depth"] for bot in _get_json(f"{url}/queues").values()))
+            except Exception:
+                pass
+            if server_pid:
+                for pid, rss in process_memory(server_pid).items():
+                    memory_peak[pid] = max(memory_peak.get(pid, 0), rss)
+            stop.wait(0.5)
+
+    def send(seq):
+        chat_id = 500000 + (seq % chats if chats else seq)
+        sent_at[str(seq)] = time.time()
+        status = sender.post(make_update(seq, chat_id))
+        statuses[status] = statuses.get(status, 0) + 1
+
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+    started = time.time()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for seq in range(total):
+            # খোলা-লুপ লোড: আগের রিকোয়েস্টের জন্য অপেক্ষা না করে নির্ধারিত সময়ে পাঠানো
+            delay = started + seq / rate - time.time()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(send, seq)
+    send_elapsed = time.time() - started
+
+    accepted = statuses.get(200, 0)
+    deadline = time.time() + drain
+    marks = {}
+    while time.time() < deadline:
+        marks = _get_json(f"{telegram}/stats")["marks"]
+        if len(marks) >= accepted:
+            break
+        time.sleep(0.5)
+    stop.set()
+    sampler.join()
+
+    stats = _get_json(f"{telegram}/stats")
+    marks = stats["marks"]
+    latencies = [marks[seq] - sent_at[seq] for seq in marks if seq in sent_at]
+    finished = max(marks.values()) if marks else time.time()
+    workers = {}
+    try:
+        for bot, items in _get_json(f"{url}/workers").items():
+            for index, worker in enumerate(items):
+                workers[worker["pid"]] = f"{bot}[{index}]"
+    except Exception:
+        pass
+
+    return {
+        "rate": rate,
+        "duration": round(send_elapsed, 2),
+        "sent": total,
+        "statuses": {str(key): value for key, value in sorted(statuses.items())},
+        "replied": len(latencies),
+        "throughput": round(len(latencies) / max(0.001, finished - started), 2),
+        "latency": {
+            "p50": percentile(latencies, 50),
+            "p90": percentile(latencies, 90),
+            "p99": percentile(latencies, 99),
+            "max": max(latencies) if latencies else None,
+        },
+        "queue_depth": {"max": max(depth_samples, default=0), "mean": round(sum(depth_samples) / len(depth_samples), 1) if depth_samples else 0},
+        "telegram_calls": stats["calls"],
+        "memory_mb": {workers.get(pid, "web" if pid == server_pid else f"pid {pid}"): rss for pid, rss in sorted(memory_peak.items())},
+    }
+
+
+def _fmt(seconds):
+    return "-" if seconds is None else f"{seconds * 1000:.0f}ms"
+
+
+def report(result, baseline=None):
+    """ফলাফল (এবং থাকলে বেসলাইনের সাথে তুলনা) প্রিন্ট করে"""
+    def line(label, value, key=None):
+        text = f"  {label:<18} {value}"
+        if baseline is not None and key is not None:
+            old = key(baseline)
+            new = key(result)
+            if old and new is not None:
+                text += f"   (baseline {old if not isinstance(old, float) else round(old, 3)}, {((new - old) / old):+.1%})"
+        print(text)
+
+    print("📊 Load test result")
+    line("sent / replied", f"{result['sent']} / {result['replied']}  statuses={result['statuses']}")
+    line("throughput", f"{result['throughput']} replies/s", lambda r: r["throughput"])
+    for pct in ("p50", "p90", "p99", "max"):
+        line(f"latency {pct}", _fmt(result["latency"][pct]), lambda r, pct=pct: r["latency"][pct])
+    line("queue depth", f"max {result['queue_depth']['max']}, mean {result['queue_depth']['mean']}")
+    line("telegram calls", result["telegram_calls"])
+    for name, rss in result["memory_mb"].items():
+        line(f"rss {name}"[:18], f"{rss} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8080", help="ওয়েব হুক সার্ভার")
+    parser.add_argument("--token", required=True, help="যে বটের /<token> এ আপডেট যাবে")
+    parser.add_argument("--telegram", default="http://127.0.0.1:9100", help="নকল টেলিগ্রাম সার্ভার")
+    parser.add_argument("--rate", type=float, default=20.0, help="আপডেট/সেকেন্ড")
+    parser.add_argument("--duration", type=float, default=10.0, help="কত সেকেন্ড ধরে পাঠানো হবে")
+    parser.add_argument("--chats", type=int, default=0, help="কতগুলো চ্যাট থেকে (0 = প্রতিটি আলাদা)")
+    parser.add_argument("--drain", type=float, default=30.0, help="শেষে রিপ্লাইয়ের জন্য সর্বোচ্চ অপেক্ষা")
+    parser.add_argument("--pid", type=int, help="সার্ভারের pid (মেমরি মাপার জন্য)")
+    parser.add_argument("--json", help="ফলাফল এই ফাইলে লেখা হবে")
+    parser.add_argument("--baseline", help="আগের --json ফাইলের সাথে তুলনা")
+    args = parser.parse_args()
+
+    result = run(args.url, args.token, args.telegram, args.rate, args.duration, args.chats, args.drain, server_pid=args.pid)
+    baseline = json.load(open(args.baseline)) if args.baseline else None
+    report(result, baseline)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
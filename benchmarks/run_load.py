@@ -0,0 +1,145 @@
+"""
+পুরো সিস্টেম লোকালি (ইন্টারনেট ছাড়া) চালিয়ে লোড টেস্ট।
+
+নকল AI সার্ভার ও নকল Telegram Bot API সার্ভার এই প্রসেসেই চালু হয়, তারপর
+app.py (flask) বা gunicorn.conf.py (gunicorn) আসল টপোলজিতে চালিয়ে
+load_generator দিয়ে AI বটের ওয়েব হুকে লোড দেওয়া হয়।
+
+চালানো:  python -m benchmarks.run_load --rate 50 --duration 20 --json before.json
+তুলনা:   python -m benchmarks.run_load --rate 50 --duration 20 --baseline before.json
+"""
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+from benchmarks import fake_ai_server, fake_telegram_server, load_generator
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_TOKEN = "1001:bench-ai-token"
+
+
+def _start(server):
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_address[1]}"
+
+
+# /workers না থাকলে (পুরনো টপোলজি) বট প্রসেস চালু হওয়ার জন্য এতক্ষণ অপেক্ষা
+LEGACY_WARMUP = 5.0
+
+
+def _wait_ready(url, process, timeout=60):
+    """
+    সব ওয়ার্কারের হার্টবিট আসা পর্যন্ত অপেক্ষা করে। সার্ভারে /workers না থাকলে
+    (হার্টবিটের আগের কোড) শুধু / সাড়া দেওয়া পর্যন্ত অপেক্ষা করে False দেয়।
+    """
+    deadline = time.time() + timeout
+    path = "/workers"
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"server exited with code {process.returncode}")
+        try:
+            with urlopen(f"{url}{path}", timeout=2) as resp:
+                body = resp.read()
+            if path == "/":
+                time.sleep(LEGACY_WARMUP)
+                return False
+            workers = json.loads(body)
+            items = [worker for bot in workers.values() for worker in bot]
+            if items and all(worker["heartbeat_age"] is not None for worker in items):
+                return True
+        except HTTPError as e:
+            if e.code == 404 and path == "/workers":
+                path = "/"
+                continue
+        except OSError:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError("workers did not become ready")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--server", choices=("gunicorn", "flask"), default="gunicorn")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--workers", type=int, default=1, help="AI বটের ওয়ার্কার প্রসেস (AI_BOT_WORKERS)")
+    parser.add_argument("--web-workers", type=int, default=2, help="gunicorn ওয়েব ওয়ার্কার (WEB_CONCURRENCY)")
+    parser.add_argument("--stream", action="store_true", help="AI উত্তর স্ট্রিমিং চালু (AI_STREAMING=1)")
+    parser.add_argument("--ai-latency", type=float, default=0.2, help="নকল AI এর প্রথম বাইটের দেরি")
+    parser.add_argument("--ai-chunk-delay", type=float, default=0.05)
+    parser.add_argument("--ai-words", type=int, default=200)
+    parser.add_argument("--tg-latency", type=float, default=0.02, help="নকল Bot API কলের দেরি")
+    parser.add_argument("--flood-rate", type=float, default=0.0, help="কত অংশ sendMessage এ 429")
+    parser.add_argument("--rate", type=float, default=20.0)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--chats", type=int, default=0)
+    parser.add_argument("--drain", type=float, default=30.0)
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE", help="সার্ভারে বাড়তি env (একাধিকবার)")
+    parser.add_argument("--json", help="ফলাফল এই ফাইলে লেখা হবে")
+    parser.add_argument("--baseline", help="আগের --json ফাইলের সাথে তুলনা")
+    parser.add_argument("--verbose", action="store_true", help="সার্ভারের লগ দেখাবে")
+    args = parser.parse_args()
+
+    ai_url = _start(fake_ai_server.serve(port=0, latency=args.ai_latency, chunk_delay=args.ai_chunk_delay, words=args.ai_words, quiet=True))
+    telegram_url = _start(fake_telegram_server.serve(port=0, latency=args.tg_latency, flood_rate=args.flood_rate, quiet=True))
+    url = f"http://127.0.0.1:{args.port}"
+    workdir = tempfile.mkdtemp(prefix="heavy-bench-")
+
+    env = {
+        **os.environ,
+        "PORT": str(args.port),
+        "SERVER_URL": url,
+        "TELEGRAM_API_URL": telegram_url,
+        "AI_API_BASE": ai_url,
+        "AI_BOT_TOKEN": BENCH_TOKEN,
+        "AI_BOT_WORKERS": str(args.workers),
+        "AI_STREAMING": "1" if args.stream else "0",
+        "WEB_CONCURRENCY": str(args.web_workers),
+        "SESSION_DB_PATH": os.path.join(workdir, "sessions.db"),
+        "PYTHONUNBUFFERED": "1",
+    }
+    # শুধু AI বট চালানো হয়, বাকি বটের টোকেন সরিয়ে দেওয়া হয়
+    env.pop("TEST_BOT_TOKEN", None)
+    env.pop("INFO_BOT_TOKEN", None)
+    env.update(item.split("=", 1) for item in args.env)
+
+    command = (
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py"] if args.server == "gunicorn"
+        else [sys.executable, "app.py"]
+    )
+    output = None if args.verbose else subprocess.DEVNULL
+    process = subprocess.Popen(command, cwd=ROOT, env=env, stdout=output, stderr=output, start_new_session=True)
+    try:
+        if not _wait_ready(url, process):
+            # হার্টবিট নেই এমন পুরনো কোড; TELEGRAM_API_URL / AI_API_BASE ও না মানতে পারে,
+            # তখন বট আসল সার্ভারে যেতে চেষ্টা করবে এবং ফলাফল তুলনীয় হবে না
+            print("⚠️ server has no /workers endpoint (older tree): readiness is a guess and "
+                  "TELEGRAM_API_URL / AI_API_BASE may be ignored, check replies before comparing")
+        print(f"🚀 {args.server} ready on {url} (AI workers: {args.workers}), sending {args.rate}/s for {args.duration}s")
+        result = load_generator.run(
+            url, BENCH_TOKEN, telegram_url, args.rate, args.duration, args.chats, args.drain, server_pid=process.pid
+        )
+        result["config"] = {key: value for key, value in vars(args).items() if key not in ("json", "baseline", "verbose")}
+    finally:
+        os.killpg(process.pid, signal.SIGTERM)
+        try:
+            process.wait(15)
+        except subprocess.TimeoutExpired:
+            os.killpg(process.pid, signal.SIGKILL)
+
+    baseline = json.load(open(args.baseline)) if args.baseline else None
+    load_generator.report(result, baseline)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+import os
+import asyncio
+from collections import deque, OrderedDict
+
+import metrics
+from bots.token_bucket import TokenBucket
+
+# ==========================================
+# ⚙️ কনফিগারেশন
+# ==========================================
+# একজন ইউজার কত খরচ-একক/সেকেন্ড হারে AI তে প্রশ্ন পাঠাতে পারবে (ডিফল্ট মিনিটে ৬)
+USER_RATE = float(os.getenv("AI_USER_RATE", str(6 / 60)))
+USER_BURST = float(os.getenv("AI_USER_BURST", "10"))
+# আপস্ট্রিম (AI সার্ভার) সব ইউজার মিলিয়ে কত খরচ-একক/সেকেন্ড নিতে পারে
+GLOBAL_RATE = float(os.getenv("AI_GLOBAL_RATE", "5"))
+GLOBAL_BURST = float(os.getenv("AI_GLOBAL_BURST", "20"))
+# একসাথে সর্বোচ্চ কতগুলো AI কল চলবে
+MAX_INFLIGHT = int(os.getenv("AI_MAX_INFLIGHT", "16"))
+# জায়গার অপেক্ষায় সর্বোচ্চ কতগুলো প্রশ্ন থাকবে এবং কত সেকেন্ড পর্যন্ত
+QUEUE_LIMIT = int(os.getenv("AI_QUEUE_LIMIT", "200"))
+QUEUE_TIMEOUT = float(os.getenv("AI_QUEUE_TIMEOUT", "30"))
+
+# খরচের মডেল: সাধারণ প্রশ্ন, লম্বা প্রশ্ন (POST), ছবি
+COST_TEXT = float(os.getenv("AI_COST_TEXT", "1"))
+COST_LONG = float(os.getenv("AI_COST_LONG", "3"))
+COST_PHOTO = float(os.getenv("AI_COST_PHOTO", "5"))
+# এর চেয়ে লম্বা প্রশ্ন POST এ যায় (handle_message এর মতোই)
+LONG_PROMPT = 600
+
+# এই সংখ্যার বেশি ইউজারের বাকেট জমলে অলস বাকেটগুলো মুছে ফেলা হয়
+_MAX_USER_BUCKETS = 10000
+
+# ==========================================
+# 🎟️ AI কলের ভর্তি নিয়ন্ত্রণ
+# ==========================================
+
+def request_cost(text, has_photo):
+    """প্রশ্নটি আপস্ট্রিমে কত ভারী"""
+    if has_photo:
+        return COST_PHOTO
+    if text and len(text) > LONG_PROMPT:
+        return COST_LONG
+    return COST_TEXT
+
+
+class Rejected(Exception):
+    """
+    প্রশ্নটি এখন নেওয়া যাচ্ছে না।
+    reason: "user" (ইউজারের কোটা শেষ) বা "busy" (সার্ভার ব্যস্ত)
+    """
+
+    def __init__(self, reason, retry_after):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class _Ticket:
+    """acquire() এর ফলাফল; কাজ শেষে release() দিতে হয় (একাধিকবার দেওয়া যায়)"""
+
+    __slots__ = ("_owner", "cost")
+
+    def __init__(self, owner, cost):
+        self._owner = owner
+        self.cost = cost
+
+    def release(self):
+        if self._owner is not None:
+            self._owner._release()
+            self._owner = None
+
+
+class AdmissionControl:
+    """
+    AI কলের আগে ভর্তি নিয়ন্ত্রণ (ওয়ার্কার প্রসেস প্রতি একটি)।
+
+    - ইউজার প্রতি টোকেন বাকেট: কোটা শেষ হলে অপেক্ষা না করিয়ে সাথে সাথে Rejected
+    - গ্লোবাল টোকেন বাকেট ও চলমান কলের সীমা: আপস্ট্রিম যতটা নিতে পারে
+    - জায়গা না থাকলে প্রশ্নগুলো ইউজার প্রতি আলাদা লাইনে অপেক্ষা করে এবং
+      deficit round robin এ পালা করে ছাড়া হয়; খরচ অনুযায়ী ভাগ হয় বলে একজন
+      ভারী ইউজার অন্যদের আটকে রাখতে পারে না
+    - লাইন ভর্তি থাকলে বা QUEUE_TIMEOUT পেরোলে Rejected("busy")
+    - workers (শেয়ার্ড কাউন্টার) দেওয়া থাকলে গ্লোবাল বাকেট ও চলমান কলের সীমা
+      সচল ওয়ার্কারদের মধ্যে ভাগ হয়; ইউজারের বাকেট ভাগ হয় না, কারণ একটি চ্যাট
+      একটি ওয়ার্কারেই থাকে
+    """
+
+    def __init__(self, user_rate=None, user_burst=None, global_rate=None, global_burst=None,
+                 max_inflight=None, queue_limit=None, queue_timeout=None, workers=None):
+        self.user_rate = user_rate or USER_RATE
+        self.user_burst = user_burst or USER_BURST
+        self._max_inflight = max_inflight or MAX_INFLIGHT
+        self.max_inflight = self._max_inflight
+        self.queue_limit = QUEUE_LIMIT if queue_limit is None else queue_limit
+        self.queue_timeout = queue_timeout or QUEUE_TIMEOUT
+        self._global_rate = global_rate or GLOBAL_RATE
+        self._global_burst = global_burst or GLOBAL_BURST
+        self._global = TokenBucket(self._global_rate, self._global_burst)
+        self._workers = workers
+        # প্রতি পালায় একটি লাইন কতটা খরচ জমা পায়; ভারী প্রশ্নের জন্য কয়েক পালা জমাতে হয়
+        self._quantum = min(COST_TEXT, COST_LONG, COST_PHOTO)
+        self._users = {}
+        self._queues = OrderedDict()
+        self._deficit = {}
+        self._waiting = 0
+        self._inflight = 0
+        self._timer = None
+        self.admitted = 0
+        self.rejected = 0
+        metrics.gauge_callback("bot_admission_inflight", lambda: self._inflight)
+        metrics.gauge_callback("bot_admission_waiting", lambda: self._waiting)
+
+    def _sync_share(self):
+        if self._workers is None:
+            return
+        count = max(1, self._workers.value)
+        self._global.rate = self._global_rate / count
+        self._global.capacity = max(1.0, self._global_burst / count)
+        self.max_inflight = max(1, self._max_inflight // count)
+
+    def _user_bucket(self, user_id):
+        bucket = self._users.get(user_id)
+        if bucket is None:
+            if len(self._users) >= _MAX_USER_BUCKETS:
+                self._users = {key: value for key, value in self._users.items() if not value.idle}
+            bucket = self._users[user_id] = TokenBucket(self.user_rate, self.user_burst)
+        return bucket
+
+    def _reject(self, reason, retry_after):
+        self.rejected += 1
+        metrics.inc("bot_admission_total", result=f"rejected_{reason}")
+        return Rejected(reason, retry_after)
+
+    def _ticket(self, cost):
+        self._inflight += 1
+        self.admitted += 1
+        metrics.inc("bot_admission_total", result="admitted")
+        return _Ticket(self, cost)
+
+    async def acquire(self, user_id, cost):
+        """প্রশ্নটি চালানোর অনুমতি (_Ticket) দেয়, নইলে Rejected তোলে"""
+        self._sync_share()
+        # বাকেটের চেয়ে বড় খরচ কখনো মিটবে না
+        cost = min(cost, self.user_burst, self._global.capacity)
+        bucket = self._user_bucket(user_id)
+        if not bucket.try_acquire(cost):
+            raise self._reject("user", bucket.delay(cost))
+
+        if not self._queues and self._inflight < self.max_inflight and self._global.try_acquire(cost):
+            return self._ticket(cost)
+        if self._waiting >= self.queue_limit:
+            self._refund(bucket, cost)
+            raise self._reject("busy", self.queue_timeout)
+
+        future = asyncio.get_running_loop().create_future()
+        self._queues.setdefault(user_id, deque()).append((cost, future))
+        self._waiting += 1
+        self._pump()
+        try:
+            await asyncio.wait((future,), timeout=self.queue_timeout)
+        except asyncio.CancelledError:
+            if future.done():
+                future.result().release()
+            else:
+                self._withdraw(user_id, cost, future, bucket)
+            raise
+        if not future.done():
+            self._withdraw(user_id, cost, future, bucket)
+            raise self._reject("busy", self.queue_timeout)
+        return future.result()
+
+    def _refund(self, bucket, cost):
+        bucket.tokens = min(bucket.capacity, bucket.tokens + cost)
+
+    def _withdraw(self, user_id, cost, future, bucket):
+        """অপেক্ষা বাদ দেওয়া প্রশ্নটি লাইন থেকে সরায় এবং ইউজারের টোকেন ফেরত দেয়"""
+        waiters = self._queues.get(user_id)
+        if waiters is not None:
+            waiters.remove((cost, future))
+            if not waiters:
+                del self._queues[user_id]
+                self._deficit.pop(user_id, None)
+        self._waiting -= 1
+        future.cancel()
+        self._refund(bucket, cost)
+
+    def _pump(self):
+        """অপেক্ষমাণ লাইনগুলো থেকে পালা করে যতগুলো সম্ভব ছাড়ে"""
+        self._sync_share()
+        while self._queues and self._inflight < self.max_inflight:
+            user_id, waiters = next(iter(self._queues.items()))
+            cost, future = waiters[0]
+            delay = self._global.delay(cost)
+            if delay > 0:
+                # গ্লোবাল টোকেন ভরে উঠলে আবার চেষ্টা
+                if self._timer is None:
+                    self._timer = asyncio.get_running_loop().call_later(delay, self._wake)
+                return
+            deficit = self._deficit.get(user_id, 0.0)
+            if deficit < cost:
+                deficit = self._deficit[user_id] = deficit + self._quantum
+                if deficit < cost:
+                    # এখনো যথেষ্ট জমেনি, পরের জনের পালা
+                    self._queues.move_to_end(user_id)
+                    continue
+            waiters.popleft()
+            self._waiting -= 1
+            self._global.try_acquire(cost)
+            self._deficit[user_id] = deficit - cost
+            future.set_result(self._ticket(cost))
+            if not waiters:
+                del self._queues[user_id]
+                self._deficit.pop(user_id, None)
+            elif self._deficit[user_id] < waiters[0][0]:
+                # এই ইউজারের পালা শেষ, লাইনের শেষে যায়
+                self._queues.move_to_end(user_id)
+
+    def _wake(self):
+        self._timer = None
+        self._pump()
+
+    def _release(self):
+        self._inflight -= 1
+        self._pump()
+
+    def stats(self, user_id=None):
+        self._sync_share()
+        stats = {
+            "inflight": self._inflight,
+            "max_inflight": self.max_inflight,
+            "waiting": self._waiting,
+            "queue_limit": self.queue_limit,
+            "waiting_users": len(self._queues),
+            "global_tokens": round(min(self._global.capacity, self._global.tokens), 1),
+            "global_capacity": self._global.capacity,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+        }
+        if user_id is not None:
+            bucket = self._user_bucket(user_id)
+            bucket.delay()
+            stats["user_tokens"] = round(bucket.tokens, 1)
+            stats["user_capacity"] = bucket.capacity
+            stats["user_rate_per_min"] = round(bucket.rate * 60, 1)
+        return stats
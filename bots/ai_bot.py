@@ -1,25 +1,49 @@
 import os
+import math
 import asyncio
-import queue  # এটি queue.Empty এরর চেক করার জন্য লাগবে
 import logging
-import requests
 import html
 import random
 import string
 from telegram import Update
 from telegram.constants import ParseMode, ChatAction
-from telegram.ext import Application, MessageHandler, CommandHandler, filters, ContextTypes
+from telegram.ext import MessageHandler, CommandHandler, filters, ContextTypes
+
+from bots.telegram_app import build_application
+from bots.runner import bot_loop
+from bots.ai_client import AIClient
+from bots.ai_cache import ResponseCache, CACHE_BYPASS_SESSIONS
+from bots.session_store import create_session_store
+from bots.text_split import smart_split
+from bots.streaming import StreamingReply, STREAMING_ENABLED
+from bots.photo_relay import relay_photo
+from bots.bursts import BurstTracker, ChatActions, SKIP
+from bots.admission import AdmissionControl, Rejected, request_cost, COST_TEXT, COST_LONG, COST_PHOTO
 
 # ==========================================
 # ⚙️ কনফিগারেশন
 # ==========================================
 TOKEN = os.getenv("AI_BOT_TOKEN")
-API_BASE = "https://ai.xneko.xyz"
+API_BASE = os.getenv("AI_API_BASE", "https://ai.xneko.xyz")
 
 logging.basicConfig(level=logging.INFO)
 
-# ইউজারের সেশন ID মনে রাখার জন্য ডিকশনারি
-user_sessions = {}
+# ইউজারের সেশন ID মনে রাখার স্টোর (run_bot এ তৈরি হয়, SQLite এ স্থায়ী থাকে)
+user_sessions = None
+
+# AI ব্যাকএন্ডের শেয়ার্ড কানেকশন পুল (run_bot এ তৈরি হয়)
+ai_client = None
+
+# একই প্রশ্নের উত্তরের ক্যাশ (AI_CACHE_SIZE=0 হলে বন্ধ)
+response_cache = ResponseCache()
+
+# ইউজারের দ্রুত পরপর মেসেজ একত্র/বাতিল করা (AI_BURST_POLICY) এবং চ্যাট প্রতি একটি টাইপিং লুপ
+bursts = BurstTracker()
+chat_actions = ChatActions()
+
+# ইউজার প্রতি কোটা এবং AI সার্ভারের ক্ষমতা সবার মধ্যে ন্যায্যভাবে ভাগ করা
+# (run_bot এ ওয়ার্কার সংখ্যা জেনে আবার তৈরি হয়)
+admission = AdmissionControl()
 
 # ==========================================
 # 🛠️ ইউটিলিটি ফাংশন
@@ -30,38 +54,34 @@ def generate_session_id():
     part = lambda: ''.join(random.choices(string.ascii_uppercase, k=4))
     return f"{part()}-{part()}-{part()}"
 
-async def keep_sending_action(bot, chat_id, action):
-    """টাইপিং স্ট্যাটাস বজায় রাখে"""
-    try:
-        while True:
-            await bot.send_chat_action(chat_id=chat_id, action=action)
-            await asyncio.sleep(4)
-    except asyncio.CancelledError:
-        pass
-
-def smart_split(text, max_len=4000):
-    """মেসেজ ভেঙে ফেলার স্মার্ট ফাংশন"""
-    if len(text) <= max_len:
-        return [text]
-    chunks = []
-    while text:
-        if len(text) <= max_len:
-            chunks.append(text)
-            break
-        split_at = text.rfind('\n', 0, max_len)
-        if split_at == -1: split_at = text.rfind(' ', 0, max_len)
-        if split_at == -1: split_at = max_len
-        chunk = text[:split_at]
-        remaining = text[split_at:]
-        if chunk.count('<pre>') > chunk.count('</pre>'):
-            chunk += "</pre>"
-            remaining = "<pre>" + remaining
-        elif chunk.count('<code>') > chunk.count('</code>'):
-            chunk += "</code>"
-            remaining = "<code>" + remaining
-        chunks.append(chunk)
-        text = remaining
-    return chunks
+def rejection_text(rejected):
+    """ভর্তি না হওয়া প্রশ্নের জন্য ইউজারকে সাথে সাথে পাঠানো উত্তর"""
+    if rejected.reason == "user":
+        seconds = max(1, math.ceil(rejected.retry_after))
+        return f"⏳ আপনি খুব দ্রুত প্রশ্ন পাঠাচ্ছেন। {seconds} সেকেন্ড পর আবার চেষ্টা করুন। (/limits)"
+    return "⏳ সার্ভার এখন ব্যস্ত, একটু পরে আবার চেষ্টা করুন।"
+
+def parse_api_response(resp):
+    """API রেসপন্স JSON হলে ডিকশনারি, না হলে টেক্সট হিসেবে ফেরত দেয়"""
+    try: return resp.json()
+    except: return {"status": "success", "text": resp.text}
+
+async def ask_get_cacheable(params):
+    """GET রিকোয়েস্ট পাঠায় এবং উত্তরটি ক্যাশ করা যাবে কিনা তা জানায়"""
+    resp = await ai_client.ask_get(params)
+    response_data = parse_api_response(resp)
+    return response_data, resp.status_code == 200 and bool(response_data)
+
+async def stream_answer(chat_id, params, bot, typing_task):
+    """স্ট্রিমিং উত্তর প্রথম টুকরো থেকেই দেখায় এবং ক্রমশ এডিট করে"""
+    reply = StreamingReply(bot, chat_id)
+    async for delta in ai_client.stream_ask(params):
+        await reply.append(delta)
+        if reply.started:
+            typing_task.cancel()
+    typing_task.cancel()
+    if not await reply.finish():
+        await bot.send_message(chat_id, "❌ Empty response from API")
 
 async def send_html_safe_message(chat_id, text, bot):
     """HTML ফরম্যাটে মেসেজ পাঠায়"""
@@ -85,6 +105,7 @@ async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     help_text = (
         "🤖 **কমান্ড লিস্ট:**\n\n"
         "/newchat - নতুন চ্যাট শুরু করুন (হিস্ট্রি ক্লিয়ার হবে)\n"
+        "/limits - আপনার প্রশ্নের কোটা ও সার্ভারের অবস্থা\n"
         "/help - এই মেসেজটি দেখাবে\n"
         "যেকোনো টেক্সট বা ছবি পাঠান উত্তরের জন্য।"
     )
@@ -103,6 +124,34 @@ async def newchat_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         parse_mode=ParseMode.HTML
     )
 
+async def stats_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    stats = response_cache.stats()
+    burst_stats = bursts.stats()
+    status = "চালু" if response_cache.enabled else "বন্ধ"
+    await update.message.reply_text(
+        f"📊 <b>ক্যাশ ({status}):</b>\n"
+        f"Hits: <code>{stats['hits']}</code> | Misses: <code>{stats['misses']}</code> | "
+        f"Shared: <code>{stats['shared']}</code>\n"
+        f"Size: <code>{stats['size']}/{stats['max_size']}</code> | "
+        f"Hit rate: <code>{stats['hit_rate']:.1%}</code>\n"
+        f"🧺 <b>Bursts ({burst_stats['policy']}):</b> "
+        f"Merged: <code>{burst_stats['merged']}</code> | Superseded: <code>{burst_stats['superseded']}</code>",
+        parse_mode=ParseMode.HTML
+    )
+
+async def limits_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    stats = admission.stats(update.message.from_user.id)
+    await update.message.reply_text(
+        f"🎟️ <b>আপনার কোটা:</b> <code>{stats['user_tokens']:g}/{stats['user_capacity']:g}</code> "
+        f"(মিনিটে <code>{stats['user_rate_per_min']:g}</code> করে ভরে)\n"
+        f"খরচ: টেক্সট <code>{COST_TEXT:g}</code> | লম্বা প্রশ্ন <code>{COST_LONG:g}</code> | "
+        f"ছবি <code>{COST_PHOTO:g}</code>\n"
+        f"🖥️ <b>সার্ভার:</b> চলমান <code>{stats['inflight']}/{stats['max_inflight']}</code> | "
+        f"অপেক্ষায় <code>{stats['waiting']}</code> | "
+        f"Admitted: <code>{stats['admitted']}</code> | Rejected: <code>{stats['rejected']}</code>",
+        parse_mode=ParseMode.HTML
+    )
+
 # ==========================================
 # 🤖 মেইন লজিক হ্যান্ডলার
 # ==========================================
@@ -115,7 +164,7 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
     real_uid = msg.from_user.id # টেলিগ্রামের আসল ID
     
     # সেশন চেক করা: যদি নতুন চ্যাট ID থাকে সেটা ব্যবহার করবে, না হলে আসল ID
-    api_uid = user_sessions.get(real_uid, real_uid)
+    api_uid = await user_sessions.lookup(real_uid, real_uid)
 
     has_photo = bool(msg.photo)
     text = msg.caption if has_photo else msg.text
@@ -123,12 +172,57 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if not text and not has_photo: return
 
     action = ChatAction.UPLOAD_PHOTO if has_photo else ChatAction.TYPING
-    typing_task = asyncio.create_task(keep_sending_action(context.bot, chat_id, action))
+    # চ্যাটে আগে থেকেই টাইপিং লুপ চললে নতুন লুপ খোলা হয় না
+    typing_task = chat_actions.hold(context.bot, chat_id, action)
+
+    # উত্তরের অপেক্ষায় থাকা অবস্থায় একই ইউজারের আরও মেসেজ এলে সেগুলো এক প্রশ্নে জোড়া হয়
+    # (অথবা cancel মোডে শুধু শেষটির উত্তর দেওয়া হয়)
+    mergeable = not has_photo and not text.startswith("/")
+    text = await bursts.begin(msg, text, mergeable)
+    if text is SKIP:
+        typing_task.cancel()
+        return
+
+    # আলাদা টাস্কে চলে, যাতে নতুন মেসেজ এলে শুধু এই কাজটি বাতিল করা যায়
+    work = asyncio.create_task(answer_message(msg, text, has_photo, api_uid, real_uid, context.bot, typing_task))
+    bursts.track(msg, work)
+    try:
+        await work
+    except asyncio.CancelledError:
+        if not bursts.was_cancelled(msg):
+            raise
+        print(f"[{api_uid}] Superseded by a newer message, request cancelled")
+    finally:
+        bursts.done(msg)
+        typing_task.cancel()
 
+async def admit_update(update, handler):
+    """
+    ডিসপ্যাচারের জায়গা নেওয়ার আগে AI প্রশ্নের ভর্তি (ইউজারের কোটা ও AI সার্ভারের ক্ষমতা)।
+    অন্য হ্যান্ডলার বা বাদ পড়া মেসেজের জন্য None, ভর্তি না হলে ইউজারকে জানিয়ে False
+    """
+    msg = update.message
+    if handler != "handle_message" or not msg or not msg.from_user:
+        return None
+    has_photo = bool(msg.photo)
+    text = msg.caption if has_photo else msg.text
+    if not text and not has_photo or bursts.will_skip(msg):
+        return None
+    try:
+        return await admission.acquire(msg.from_user.id, request_cost(text, has_photo))
+    except Rejected as e:
+        try:
+            await msg.reply_text(rejection_text(e))
+        except Exception as send_error:
+            print(f"Admission Reply Error: {send_error}")
+        return False
+
+async def answer_message(msg, text, has_photo, api_uid, real_uid, bot, typing_task):
+    """প্রশ্নটি AI তে পাঠিয়ে উত্তর চ্যাটে দেয়"""
+    chat_id = msg.chat_id
     try:
         response_data = None
         should_use_post = has_photo or (text and len(text) > 600)
-        loop = asyncio.get_running_loop()
 
         # এখানে api_uid ব্যবহার করা হচ্ছে (যেটি রেন্ডম হতে পারে)
         if should_use_post:
@@ -136,61 +230,46 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
             data = {'uid': str(api_uid)}
             if text: data['q'] = text
             
-            files = {}
             if has_photo:
-                photo_file = await msg.photo[-1].get_file()
-                image_bytes = await photo_file.download_as_bytearray()
-                files['image'] = ('image.jpg', image_bytes, 'image/jpeg')
-
-            resp = await loop.run_in_executor(
-                None, 
-                lambda: requests.post(f"{API_BASE}/ask", data=data, files=files if files else None)
-            )
+                # ছবি মেমরিতে না জমিয়ে টেলিগ্রাম থেকে সরাসরি AI সার্ভারে পাঠানো হয়
+                resp = await relay_photo(ai_client, msg.photo, data)
+            else:
+                resp = await ai_client.ask_post(data)
+            response_data = parse_api_response(resp)
+        elif STREAMING_ENABLED:
+            print(f"[{api_uid}] Sending streaming GET request")
+            await stream_answer(chat_id, {'q': text, 'uid': api_uid}, bot, typing_task)
+            return
         else:
-            print(f"[{api_uid}] Sending GET request")
             params = {'q': text, 'uid': api_uid}
-            resp = await loop.run_in_executor(
-                None,
-                lambda: requests.get(f"{API_BASE}/ask", params=params)
-            )
-
-        try: response_data = resp.json()
-        except: response_data = {"status": "success", "text": resp.text}
+            # সেশন-বাউন্ড প্রশ্ন ক্যাশ এড়িয়ে যাবে, কারণ উত্তর হিস্ট্রির উপর নির্ভর করে
+            bypass_cache = not response_cache.enabled or (CACHE_BYPASS_SESSIONS and api_uid != real_uid)
+            if bypass_cache:
+                print(f"[{api_uid}] Sending GET request")
+                response_data = parse_api_response(await ai_client.ask_get(params))
+            else:
+                cache_key = response_cache.make_key(text, api_uid)
+                response_data = await response_cache.get_or_fetch(cache_key, lambda: ask_get_cacheable(params))
 
         if not response_data:
-            await context.bot.send_message(chat_id, "❌ Empty response from API")
+            await bot.send_message(chat_id, "❌ Empty response from API")
             return
 
         final_response = response_data.get("text") or response_data.get("output") or "No response text"
         typing_task.cancel()
-        await send_html_safe_message(chat_id, final_response, context.bot)
+        await send_html_safe_message(chat_id, final_response, bot)
 
     except Exception as e:
         print(f"Handler Error: {e}")
         typing_task.cancel()
-        await context.bot.send_message(chat_id, f"❌ Bot Error: {str(e)}")
+        await bot.send_message(chat_id, f"❌ Bot Error: {str(e)}")
 
 # ==========================================
 # 🔄 ব্যাকগ্রাউন্ড লুপ এবং রানার
 # ==========================================
 
-async def bot_loop(application, local_queue):
-    print("🤖 AI Bot Process Started (Isolated)...")
-    await application.initialize()
-    await application.start()
-
-    while True:
-        try:
-            update_data = local_queue.get(timeout=1)
-            if update_data:
-                update = Update.de_json(update_data, application.bot)
-                await application.process_update(update)
-        except queue.Empty:
-            continue
-        except Exception as e:
-            print(f"AI Bot Loop Error: {e}")
-
-def run_bot(input_queue):
+def run_bot(input_queue, probe=None):
+    global ai_client, user_sessions, admission
     if not TOKEN: 
         print("❌ AI Bot Token Missing!")
         return
@@ -198,14 +277,29 @@ def run_bot(input_queue):
     loop = asyncio.new_event_loop()
     asyncio.set_event_loop(loop)
 
-    app = Application.builder().token(TOKEN).build()
+    app = build_application(TOKEN, probe)
     
     # নতুন কমান্ড হ্যান্ডলারগুলো যুক্ত করা হলো
     app.add_handler(CommandHandler("start", start_command))
     app.add_handler(CommandHandler("help", help_command))
     app.add_handler(CommandHandler("newchat", newchat_command))
+    app.add_handler(CommandHandler("stats", stats_command))
+    app.add_handler(CommandHandler("limits", limits_command))
     
     # মেসেজ হ্যান্ডলার সবার শেষে থাকবে
     app.add_handler(MessageHandler(filters.TEXT | filters.PHOTO, handle_message))
 
-    loop.run_until_complete(bot_loop(app, input_queue))
+    # প্রতি প্রসেসে একটিই keep-alive কানেকশন পুল
+    ai_client = AIClient(API_BASE)
+    # গ্লোবাল কোটা ও চলমান কলের সীমা সচল ওয়ার্কারদের মধ্যে ভাগ হয়
+    admission = AdmissionControl(workers=probe.workers if probe is not None else None)
+    user_sessions = create_session_store()
+    try:
+        print("🤖 AI Bot Process Started (Isolated)...")
+        # bursts.note: হ্যান্ডলার চলার আগেই জানানো, যাতে আগের প্রশ্নটি এই মেসেজ দেখতে পায়
+        # admit_update: ভর্তির অপেক্ষা ডিসপ্যাচারের জায়গা আটকে রাখে না
+        loop.run_until_complete(bot_loop(app, input_queue, probe, name="AI Bot",
+                                         on_update=bursts.note, admit=admit_update))
+    finally:
+        loop.run_until_complete(ai_client.aclose())
+        user_sessions.close()
@@ -0,0 +1,129 @@
+import os
+import time
+import asyncio
+from collections import OrderedDict
+
+# ==========================================
+# ⚙️ কনফিগারেশন
+# ==========================================
+# 0 হলে ক্যাশ বন্ধ থাকবে
+CACHE_SIZE = int(os.getenv("AI_CACHE_SIZE", "0"))
+CACHE_TTL = float(os.getenv("AI_CACHE_TTL", "300"))
+# "session": প্রতিটি সেশনের (api_uid) আলাদা ক্যাশ — উত্তর ইউজারের চ্যাট হিস্টরির উপর নির্ভর করে
+# "global": সব ইউজার একই উত্তর শেয়ার করবে; শুধু হিস্টরি-নিরপেক্ষ API হলে জেনেশুনে চালু করুন
+CACHE_SCOPE = os.getenv("AI_CACHE_SCOPE", "session")
+# /newchat দিয়ে সেশন খোলা ইউজারদের প্রশ্ন ক্যাশ এড়িয়ে সরাসরি API তে যাবে
+CACHE_BYPASS_SESSIONS = os.getenv("AI_CACHE_BYPASS_SESSIONS", "1") == "1"
+
+# ==========================================
+# 🗃️ রেসপন্স ক্যাশ
+# ==========================================
+
+def normalize_question(text):
+    """ছোট-বড় হাতের অক্ষর ও অতিরিক্ত স্পেস বাদ দিয়ে প্রশ্নটিকে এক রূপে আনে"""
+    return " ".join(text.casefold().split())
+
+
+def _consume_exception(future):
+    # কেউ অপেক্ষা না করলেও "exception was never retrieved" সতর্কবার্তা যেন না আসে
+    if not future.cancelled():
+        future.exception()
+
+
+class ResponseCache:
+    """
+    একই প্রশ্নের উত্তর মনে রাখার জন্য TTL + LRU ক্যাশ।
+
+    একই প্রশ্ন একসাথে একাধিক ইউজার পাঠালে (single-flight) আপস্ট্রিমে
+    একটিই কল যায়, বাকিরা সেই কলের ফলাফলের জন্য অপেক্ষা করে।
+    """
+
+    def __init__(self, max_size=None, ttl=None):
+        self.max_size = CACHE_SIZE if max_size is None else max_size
+        self.ttl = CACHE_TTL if ttl is None else ttl
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self.hits = 0
+        self.misses = 0
+        self.shared = 0
+
+    @property
+    def enabled(self):
+        return self.max_size > 0
+
+    def make_key(self, question, session_scope):
+        scope = "*" if CACHE_SCOPE == "global" else session_scope
+        return (scope, normalize_question(question))
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    async def get_or_fetch(self, key, fetch):
+        """
+        ক্যাশে থাকলে সেখান থেকে দেয়, না থাকলে fetch() চালায়।
+        fetch() কে (value, cacheable) টাপল রিটার্ন করতে হবে।
+        """
+        value = self.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        pending = self._inflight.get(key)
+        while pending is not None:
+            self.shared += 1
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                # শুধু লিডার বাতিল হয়েছে (যেমন নতুন মেসেজে আগের প্রশ্ন বাদ); এই
+                # অপেক্ষমাণরা বাতিল নয়, তাই নতুন করে দেখে দরকার হলে নিজেই আনে
+                if not pending.cancelled():
+                    raise
+            value = self.get(key)
+            if value is not None:
+                return value
+            pending = self._inflight.get(key)
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        future.add_done_callback(_consume_exception)
+        self._inflight[key] = future
+        try:
+            value, cacheable = await fetch()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+        future.set_result(value)
+        if cacheable:
+            self.put(key, value)
+        return value
+
+    def stats(self):
+        lookups = self.hits + self.misses + self.shared
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "shared": self.shared,
+            "hit_rate": round((self.hits + self.shared) / lookups, 3) if lookups else 0.0,
+        }
@@ -0,0 +1,193 @@
+import os
+import json
+import time
+import asyncio
+import httpx
+
+import metrics
+
+# ==========================================
+# ⚙️ কনফিগারেশন
+# ==========================================
+CONNECT_TIMEOUT = float(os.getenv("AI_CONNECT_TIMEOUT", "5"))
+READ_TIMEOUT = float(os.getenv("AI_READ_TIMEOUT", "120"))
+MAX_CONNECTIONS = int(os.getenv("AI_MAX_CONNECTIONS", "20"))
+MAX_KEEPALIVE = int(os.getenv("AI_MAX_KEEPALIVE", "10"))
+# টেলিগ্রাম থেকে ফাইল নামানোর আলাদা পুল; AI পুলের সাথে শেয়ার করলে আপলোড ও
+# ডাউনলোড একে অপরের কানেকশনের জন্য অপেক্ষা করে আটকে যেতে পারে
+DOWNLOAD_CONNECTIONS = int(os.getenv("AI_DOWNLOAD_CONNECTIONS", "10"))
+MAX_RETRIES = int(os.getenv("AI_MAX_RETRIES", "2"))
+RETRY_BACKOFF = float(os.getenv("AI_RETRY_BACKOFF", "0.5"))
+# স্ট্রিমিং চাওয়ার জন্য /ask এ এই কুয়েরি প্যারামিটার (=1) পাঠানো হয়
+STREAM_PARAM = os.getenv("AI_STREAM_PARAM", "stream")
+
+# এই স্ট্যাটাসগুলোতে আবার চেষ্টা করা নিরাপদ (শুধু GET এর ক্ষেত্রে)
+RETRY_STATUSES = {502, 503, 504}
+
+# সংযোগই তৈরি হয়নি, তাই POST হলেও আবার পাঠানো নিরাপদ
+_CONNECT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+# ==========================================
+# 🌐 AI ব্যাকএন্ড ক্লায়েন্ট
+# ==========================================
+
+class AIClient:
+    """
+    AI ব্যাকএন্ডের জন্য একটি শেয়ার্ড keep-alive কানেকশন পুল।
+
+    run_bot এ একবার তৈরি হয় এবং প্রসেস বন্ধের সময় aclose() দিয়ে বন্ধ হয়।
+    প্রতিটি প্রশ্নে নতুন TCP+TLS হ্যান্ডশেক লাগে না, আর টাইমআউট থাকায়
+    আটকে যাওয়া ব্যাকএন্ড থ্রেড-পুল দখল করে রাখতে পারে না।
+    """
+
+    def __init__(self, base_url, connect_timeout=None, read_timeout=None,
+                 max_connections=None, max_keepalive=None, max_retries=None, retry_backoff=None,
+                 download_connections=None):
+        self.max_retries = MAX_RETRIES if max_retries is None else max_retries
+        self.retry_backoff = RETRY_BACKOFF if retry_backoff is None else retry_backoff
+        timeout = httpx.Timeout(read_timeout or READ_TIMEOUT, connect=connect_timeout or CONNECT_TIMEOUT)
+        self._client = httpx.AsyncClient(
+            base_url=base_url,
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=max_connections or MAX_CONNECTIONS,
+                max_keepalive_connections=max_keepalive or MAX_KEEPALIVE,
+            ),
+        )
+        connections = download_connections or DOWNLOAD_CONNECTIONS
+        self._downloads = httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=connections, max_keepalive_connections=connections),
+        )
+
+    async def request(self, method, path, idempotent=False, **kwargs):
+        """ব্যাকঅফ সহ রিকোয়েস্ট পাঠায়; শুধু নিরাপদ ক্ষেত্রেই আবার চেষ্টা করে"""
+        attempt = 0
+        while True:
+            started = time.monotonic()
+            try:
+                resp = await self._client.request(method, path, **kwargs)
+            except _CONNECT_ERRORS as e:
+                _observe(method, started, type(e).__name__)
+                if attempt >= self.max_retries:
+                    raise
+            except httpx.RemoteProtocolError as e:
+                _observe(method, started, type(e).__name__)
+                # পুলের পুরনো কানেকশন সার্ভার বন্ধ করে দিয়েছে
+                if not idempotent or attempt >= self.max_retries:
+                    raise
+            else:
+                _observe(method, started, resp.status_code)
+                if not (idempotent and resp.status_code in RETRY_STATUSES and attempt < self.max_retries):
+                    return resp
+
+            await asyncio.sleep(self.retry_backoff * (2 ** attempt))
+            attempt += 1
+
+    async def ask_get(self, params):
+        return await self.request("GET", "/ask", idempotent=True, params=params)
+
+    async def ask_post(self, data, files=None):
+        return await self.request("POST", "/ask", data=data, files=files)
+
+    async def ask_post_file(self, data, field, filename, content_type, chunks, size=None):
+        """
+        multipart POST, যেখানে ফাইলের অংশগুলো chunks (async iterable) থেকে আসা
+        মাত্রই পাঠানো হয়; পুরো ফাইল কখনো মেমরিতে জমে না।
+        size জানা থাকলে Content-Length পাঠানো হয়, না হলে chunked এনকোডিং।
+        """
+        boundary = os.urandom(16).hex()
+        head = b"".join(_form_part(boundary, name, value) for name, value in data.items())
+        head += _form_part(boundary, field, None, filename, content_type)
+        tail = f"\r\n--{boundary}--\r\n".encode()
+
+        async def body():
+            yield head
+            async for chunk in chunks:
+                yield chunk
+            yield tail
+
+        headers = {"Content-Type": f"multipart/form-data; boundary={boundary}"}
+        if size is not None:
+            headers["Content-Length"] = str(len(head) + size + len(tail))
+        # বডি একবারই পড়া যায়; কানেকশন তৈরির আগের ত্রুটিতে বডি শুরুই হয় না,
+        # তাই request() এর retry নিরাপদ
+        return await self.request("POST", "/ask", content=body(), headers=headers)
+
+    def download(self, url):
+        """
+        অন্য সার্ভার থেকে ফাইল স্ট্রিম করে পড়ার জন্য (async with ... as resp)।
+        আলাদা পুল থেকে, যাতে চলমান /ask আপলোডগুলো সব কানেকশন ধরে রাখলেও নামানো আটকে না যায়।
+        """
+        return self._downloads.stream("GET", url)
+
+    async def stream_ask(self, params):
+        """
+        /ask এর উত্তর টুকরো টুকরো করে দেয় (async জেনারেটর)।
+
+        ব্যাকএন্ড SSE (text/event-stream) বা chunked লেখা পাঠালে প্রতিটি টুকরো
+        আসা মাত্রই yield হয়। সাধারণ JSON উত্তর এলে পুরো লেখাটি একবারে yield হয়।
+        """
+        params = {**params, STREAM_PARAM: "1"}
+        started = time.monotonic()
+        async with self._client.stream("GET", "/ask", params=params) as resp:
+            # স্ট্রিমের ক্ষেত্রে প্রথম রেসপন্স হেডার পর্যন্ত সময় মাপা হয়
+            _observe("STREAM", started, resp.status_code)
+            content_type = resp.headers.get("content-type", "")
+            if "text/event-stream" in content_type:
+                async for line in resp.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    # SSE নিয়ম: data: এর পরের শুধু প্রথম স্পেসটি বাদ যায়
+                    payload = line[5:]
+                    if payload.startswith(" "):
+                        payload = payload[1:]
+                    if payload == "[DONE]":
+                        break
+                    delta = _sse_delta(payload)
+                    if delta:
+                        yield delta
+            elif "application/json" in content_type:
+                body = await resp.aread()
+                try:
+                    data = json.loads(body)
+                    text = data.get("text") or data.get("output") or ""
+                except (ValueError, AttributeError):
+                    text = body.decode(resp.encoding or "utf-8", "replace")
+                if text:
+                    yield text
+            else:
+                async for delta in resp.aiter_text():
+                    if delta:
+                        yield delta
+
+    async def aclose(self):
+        await self._client.aclose()
+        await self._downloads.aclose()
+
+
+def _observe(method, started, status):
+    metrics.observe("bot_upstream_seconds", time.monotonic() - started, method=method, status=status)
+
+
+def _form_part(boundary, name, value, filename=None, content_type=None):
+    """multipart এর একটি অংশের হেডার (ফাইল হলে শুধু হেডার, ডেটা পরে আসে)"""
+    if filename is None:
+        return (
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'
+        ).encode()
+    return (
+        f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+        f"Content-Type: {content_type}\r\n\r\n"
+    ).encode()
+
+
+def _sse_delta(payload):
+    """SSE ইভেন্টের data থেকে লেখার অংশ বের করে (JSON বা সাধারণ লেখা)"""
+    try:
+        data = json.loads(payload)
+    except ValueError:
+        return payload
+    if isinstance(data, dict):
+        return data.get("delta") or data.get("text") or data.get("output") or ""
+    return data if isinstance(data, str) else ""
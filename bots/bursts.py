@@ -0,0 +1,224 @@
+import os
+import asyncio
+from collections import deque
+
+import metrics
+
+# ==========================================
+# ⚙️ কনফিগারেশন
+# ==========================================
+# একই ইউজার উত্তরের অপেক্ষায় থাকতে থাকতে আরও মেসেজ পাঠালে কী হবে:
+# "merge": টেক্সটগুলো এক প্রশ্নে জুড়ে একবার পাঠানো হয়; আগের উত্তর চলার সময় আসা
+#          মেসেজে অল্প সময় অপেক্ষা করে আরও মেসেজ জোড়া হয় (প্রথম মেসেজে কোনো দেরি নেই)
+# "cancel": নতুন মেসেজ এলে পুরনো প্রশ্নটি (চলমান হলে আপস্ট্রিম কলসহ) বাতিল হয়
+# "off": আগের মতো প্রতিটি মেসেজ আলাদাভাবে
+BURST_POLICY = os.getenv("AI_BURST_POLICY", "merge")
+# merge মোডে উত্তর চলাকালীন আসা মেসেজের পর আরও মেসেজের জন্য কত সেকেন্ড অপেক্ষা
+BURST_WINDOW = float(os.getenv("AI_BURST_WINDOW", "0.6"))
+# টাইপিং স্ট্যাটাস কত সেকেন্ড পর পর আবার পাঠানো হবে (টেলিগ্রামে ~৫ সেকেন্ড থাকে)
+ACTION_INTERVAL = 4
+
+# বাদ পড়া মেসেজের হ্যান্ডলার এটি পেলে কিছু না করে ফিরে যায়
+SKIP = object()
+
+# ==========================================
+# ✍️ চ্যাট প্রতি একটি টাইপিং লুপ
+# ==========================================
+
+async def keep_sending_action(bot, chat_id, action):
+    """টাইপিং স্ট্যাটাস বজায় রাখে"""
+    try:
+        while True:
+            await bot.send_chat_action(chat_id=chat_id, action=action)
+            await asyncio.sleep(ACTION_INTERVAL)
+    except asyncio.CancelledError:
+        pass
+
+
+class _ActionHold:
+    """hold() এর ফলাফল; cancel() দিলে এই হ্যান্ডলারের দাবি ছেড়ে দেওয়া হয় (একাধিকবার দেওয়া যায়)"""
+
+    __slots__ = ("_owner", "_chat_id", "_entry")
+
+    def __init__(self, owner, chat_id, entry):
+        self._owner = owner
+        self._chat_id = chat_id
+        self._entry = entry
+
+    def cancel(self):
+        if self._entry is not None:
+            self._owner._release(self._chat_id, self._entry)
+            self._entry = None
+
+
+class ChatActions:
+    """
+    প্রতিটি চ্যাটে সর্বোচ্চ একটি টাইপিং লুপ চলে।
+
+    একই চ্যাটের একাধিক হ্যান্ডলার hold() করলে একই লুপ ভাগ করে নেয়;
+    সবাই ছেড়ে দিলে তবেই লুপটি থামে।
+    """
+
+    def __init__(self):
+        self._chats = {}
+
+    def hold(self, bot, chat_id, action):
+        entry = self._chats.get(chat_id)
+        if entry is None:
+            task = asyncio.create_task(keep_sending_action(bot, chat_id, action))
+            entry = self._chats[chat_id] = [task, 0]
+        entry[1] += 1
+        return _ActionHold(self, chat_id, entry)
+
+    def _release(self, chat_id, entry):
+        entry[1] -= 1
+        if entry[1] <= 0:
+            entry[0].cancel()
+            if self._chats.get(chat_id) is entry:
+                del self._chats[chat_id]
+
+    def __len__(self):
+        return len(self._chats)
+
+# ==========================================
+# 🧺 ইউজারের দ্রুত পরপর মেসেজ
+# ==========================================
+
+def _burst_key(message):
+    user = message.from_user
+    return (message.chat_id, user.id if user else None)
+
+
+class BurstTracker:
+    """
+    ইউজার প্রতি অপেক্ষমাণ ও চলমান প্রশ্নের হিসাব রাখে।
+
+    ডিসপ্যাচার একই চ্যাটের আপডেট একটির পর একটি চালায়, তাই পরের মেসেজগুলো
+    হ্যান্ডলারে পৌঁছানোর আগেই note() দিয়ে (কিউ থেকে পড়ার সময়) জানানো হয়।
+    হ্যান্ডলার begin() থেকে যে টেক্সট পায় সেটিই পাঠায়; SKIP পেলে মেসেজটি
+    অন্য প্রশ্নে জুড়ে গেছে বা নতুন মেসেজে বাতিল হয়েছে।
+    """
+
+    def __init__(self, policy=None, window=None):
+        self.policy = policy or BURST_POLICY
+        self.window = BURST_WINDOW if window is None else window
+        # key -> deque[(message_id, টেক্সট বা None, উত্তর চলাকালীন এসেছে কিনা)],
+        # টেক্সট None মানে জোড়া যাবে না (ছবি)
+        self._pending = {}
+        self._absorbed = set()
+        self._inflight = {}
+        self._cancelled = set()
+        self.merged = 0
+        self.superseded = 0
+
+    @property
+    def enabled(self):
+        return self.policy in ("merge", "cancel")
+
+    def note(self, update):
+        """কিউ থেকে নতুন মেসেজ পড়ামাত্র কল হয় (হ্যান্ডলার চলার আগে)"""
+        message = update.message
+        if not self.enabled or message is None:
+            return
+        text = message.text
+        # কমান্ড আলাদা হ্যান্ডলারে যায়, সেগুলো কোনো প্রশ্নকে বাতিল বা জোড়া করে না
+        if text and text.startswith("/") or not (text or message.photo):
+            return
+        key = _burst_key(message)
+        busy = key in self._inflight
+        self._pending.setdefault(key, deque()).append((message.message_id, text, busy))
+        if self.policy == "cancel":
+            running = self._inflight.get(key)
+            if running is not None and running[0] < message.message_id and not running[1].done():
+                self._cancelled.add((key, running[0]))
+                running[1].cancel()
+                self.superseded += 1
+                metrics.inc("bot_bursts_total", result="superseded")
+
+    def _take(self, key, message_id):
+        """নিজের আগের (কখনো না চলা) ও নিজের এন্ট্রি সরিয়ে বাকি লাইনটি দেয়"""
+        pending = self._pending.get(key)
+        if pending is None:
+            return deque()
+        while pending and pending[0][0] <= message_id:
+            pending.popleft()
+        if not pending:
+            del self._pending[key]
+        return pending
+
+    async def begin(self, message, text, mergeable=True):
+        """এই মেসেজের জন্য আপস্ট্রিমে কোন প্রশ্ন যাবে; বাদ পড়লে SKIP"""
+        if not self.enabled:
+            return text
+        key = _burst_key(message)
+        if (key, message.message_id) in self._absorbed:
+            self._absorbed.discard((key, message.message_id))
+            self._take(key, message.message_id)
+            return SKIP
+
+        if self.policy == "cancel":
+            if self._take(key, message.message_id):
+                # এর পরে একই ইউজারের আরও মেসেজ আছে, শুধু শেষটির উত্তর দেওয়া হবে
+                self.superseded += 1
+                metrics.inc("bot_bursts_total", result="superseded")
+                return SKIP
+            return text
+
+        if not mergeable:
+            self._take(key, message.message_id)
+            return text
+        # ইউজার উত্তরের অপেক্ষায় থেকে আবার লিখছে, তাই আরও মেসেজ আসার সম্ভাবনা;
+        # নইলে সাথে সাথে পাঠানো হয় (এর মধ্যে আসা মেসেজ পরের প্রশ্নে জুড়বে)
+        busy = any(entry[0] == message.message_id and entry[2] for entry in self._pending.get(key, ()))
+        if busy and self.window > 0:
+            await asyncio.sleep(self.window)
+        pending = self._take(key, message.message_id)
+        parts = [text]
+        # পরপর আসা টেক্সট মেসেজগুলোই জোড়া হয়, ছবি এলে সেখানে থামে
+        while pending and pending[0][1]:
+            message_id, extra, _ = pending.popleft()
+            self._absorbed.add((key, message_id))
+            parts.append(extra)
+        if not pending:
+            self._pending.pop(key, None)
+        if len(parts) > 1:
+            self.merged += len(parts) - 1
+            metrics.inc("bot_bursts_total", len(parts) - 1, result="merged")
+        return "\n".join(parts)
+
+    def will_skip(self, message):
+        """begin() কি এই মেসেজকে SKIP দেবে (জোড়া হয়ে গেছে বা পরে নতুন মেসেজ আছে)"""
+        if not self.enabled:
+            return False
+        key = _burst_key(message)
+        if (key, message.message_id) in self._absorbed:
+            return True
+        if self.policy == "cancel":
+            return any(entry[0] > message.message_id for entry in self._pending.get(key, ()))
+        return False
+
+    def track(self, message, task):
+        """চলমান আপস্ট্রিম কাজটি মনে রাখে, যাতে cancel মোডে নতুন মেসেজ এলে বাতিল করা যায়"""
+        self._inflight[_burst_key(message)] = (message.message_id, task)
+
+    def was_cancelled(self, message):
+        """কাজটি কি নতুন মেসেজের কারণে বাতিল হয়েছে (শাটডাউনের বাতিল থেকে আলাদা করতে)"""
+        entry = (_burst_key(message), message.message_id)
+        if entry in self._cancelled:
+            self._cancelled.discard(entry)
+            return True
+        return False
+
+    def done(self, message):
+        key = _burst_key(message)
+        running = self._inflight.get(key)
+        if running is not None and running[0] == message.message_id:
+            del self._inflight[key]
+
+    def stats(self):
+        return {
+            "policy": self.policy,
+            "merged": self.merged,
+            "superseded": self.superseded,
+            "pending_users": len(self._pending),
+        }
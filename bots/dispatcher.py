@@ -0,0 +1,167 @@
+import os
+import time
+import asyncio
+from collections import deque
+
+import metrics
+
+# ==========================================
+# ⚙️ কনফিগারেশন
+# ==========================================
+# একসাথে সর্বোচ্চ কতগুলো আপডেট প্রসেস হবে (সব চ্যাট মিলিয়ে)
+MAX_CONCURRENCY = int(os.getenv("BOT_MAX_CONCURRENCY", "64"))
+# একটি চ্যাটের জন্য সর্বোচ্চ কতগুলো আপডেট লাইনে অপেক্ষা করতে পারবে
+MAX_CHAT_BACKLOG = int(os.getenv("BOT_CHAT_BACKLOG", "20"))
+# বন্ধ হওয়ার সময় চলমান আপডেটগুলো শেষ করতে কত সেকেন্ড দেওয়া হবে
+DRAIN_TIMEOUT = float(os.getenv("BOT_DRAIN_TIMEOUT", "10"))
+
+# ==========================================
+# 🚦 চ্যাট-ভিত্তিক ডিসপ্যাচার
+# ==========================================
+
+def chat_key(update):
+    """আপডেটটি কোন চ্যাটের লাইনে যাবে তা নির্ধারণ করে"""
+    if update.effective_chat:
+        return update.effective_chat.id
+    if update.effective_user:
+        return ("user", update.effective_user.id)
+    # চ্যাট বা ইউজার না থাকলে আপডেটটি নিজের আলাদা লাইনে চলবে
+    return ("update", update.update_id)
+
+
+def handler_name(application, update):
+    """আপডেটটি কোন হ্যান্ডলারে যাবে (মেট্রিক্সের লেবেলের জন্য)"""
+    for handlers in application.handlers.values():
+        for handler in handlers:
+            if handler.check_update(update):
+                return getattr(handler.callback, "__name__", type(handler).__name__)
+    return "unhandled"
+
+
+class ChatDispatcher:
+    """
+    ভিন্ন ভিন্ন চ্যাটের আপডেট একসাথে (concurrently) চালায়,
+    কিন্তু একই chat_id এর আপডেটগুলো আসার ক্রমেই একটির পর একটি চলে।
+
+    - max_concurrency: সব চ্যাট মিলিয়ে একসাথে চলমান হ্যান্ডলারের সীমা
+    - max_chat_backlog: এক চ্যাটের লাইনে (চলমানটি সহ) সর্বোচ্চ আপডেট
+    - on_done: প্রতিটি আপডেট শেষ বা বাদ হলে তার ট্রেস দিয়ে কল হয় (যেমন bridge.ack)
+    - admit: async admit(update, handler); সেমাফোরের জায়গা নেওয়ার আগে কল হয়।
+      False দিলে আপডেটটি বাদ (সম্পন্ন) ধরা হয়, নইলে ফলাফলটি (যেমন AI এর টিকিট)
+      হ্যান্ডলার শেষে release() হয়। ফলে ভর্তির অপেক্ষায় থাকা আপডেট অন্য চ্যাটের
+      /start বা /limits এর জায়গা আটকে রাখে না
+    """
+
+    def __init__(self, application, max_concurrency=None, max_chat_backlog=None, name="Bot", on_done=None,
+                 admit=None):
+        self._application = application
+        self._name = name
+        self._on_done = on_done
+        self._admit = admit
+        self._semaphore = asyncio.Semaphore(max_concurrency or MAX_CONCURRENCY)
+        self._max_chat_backlog = max_chat_backlog or MAX_CHAT_BACKLOG
+        self._chats = {}
+        self._tasks = set()
+        # join() সময়সীমা পেরিয়ে লাইনগুলো বাতিল করছে
+        self._cancelling = False
+        self.dropped = 0
+        metrics.gauge_callback("bot_dispatcher_pending", lambda: self.pending)
+
+    @property
+    def pending(self):
+        """সব চ্যাটের লাইনে মোট অপেক্ষমাণ/চলমান আপডেট"""
+        return sum(len(lane) for lane in self._chats.values())
+
+    def submit(self, update, trace=None):
+        """আপডেটটি তার চ্যাটের লাইনে যোগ করে; লাইন ভর্তি থাকলে False দেয়"""
+        key = chat_key(update)
+        lane = self._chats.get(key)
+
+        if lane is None:
+            lane = self._chats[key] = deque(((update, trace),))
+            task = asyncio.create_task(self._run_lane(key, lane))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+            return True
+
+        if len(lane) >= self._max_chat_backlog:
+            self.dropped += 1
+            metrics.inc("bot_dispatcher_dropped_total")
+            print(f"{self._name} Dispatcher: chat {key} backlog full, update {update.update_id} dropped")
+            self._done(trace)
+            return False
+
+        lane.append((update, trace))
+        return True
+
+    async def _run_lane(self, key, lane):
+        try:
+            while lane:
+                update, trace = lane[0]
+                handler = handler_name(self._application, update)
+                ticket = await self._admission(update, handler)
+                if ticket is False:
+                    self._done(trace)
+                    lane.popleft()
+                    continue
+                async with self._semaphore:
+                    trace = trace or metrics.Trace()
+                    trace.started = time.time()
+                    # হ্যান্ডলারের ভেতরের AI কল ও টেলিগ্রাম সেন্ড এই ট্রেসে লেখা হয়
+                    token = metrics.current_trace.set(trace)
+                    try:
+                        await self._application.process_update(update)
+                    except asyncio.CancelledError as e:
+                        if self._cancelling:
+                            raise
+                        # লাইনটি বাতিল হয়নি; হ্যান্ডলারের ভেতরের কোনো কাজ বাতিল হয়ে এখানে
+                        # উঠে এসেছে। হ্যান্ডলারের ত্রুটি ধরে লাইনের বাকি আপডেট চলতে থাকে
+                        metrics.inc("bot_handler_errors_total", handler=handler)
+                        print(f"{self._name} Handler Error: cancelled ({e!r})")
+                    except Exception as e:
+                        metrics.inc("bot_handler_errors_total", handler=handler)
+                        print(f"{self._name} Handler Error: {e}")
+                    finally:
+                        metrics.current_trace.reset(token)
+                        trace.finish(handler)
+                        if ticket is not None:
+                            ticket.release()
+                # বাতিল (শাটডাউনের সময়সীমা পেরোনো) আপডেট সম্পন্ন ধরা হয় না, লগ থেকে আবার চলবে
+                self._done(trace)
+                lane.popleft()
+        finally:
+            self._chats.pop(key, None)
+
+    async def _admission(self, update, handler):
+        if self._admit is None:
+            return None
+        try:
+            return await self._admit(update, handler)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # ভর্তি যাচাই ভেঙে গেলে আপডেটটি আটকে না রেখে চালিয়ে দেওয়া হয়
+            print(f"{self._name} Dispatcher: admit failed: {e}")
+            return None
+
+    def _done(self, trace):
+        if self._on_done is not None:
+            try:
+                self._on_done(trace)
+            except Exception as e:
+                print(f"{self._name} Dispatcher: on_done failed: {e}")
+
+    async def join(self, timeout=None):
+        """চলমান সব চ্যাট লাইন শেষ হওয়া পর্যন্ত অপেক্ষা করে; সময়সীমা পেরোলে বাকিগুলো বাতিল হয়"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + (timeout or DRAIN_TIMEOUT)
+        while self._tasks:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                print(f"{self._name} Dispatcher: drain timeout, cancelling {self.pending} updates")
+                self._cancelling = True
+                for task in list(self._tasks):
+                    task.cancel()
+                await asyncio.gather(*list(self._tasks), return_exceptions=True)
+                break
+            await asyncio.wait(list(self._tasks), timeout=remaining)
@@ -0,0 +1,24 @@
+import time
+import asyncio
+
+import metrics
+
+# ==========================================
+# 💓 ওয়ার্কার হার্টবিট
+# ==========================================
+
+async def heartbeat_loop(probe, interval=1.0):
+    """
+    প্রতি interval সেকেন্ডে probe এ হার্টবিট, ইভেন্ট লুপের ল্যাগ এবং
+    এই প্রসেসের মেট্রিক্স স্ন্যাপশট লেখে।
+
+    ইভেন্ট লুপ আটকে গেলে এই টাস্কও চলে না, ফলে হার্টবিট পুরনো হয়ে যায় এবং
+    সুপারভাইজার ওয়ার্কারটিকে আটকে যাওয়া হিসেবে ধরে রিস্টার্ট করে।
+    """
+    probe.heartbeat.value = time.time()
+    while True:
+        started = time.monotonic()
+        await asyncio.sleep(interval)
+        probe.loop_lag.value = max(0.0, time.monotonic() - started - interval)
+        probe.heartbeat.value = time.time()
+        metrics.publish(probe.metrics)
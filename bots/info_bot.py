@@ -1,8 +1,10 @@
 import os
 import asyncio
-import queue
 from telegram import Update
-from telegram.ext import Application, CommandHandler, MessageHandler, filters, ContextTypes
+from telegram.ext import CommandHandler, MessageHandler, filters, ContextTypes
+
+from bots.telegram_app import build_application
+from bots.runner import bot_loop
 
 # ==========================================
 # ⚙️ কনফিগারেশন
@@ -46,27 +48,12 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
 # 🔄 ব্যাকগ্রাউন্ড লুপ
 # ==========================================
 
-async def bot_loop(application, local_queue):
-    print("ℹ️ Info Bot Process Started...")
-    await application.initialize()
-    await application.start()
-    
-    while True:
-        try:
-            update_data = local_queue.get(timeout=1)
-            if update_data:
-                update = Update.de_json(update_data, application.bot)
-                await application.process_update(update)
-        except queue.Empty:
-            continue
-        except Exception as e:
-            print(f"Info Bot Error: {e}")
 
 # ==========================================
 # 🚀 রানার ফাংশন
 # ==========================================
 
-def run_bot(input_queue):
+def run_bot(input_queue, probe=None):
     if not TOKEN:
         print("❌ Info Bot Token Missing!")
         return
@@ -74,7 +61,7 @@ def run_bot(input_queue):
     loop = asyncio.new_event_loop()
     asyncio.set_event_loop(loop)
     
-    app = Application.builder().token(TOKEN).build()
+    app = build_application(TOKEN, probe)
     
     # হ্যান্ডলার যুক্ত করা
     app.add_handler(CommandHandler("start", start))
@@ -82,6 +69,7 @@ def run_bot(input_queue):
     app.add_handler(CommandHandler("echo", echo_command))
     app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, handle_message))
     
-    loop.run_until_complete(bot_loop(app, input_queue))
+    print("ℹ️ Info Bot Process Started...")
+    loop.run_until_complete(bot_loop(app, input_queue, probe, name="Info Bot"))
 
 
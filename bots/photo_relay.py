@@ -0,0 +1,81 @@
+import io
+import os
+import asyncio
+
+try:
+    # Pillow ইনস্টল থাকলে ছবি নিজে ছোট করা যায় (AI_PHOTO_RESIZE=1)
+    from PIL import Image
+except ImportError:
+    Image = None
+
+# ==========================================
+# ⚙️ কনফিগারেশন
+# ==========================================
+# ছবির লম্বা দিক সর্বোচ্চ কত পিক্সেল হবে (0 = টেলিগ্রামের সবচেয়ে বড় সাইজ)
+PHOTO_MAX_SIDE = int(os.getenv("AI_PHOTO_MAX_SIDE", "0"))
+# 1 হলে সীমার চেয়ে বড় সবচেয়ে ছোট সাইজটি নামিয়ে Pillow দিয়ে ঠিক সীমায় ছোট করা হয়;
+# 0 হলে শুধু টেলিগ্রামের তৈরি করা সাইজগুলো থেকে বেছে নেওয়া হয় (কোনো বাফারিং নেই)
+PHOTO_RESIZE = os.getenv("AI_PHOTO_RESIZE", "0") == "1"
+# ডাউনলোড থেকে আপলোডে একবারে কত বাইট করে পাঠানো হবে
+CHUNK_SIZE = 64 * 1024
+
+# ==========================================
+# 🖼️ ছবি রিলে (টেলিগ্রাম → AI ব্যাকএন্ড)
+# ==========================================
+
+def _side(photo):
+    return max(photo.width, photo.height)
+
+
+def pick_photo_size(sizes, max_side=None, resize=None):
+    """
+    msg.photo এর PhotoSize গুলো থেকে কোনটি পাঠানো হবে তা বেছে নেয়।
+
+    - সীমা না থাকলে সবচেয়ে বড়টি
+    - resize চালু থাকলে সীমার সমান বা বড় সবচেয়ে ছোটটি (পরে ছোট করা হবে)
+    - না হলে সীমার মধ্যে থাকা সবচেয়ে বড়টি (না থাকলে সবচেয়ে ছোটটি)
+    """
+    max_side = PHOTO_MAX_SIDE if max_side is None else max_side
+    resize = (PHOTO_RESIZE and Image is not None) if resize is None else resize
+    ordered = sorted(sizes, key=lambda photo: photo.width * photo.height)
+    if not max_side:
+        return ordered[-1]
+    if resize:
+        return next((photo for photo in ordered if _side(photo) >= max_side), ordered[-1])
+    fitting = [photo for photo in ordered if _side(photo) <= max_side]
+    return fitting[-1] if fitting else ordered[0]
+
+
+def _downscale(raw, max_side):
+    with Image.open(io.BytesIO(raw)) as image:
+        image.thumbnail((max_side, max_side))
+        out = io.BytesIO()
+        image.convert("RGB").save(out, "JPEG", quality=90)
+    return out.getvalue()
+
+
+async def relay_photo(ai_client, sizes, data):
+    """
+    ছবিটি টেলিগ্রাম থেকে নামানোর সাথে সাথেই /ask এ multipart আপলোডে পাঠায়।
+    ডাউনলোডের প্রতিটি অংশ সরাসরি আপলোডে যায়, তাই প্রতি রিকোয়েস্টে মেমরিতে
+    মাত্র কয়েকটি CHUNK_SIZE অংশ থাকে, পুরো ছবি নয়।
+    """
+    photo = pick_photo_size(sizes)
+    tg_file = await photo.get_file()
+    resize = PHOTO_RESIZE and Image is not None and PHOTO_MAX_SIDE and _side(photo) > PHOTO_MAX_SIDE
+
+    async with ai_client.download(tg_file.file_path) as resp:
+        resp.raise_for_status()
+
+        if resize:
+            # ছোট করতে পুরো ছবি ডিকোড করতে হয়, তাই এই পথে বাফারিং লাগে
+            raw = await resp.aread()
+            image_bytes = await asyncio.to_thread(_downscale, raw, PHOTO_MAX_SIDE)
+            return await ai_client.ask_post(data, files={"image": ("image.jpg", image_bytes, "image/jpeg")})
+
+        # এনকোডিং না থাকলে কাঁচা বাইটই ফাইল, আর দৈর্ঘ্যও আগে থেকে জানা
+        if "content-encoding" not in resp.headers and "content-length" in resp.headers:
+            chunks, size = resp.aiter_raw(CHUNK_SIZE), int(resp.headers["content-length"])
+        else:
+            chunks, size = resp.aiter_bytes(CHUNK_SIZE), None
+        return await ai_client.ask_post_file(data, "image", "image.jpg", "image/jpeg", chunks, size)
@@ -0,0 +1,165 @@
+import json
+import signal
+import asyncio
+import queue
+import threading
+from collections import deque
+from multiprocessing.connection import wait
+
+import metrics
+
+try:
+    # orjson থাকলে অনেক দ্রুত এবং কম অ্যালোকেশনে পার্স হয়
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+# ==========================================
+# 🌉 মাল্টিপ্রসেসিং কিউ → asyncio ব্রিজ
+# ==========================================
+
+def decode_update(payload):
+    """ওয়েব হুক থেকে আসা কাঁচা বাইট (বা আগের মতো dict) কে dict এ রূপান্তর করে"""
+    if isinstance(payload, (bytes, bytearray, str)):
+        return _loads(payload)
+    return payload
+
+
+class AsyncQueueBridge:
+    """
+    app.py থেকে আসা multiprocessing.Queue কে awaitable স্ট্রিমে রূপান্তর করে।
+
+    একটি আলাদা রিডার থ্রেড কিউতে ডেটা আসার অপেক্ষা করে এবং প্রতিটি আপডেট
+    call_soon_threadsafe দিয়ে ইভেন্ট লুপের asyncio.Queue-তে তুলে দেয়।
+    ফলে ইভেন্ট লুপ কখনো ইনগ্রেসের জন্য ব্লক হয় না, আর আপডেট আসা মাত্রই
+    (টাইমআউটের অপেক্ষা ছাড়া) হ্যান্ডলারে পৌঁছে যায়।
+
+    probe (ingress.WorkerSlot) দেওয়া থাকলে সুপারভাইজারের stop সিগন্যালে
+    রিডার থেমে যায় এবং released জানায়, যাতে কিউয়ের লক ধরে থাকা অবস্থায়
+    প্রসেসটি কখনো মারা না পড়ে। বাফারের আপডেটগুলো দেওয়া শেষ হলে
+    async for লুপটিও শেষ হয়। drain (probe এর বা SIGTERM এ drain()) হলে কিউ খালি
+    হওয়া পর্যন্ত পড়া চলে, তারপর একইভাবে থামে।
+
+    probe এ ইনগ্রেস লগ (journal) থাকলে শুরুতে লগের অসম্পন্ন আপডেটগুলো আগে
+    দেওয়া হয়, আর কিউতে থাকা সেগুলোর কপি বাদ পড়ে। প্রতিটি আপডেটের কাজ শেষে
+    ack(trace) কল করতে হয়।
+    """
+
+    def __init__(self, source, buffer_size=4, poll_interval=0.5, probe=None):
+        self._source = source
+        self._probe = probe
+        self._journal = getattr(probe, "journal", None)
+        self._replayed = deque()
+        self._poll_interval = poll_interval
+        self._items = asyncio.Queue()
+        # লোকাল বাফার সীমিত রাখা হয়, যাতে প্রসেস কিউয়ের ব্যাকপ্রেশার হারিয়ে না যায়
+        self._slots = threading.Semaphore(buffer_size)
+        self._stopping = threading.Event()
+        self._draining = threading.Event()
+        self._loop = None
+        self._thread = None
+
+    def start(self):
+        """রানিং ইভেন্ট লুপের ভেতর থেকে রিডার থ্রেড চালু করে"""
+        self._loop = asyncio.get_running_loop()
+        if self._journal is not None:
+            self._replayed.extend(self._journal.replay())
+            if self._replayed:
+                print(f"📜 Replaying {len(self._replayed)} unfinished updates from the ingress log")
+            metrics.gauge_callback("bot_ingress_log_lag_bytes", self._journal.lag)
+        # daemon নয়: প্রসেস বন্ধের সময়ও রিডার নিজে থেকে থেমে কিউয়ের লক ছেড়ে দেয়
+        self._thread = threading.Thread(target=self._reader, name="QueueBridge")
+        self._thread.start()
+
+    def drain_on_signals(self, signals=(signal.SIGTERM, signal.SIGINT)):
+        """এই সিগন্যালগুলো এলে প্রসেস মারা না গিয়ে কিউ খালি করে গুছিয়ে বন্ধ হয়"""
+        for sig in signals:
+            self._loop.add_signal_handler(sig, self.drain)
+
+    def drain(self):
+        """কিউতে যা আছে পড়ে শেষ করে তারপর থামে"""
+        self._draining.set()
+
+    def _drained(self):
+        # কিউ খালি পাওয়া গেছে; drain চলাকালে এখানেই থামা হয়
+        return self._draining.is_set() or (self._probe is not None and self._probe.drain.is_set())
+
+    def _should_stop(self):
+        if self._stopping.is_set() or not threading.main_thread().is_alive():
+            return True
+        return self._probe is not None and self._probe.stop.is_set()
+
+    def _reader(self):
+        try:
+            self._read_loop()
+        finally:
+            if self._probe is not None:
+                self._probe.released.set()
+            # হাতে থাকা আপডেটগুলোর পরে None দিয়ে স্ট্রিম শেষ হওয়া জানানো হয়
+            try:
+                self._loop.call_soon_threadsafe(self._items.put_nowait, None)
+            except RuntimeError:
+                pass
+
+    def _read_loop(self):
+        while not self._should_stop():
+            if not self._slots.acquire(timeout=self._poll_interval):
+                continue
+            try:
+                # লক না ধরেই ডেটা আসার অপেক্ষা (stdlib এর ProcessPoolExecutor ও একইভাবে
+                # _reader এ wait() করে); লক শুধু get_nowait() এর মুহূর্তটুকু ধরা থাকে,
+                # তাই প্রসেস হঠাৎ মারা গেলেও কিউয়ের লক আটকে থাকে না
+                if not wait([self._source._reader], timeout=self._poll_interval):
+                    self._slots.release()
+                    if self._drained():
+                        break
+                    continue
+                item = self._source.get_nowait()
+                if self._journal is not None and self._journal.replayed(metrics.offset_of(item)):
+                    # লগ থেকে আগেই চালানো হয়েছে
+                    self._slots.release()
+                    continue
+            except queue.Empty:
+                self._slots.release()
+                continue
+            except (EOFError, OSError):
+                # প্যারেন্ট প্রসেসের কিউ বন্ধ হয়ে গেছে
+                self._slots.release()
+                break
+            try:
+                self._loop.call_soon_threadsafe(self._items.put_nowait, item)
+            except RuntimeError:
+                # ইভেন্ট লুপ বন্ধ হয়ে গেছে
+                break
+
+    async def get(self):
+        """পরবর্তী আপডেটের জন্য অপেক্ষা করে (লুপ ব্লক না করে); রিডার থেমে গেলে None"""
+        if self._replayed:
+            return self._replayed.popleft()
+        item = await self._items.get()
+        if item is None:
+            self._items.put_nowait(None)
+            return None
+        self._slots.release()
+        return item
+
+    def ack(self, trace):
+        """আপডেটটির কাজ শেষ (বা বাদ দেওয়া হয়েছে); লগে সম্পন্ন হিসেবে লেখা হয়"""
+        if self._journal is not None and trace is not None and trace.offset is not None:
+            self._journal.ack(trace.offset, trace.end)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        item = await self.get()
+        if item is None:
+            raise StopAsyncIteration
+        return item
+
+    async def close(self):
+        """রিডার থ্রেড থামিয়ে দেয়"""
+        self._stopping.set()
+        if self._thread is not None:
+            await asyncio.to_thread(self._thread.join)
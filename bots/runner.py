@@ -0,0 +1,54 @@
+import asyncio
+from telegram import Update
+
+from bots.queue_bridge import AsyncQueueBridge, decode_update
+from bots.dispatcher import ChatDispatcher
+from bots.heartbeat import heartbeat_loop
+from metrics import open_envelope
+
+# ==========================================
+# 🔄 সব বটের ব্যাকগ্রাউন্ড লুপ
+# ==========================================
+
+async def bot_loop(application, local_queue, probe=None, name="Bot", on_update=None, admit=None):
+    """
+    local_queue: app.py থেকে আসা মাল্টিপ্রসেসিং কিউ
+    probe: সুপারভাইজারের হেলথ প্রোব (ingress.WorkerSlot)
+    on_update: প্রতিটি আপডেট ডিসপ্যাচারে দেওয়ার ঠিক আগে কল হয় (যেমন AI বটের bursts.note)
+    admit: ডিসপ্যাচারের জায়গা নেওয়ার আগে ভর্তি যাচাই (যেমন AI বটের admit_update)
+    """
+    await application.initialize()
+    await application.start()
+
+    # app.py থেকে পাঠানো কিউ নন-ব্লকিং ব্রিজ দিয়ে পড়া হচ্ছে
+    bridge = AsyncQueueBridge(local_queue, probe=probe)
+    bridge.start()
+    # SIGTERM/SIGINT এ হঠাৎ মারা না গিয়ে কিউ ও চলমান আপডেট শেষ করে বন্ধ হয়
+    bridge.drain_on_signals()
+
+    # সুপারভাইজারকে জানানো হয় যে এই প্রসেসের ইভেন্ট লুপ সচল আছে
+    if probe is not None:
+        heartbeat_task = asyncio.create_task(heartbeat_loop(probe))
+
+    # ভিন্ন চ্যাটের আপডেট একসাথে চলবে, একই চ্যাটের আপডেট ক্রম মেনে
+    dispatcher = ChatDispatcher(application, name=name, on_done=bridge.ack, admit=admit)
+
+    async for item in bridge:
+        # ওয়েব হুক থেকে আসা সময়গুলো নিয়ে আপডেটের ট্রেস শুরু হয়
+        update_data, trace = open_envelope(item)
+        try:
+            update = Update.de_json(decode_update(update_data), application.bot)
+            if on_update is not None:
+                on_update(update)
+            dispatcher.submit(update, trace)
+        except Exception as e:
+            print(f"{name} Loop Error: {e}")
+            # চালানো যায়নি, তবু লগে সম্পন্ন ধরা হয় যাতে রিস্টার্টে বারবার না আসে
+            bridge.ack(trace)
+
+    # স্টপ সিগন্যাল পেলে হাতে থাকা আপডেটগুলো শেষ করে প্রসেস বন্ধ হয়
+    await dispatcher.join()
+    if probe is not None:
+        heartbeat_task.cancel()
+    await application.stop()
+    await application.shutdown()
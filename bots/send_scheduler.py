@@ -0,0 +1,184 @@
+import os
+import time
+import asyncio
+from telegram.error import RetryAfter
+from telegram.ext import BaseRateLimiter
+
+import metrics
+from bots.token_bucket import TokenBucket
+
+# ==========================================
+# ⚙️ কনফিগারেশন
+# ==========================================
+# টেলিগ্রামের সীমা: একটি বট সেকেন্ডে ~৩০টি, একটি চ্যাটে সেকেন্ডে ~১টি,
+# আর গ্রুপে মিনিটে ~২০টি মেসেজ পাঠাতে পারে
+GLOBAL_RATE = float(os.getenv("TG_GLOBAL_RATE", "25"))
+GLOBAL_BURST = float(os.getenv("TG_GLOBAL_BURST", "30"))
+CHAT_RATE = float(os.getenv("TG_CHAT_RATE", "1"))
+CHAT_BURST = float(os.getenv("TG_CHAT_BURST", "3"))
+GROUP_RATE = float(os.getenv("TG_GROUP_RATE", str(20 / 60)))
+GROUP_BURST = float(os.getenv("TG_GROUP_BURST", "5"))
+# 429 (flood control) পেলে একটি রিকোয়েস্ট সর্বোচ্চ কতবার আবার চেষ্টা হবে
+MAX_RETRIES = int(os.getenv("TG_MAX_RETRIES", "3"))
+
+# এই সংখ্যার বেশি চ্যাটের বাকেট জমলে অলস বাকেটগুলো মুছে ফেলা হয়
+_MAX_CHAT_BUCKETS = 10000
+
+
+def _retry_seconds(error):
+    # PTB এর নতুন ভার্সনে retry_after timedelta হতে পারে
+    retry_after = error.retry_after
+    return retry_after.total_seconds() if hasattr(retry_after, "total_seconds") else float(retry_after)
+
+# ==========================================
+# 📤 আউটবাউন্ড শিডিউলার
+# ==========================================
+
+class OutboundScheduler(BaseRateLimiter):
+    """
+    একটি বটের সব Bot API কল এর ভেতর দিয়ে যায় (Application.builder().rate_limiter)।
+
+    - গ্লোবাল ও চ্যাট-ভিত্তিক টোকেন বাকেট দিয়ে পাঠানোর হার নিয়ন্ত্রণ করে
+    - 429 এলে retry_after পর্যন্ত পুরো বটের পাঠানো থামিয়ে আবার চেষ্টা করে
+    - একই চ্যাটে একসাথে একটির বেশি chat action যায় না
+    - রিপ্লাই অপেক্ষায় থাকলে বা টোকেন না থাকলে টাইপিং পিং বাদ পড়ে,
+      কারণ সেগুলো শুধু সৌজন্যমূলক; রিপ্লাই কখনো বাদ পড়ে না
+    - workers (শেয়ার্ড কাউন্টার) দেওয়া থাকলে বটের গ্লোবাল সীমা সচল ওয়ার্কারদের
+      মধ্যে ভাগ হয়; চ্যাটের সীমা ভাগ হয় না, কারণ একটি চ্যাট একটি ওয়ার্কারেই থাকে
+    """
+
+    def __init__(self, global_rate=None, global_burst=None, chat_rate=None, chat_burst=None, max_retries=None, workers=None):
+        self._global_rate = global_rate or GLOBAL_RATE
+        self._global_burst = global_burst or GLOBAL_BURST
+        self._global = TokenBucket(self._global_rate, self._global_burst)
+        self._workers = workers
+        self._chat_rate = chat_rate or CHAT_RATE
+        self._chat_burst = chat_burst or CHAT_BURST
+        self._max_retries = MAX_RETRIES if max_retries is None else max_retries
+        self._chats = {}
+        self._actions_in_flight = set()
+        self._waiting_replies = 0
+        self._paused_until = 0.0
+        self.sent = 0
+        self.dropped_actions = 0
+        self.flood_waits = 0
+
+    async def initialize(self):
+        pass
+
+    async def shutdown(self):
+        pass
+
+    def _sync_share(self):
+        count = max(1, self._workers.value)
+        self._global.rate = self._global_rate / count
+        self._global.capacity = max(1.0, self._global_burst / count)
+
+    def _chat_bucket(self, chat_id):
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            if len(self._chats) >= _MAX_CHAT_BUCKETS:
+                self._chats = {key: value for key, value in self._chats.items() if not value.idle}
+            # নেগেটিভ chat_id মানে গ্রুপ/চ্যানেল, সেখানে সীমা আরও কড়া
+            is_group = isinstance(chat_id, str) or chat_id < 0
+            bucket = self._chats[chat_id] = (
+                TokenBucket(GROUP_RATE, GROUP_BURST) if is_group
+                else TokenBucket(self._chat_rate, self._chat_burst)
+            )
+        return bucket
+
+    async def _wait_for_slot(self, chat_bucket):
+        while True:
+            pause = self._paused_until - time.monotonic()
+            if pause > 0:
+                await asyncio.sleep(pause)
+                continue
+            wait = max(self._global.delay(), chat_bucket.delay() if chat_bucket else 0.0)
+            if wait > 0:
+                await asyncio.sleep(wait)
+                continue
+            self._global.try_acquire()
+            if chat_bucket:
+                chat_bucket.try_acquire()
+            return
+
+    def _try_action_slot(self, chat_bucket):
+        if self._waiting_replies or self._paused_until > time.monotonic():
+            return False
+        if self._global.delay() > 0 or chat_bucket.delay() > 0:
+            return False
+        # চ্যাটের টোকেন রিপ্লাইয়ের জন্য রেখে দেওয়া হয়, তাই শুধু গ্লোবাল টোকেন খরচ হয়
+        self._global.try_acquire()
+        return True
+
+    async def process_request(self, callback, args, kwargs, endpoint, data, rate_limit_args):
+        if self._workers is not None:
+            self._sync_share()
+        chat_id = data.get("chat_id")
+        chat_bucket = self._chat_bucket(chat_id) if chat_id is not None else None
+
+        if endpoint == "sendChatAction" and chat_id is not None:
+            return await self._send_action(callback, args, kwargs, chat_id, chat_bucket)
+
+        attempt = 0
+        while True:
+            # অপেক্ষমাণ রিপ্লাই থাকলে টাইপিং পিং জায়গা ছেড়ে দেয়
+            self._waiting_replies += 1
+            try:
+                await self._wait_for_slot(chat_bucket)
+            finally:
+                self._waiting_replies -= 1
+            # প্রথম রিপ্লাই কখন গেল তা আপডেটের ট্রেসে লেখা হয়
+            metrics.mark_send()
+            try:
+                result = await self._timed(callback, args, kwargs, endpoint)
+                self.sent += 1
+                return result
+            except RetryAfter as e:
+                self._pause(e)
+                if attempt >= self._max_retries:
+                    raise
+                attempt += 1
+
+    async def _send_action(self, callback, args, kwargs, chat_id, chat_bucket):
+        if chat_id in self._actions_in_flight or not self._try_action_slot(chat_bucket):
+            self.dropped_actions += 1
+            return True
+        self._actions_in_flight.add(chat_id)
+        try:
+            result = await self._timed(callback, args, kwargs, "sendChatAction")
+            self.sent += 1
+            return result
+        except RetryAfter as e:
+            self._pause(e)
+            self.dropped_actions += 1
+            return True
+        finally:
+            self._actions_in_flight.discard(chat_id)
+
+    async def _timed(self, callback, args, kwargs, endpoint):
+        started = time.monotonic()
+        status = "error"
+        try:
+            result = await callback(*args, **kwargs)
+            status = "ok"
+            return result
+        except RetryAfter:
+            status = "retry_after"
+            raise
+        finally:
+            metrics.observe("bot_telegram_seconds", time.monotonic() - started, endpoint=endpoint, status=status)
+
+    def _pause(self, error):
+        self.flood_waits += 1
+        seconds = _retry_seconds(error)
+        print(f"⏳ Flood control: pausing outbound sends for {seconds:.0f}s")
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def stats(self):
+        return {
+            "sent": self.sent,
+            "dropped_actions": self.dropped_actions,
+            "flood_waits": self.flood_waits,
+            "waiting_replies": self._waiting_replies,
+        }
@@ -0,0 +1,172 @@
+import os
+import time
+import sqlite3
+import asyncio
+import threading
+
+# ==========================================
+# ⚙️ কনফিগারেশন
+# ==========================================
+# "sqlite" (স্থায়ী, একাধিক প্রসেস শেয়ার করতে পারে) অথবা "memory"
+SESSION_STORE = os.getenv("SESSION_STORE", "sqlite")
+SESSION_DB_PATH = os.getenv("SESSION_DB_PATH", "sessions.db")
+# write-behind: এত সেকেন্ড পর পর বা এতগুলো পরিবর্তন জমলে ডিস্কে লেখা হবে
+FLUSH_INTERVAL = float(os.getenv("SESSION_FLUSH_INTERVAL", "1"))
+FLUSH_BATCH = int(os.getenv("SESSION_FLUSH_BATCH", "100"))
+# অন্য ওয়ার্কার প্রসেস সেশন বদলালে এত সেকেন্ডের মধ্যে এই প্রসেসও তা দেখবে
+CACHE_TTL = float(os.getenv("SESSION_CACHE_TTL", "30"))
+
+_MISSING = object()
+
+# ==========================================
+# 🗄️ সেশন স্টোর
+# ==========================================
+
+class SessionStore:
+    """
+    ইউজারের (real_uid -> session_id) ম্যাপিং রাখার ইন্টারফেস।
+    হ্যান্ডলারগুলো ডিকশনারির মতো get() / store[uid] = sid ব্যবহার করে।
+    """
+
+    def get(self, user_id, default=None):
+        raise NotImplementedError
+
+    async def lookup(self, user_id, default=None):
+        """ইভেন্ট লুপ থেকে ব্যবহারের জন্য get(); ডিস্কে যেতে হলে লুপ ব্লক করে না"""
+        return self.get(user_id, default)
+
+    def __setitem__(self, user_id, session_id):
+        raise NotImplementedError
+
+    def flush(self):
+        """জমে থাকা পরিবর্তন স্থায়ীভাবে লিখে ফেলে"""
+
+    def close(self):
+        self.flush()
+
+
+class MemorySessionStore(SessionStore):
+    """আগের মতো শুধু প্রসেসের মেমরিতে রাখা সেশন (রিস্টার্টে হারিয়ে যায়)"""
+
+    def __init__(self):
+        self._sessions = {}
+
+    def get(self, user_id, default=None):
+        return self._sessions.get(user_id, default)
+
+    def __setitem__(self, user_id, session_id):
+        self._sessions[user_id] = session_id
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    SQLite (WAL মোড) ভিত্তিক স্থায়ী সেশন স্টোর।
+
+    - read-through ক্যাশ: ডিস্ক থেকে পড়া সেশন CACHE_TTL পর্যন্ত মেমরিতে O(1) এ মেলে;
+      না-পাওয়া (None) মনে রাখা হয় না, যাতে অন্য প্রসেসের নতুন সেশন সাথে সাথে দেখা যায়
+    - write-behind: নতুন সেশন সাথে সাথে ক্যাশে বসে, আর একটি ব্যাকগ্রাউন্ড থ্রেড
+      ব্যাচ করে একটি ট্রানজেকশনে ডিস্কে লেখে
+    """
+
+    def __init__(self, path=None, flush_interval=None, flush_batch=None, cache_ttl=None):
+        self._flush_interval = FLUSH_INTERVAL if flush_interval is None else flush_interval
+        self._flush_batch = FLUSH_BATCH if flush_batch is None else flush_batch
+        self._cache_ttl = CACHE_TTL if cache_ttl is None else cache_ttl
+        self._cache = {}
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+
+        self._db = sqlite3.connect(path or SESSION_DB_PATH, check_same_thread=False, timeout=10)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            "user_id INTEGER PRIMARY KEY, session_id TEXT NOT NULL)"
+        )
+        self._db.commit()
+
+        self._flusher = threading.Thread(target=self._flush_loop, name="SessionFlusher", daemon=True)
+        self._flusher.start()
+
+    def _cached(self, user_id):
+        entry = self._cache.get(user_id)
+        if entry is None or entry[1] < time.monotonic():
+            return _MISSING
+        return entry[0]
+
+    def _load(self, user_id):
+        with self._lock:
+            # এখনো ডিস্কে না লেখা পরিবর্তনই সবচেয়ে নতুন
+            value = self._pending.get(user_id)
+            if value is None:
+                row = self._db.execute(
+                    "SELECT session_id FROM sessions WHERE user_id = ?", (user_id,)
+                ).fetchone()
+                value = row[0] if row else None
+        if value is not None:
+            self._cache[user_id] = (value, time.monotonic() + self._cache_ttl)
+        return value
+
+    def get(self, user_id, default=None):
+        value = self._cached(user_id)
+        if value is _MISSING:
+            value = self._load(user_id)
+        return default if value is None else value
+
+    async def lookup(self, user_id, default=None):
+        value = self._cached(user_id)
+        if value is _MISSING:
+            # SQLite কোয়েরি (এবং ফ্লাশারের লক) থ্রেডে অপেক্ষা করে
+            value = await asyncio.to_thread(self._load, user_id)
+        return default if value is None else value
+
+    def __setitem__(self, user_id, session_id):
+        self._cache[user_id] = (session_id, time.monotonic() + self._cache_ttl)
+        with self._lock:
+            self._pending[user_id] = session_id
+            if len(self._pending) >= self._flush_batch:
+                self._wakeup.set()
+
+    def _flush_loop(self):
+        while not self._closed:
+            self._wakeup.wait(self._flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except sqlite3.Error as e:
+                print(f"Session Store Error: {e}")
+
+    def flush(self):
+        with self._lock:
+            if not self._pending:
+                return
+            batch = list(self._pending.items())
+            self._pending.clear()
+            try:
+                with self._db:
+                    self._db.executemany(
+                        "INSERT INTO sessions (user_id, session_id) VALUES (?, ?) "
+                        "ON CONFLICT(user_id) DO UPDATE SET session_id = excluded.session_id",
+                        batch,
+                    )
+            except sqlite3.Error:
+                # ব্যাচটি হারানো যাবে না, পরের ফ্লাশে আবার চেষ্টা হবে
+                for user_id, session_id in batch:
+                    self._pending.setdefault(user_id, session_id)
+                raise
+
+    def close(self):
+        self._closed = True
+        self._wakeup.set()
+        self._flusher.join()
+        self.flush()
+        self._db.close()
+
+
+def create_session_store():
+    """কনফিগারেশন অনুযায়ী সেশন স্টোর তৈরি করে"""
+    if SESSION_STORE == "memory":
+        return MemorySessionStore()
+    return SQLiteSessionStore()
@@ -0,0 +1,112 @@
+import os
+import time
+from telegram.constants import ParseMode
+from telegram.error import BadRequest
+
+from bots.text_split import split_spans, close_open_tags, strip_partial_tail
+
+# ==========================================
+# ⚙️ কনফিগারেশন
+# ==========================================
+# 1 হলে টেক্সট প্রশ্নের উত্তর স্ট্রিমিং মোডে আসবে
+STREAMING_ENABLED = os.getenv("AI_STREAMING", "0") == "1"
+# একই মেসেজ সর্বোচ্চ কত সেকেন্ড পর পর এডিট হবে (ফ্লাড লিমিট এড়াতে)
+EDIT_INTERVAL = float(os.getenv("AI_STREAM_EDIT_INTERVAL", "1.0"))
+MAX_MESSAGE_LEN = 4000
+
+# ==========================================
+# 📡 প্রগ্রেসিভ (স্ট্রিমিং) রিপ্লাই
+# ==========================================
+
+def _plain(chunk):
+    return chunk.replace("<", "").replace(">", "")
+
+
+class StreamingReply:
+    """
+    স্ট্রিমিং উত্তর টেলিগ্রামে দেখায়।
+
+    প্রথম টুকরো আসা মাত্রই একটি মেসেজ পাঠানো হয়, তারপর নির্দিষ্ট বিরতিতে
+    সেটিই এডিট করা হয়। লেখা এক মেসেজের সীমা ছাড়ালে smart_split এর
+    বাউন্ডারিতে আগের মেসেজটি চূড়ান্ত হয় এবং নতুন মেসেজ শুরু হয়; পরের
+    ফ্লাশগুলো শুধু শেষ মেসেজের শুরু থেকে লেখা ভাঙে।
+    """
+
+    def __init__(self, bot, chat_id, edit_interval=None, max_len=MAX_MESSAGE_LEN):
+        self._bot = bot
+        self._chat_id = chat_id
+        self._interval = EDIT_INTERVAL if edit_interval is None else edit_interval
+        self._max_len = max_len
+        self._parts = []
+        self._messages = []  # [(message_id, দেখানো লেখা)]
+        # শেষ (এখনো বদলাতে পারে এমন) মেসেজটি লেখার কোথা থেকে শুরু: (offset, খোলা ট্যাগ)
+        self._live = (0, ())
+        self._last_flush = 0.0
+
+    @property
+    def started(self):
+        return bool(self._messages)
+
+    async def append(self, delta):
+        """নতুন টুকরো যোগ করে; বিরতি পার হলে মেসেজ আপডেট করে"""
+        self._parts.append(delta)
+        if not self._messages or time.monotonic() - self._last_flush >= self._interval:
+            await self._flush(final=False)
+
+    async def finish(self):
+        """পুরো উত্তর এসে গেলে শেষবারের মতো আপডেট করে; কিছু না দেখালে False দেয়"""
+        await self._flush(final=True)
+        return self.started
+
+    async def _flush(self, final):
+        text = "".join(self._parts)
+        self._parts = [text]
+        body = text.replace("```", "")
+        if not final:
+            # অর্ধেক আসা ট্যাগ ভাঙার জায়গা বদলে দিতে পারে; পুরোটা আসা পর্যন্ত বাদ
+            body = strip_partial_tail(body)
+        spans = list(split_spans(body, self._max_len, *self._live))
+        if spans and not final:
+            # শেষ টুকরোটি এখনো লেখা হচ্ছে; খোলা ট্যাগ বন্ধ করে দেখানো হয়
+            start, stack, chunk = spans[-1]
+            spans[-1] = (start, stack, close_open_tags(chunk))
+
+        # আগের মেসেজগুলো চূড়ান্ত; শুধু শেষটি থেকে মেলানো হয়
+        first = max(len(self._messages) - 1, 0)
+        for idx, (start, stack, chunk) in enumerate(spans, first):
+            if not chunk.strip():
+                continue
+            if idx < len(self._messages):
+                if self._messages[idx][1] != chunk:
+                    await self._edit(idx, chunk)
+            else:
+                await self._send(chunk)
+                self._live = (start, stack)
+        self._last_flush = time.monotonic()
+
+    async def _send(self, chunk):
+        try:
+            message = await self._bot.send_message(
+                chat_id=self._chat_id, text=chunk,
+                parse_mode=ParseMode.HTML, disable_web_page_preview=True
+            )
+        except BadRequest:
+            message = await self._bot.send_message(chat_id=self._chat_id, text=_plain(chunk))
+        self._messages.append((message.message_id, chunk))
+
+    async def _edit(self, idx, chunk):
+        message_id = self._messages[idx][0]
+        try:
+            await self._bot.edit_message_text(
+                chat_id=self._chat_id, message_id=message_id, text=chunk,
+                parse_mode=ParseMode.HTML, disable_web_page_preview=True
+            )
+        except BadRequest as e:
+            if "not modified" not in str(e).lower():
+                try:
+                    await self._bot.edit_message_text(
+                        chat_id=self._chat_id, message_id=message_id, text=_plain(chunk)
+                    )
+                except BadRequest:
+                    pass
+        self._messages[idx] = (message_id, chunk)
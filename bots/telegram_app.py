@@ -0,0 +1,25 @@
+import os
+from telegram.ext import Application
+
+from bots.send_scheduler import OutboundScheduler
+
+# ==========================================
+# ⚙️ কনফিগারেশন
+# ==========================================
+# Bot API সার্ভার (লোকাল বেঞ্চমার্ক বা self-hosted Bot API সার্ভারের জন্য বদলানো যায়)
+TELEGRAM_API_URL = os.getenv("TELEGRAM_API_URL", "https://api.telegram.org").rstrip("/")
+
+# ==========================================
+# 🏗️ Application তৈরি
+# ==========================================
+
+def build_application(token, probe=None):
+    """সব বটের জন্য একই সেটিংসে PTB Application তৈরি করে (আউটবাউন্ড শিডিউলার সহ)"""
+    return (
+        Application.builder()
+        .token(token)
+        .base_url(f"{TELEGRAM_API_URL}/bot")
+        .base_file_url(f"{TELEGRAM_API_URL}/file/bot")
+        .rate_limiter(OutboundScheduler(workers=probe.workers if probe else None))
+        .build()
+    )
@@ -1,8 +1,10 @@
 import os
 import asyncio
-import queue
 from telegram import Update
-from telegram.ext import Application, CommandHandler, ContextTypes
+from telegram.ext import CommandHandler, ContextTypes
+
+from bots.telegram_app import build_application
+from bots.runner import bot_loop
 
 # ==========================================
 # ⚙️ কনফিগারেশন
@@ -16,34 +18,13 @@ TOKEN = os.getenv("TEST_BOT_TOKEN")
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await update.message.reply_text("আমি টেস্ট বট! আলাদা প্রসেসরে চলছি! 🧪")
 
-async def bot_loop(application, local_queue):
-    """
-    local_queue: app.py থেকে আসা মাল্টিপ্রসেসিং কিউ
-    """
-    print("🧪 Test Bot Process Started...")
-    await application.initialize()
-    await application.start()
-    
-    while True:
-        try:
-            # app.py থেকে পাঠানো কিউ চেক করা হচ্ছে
-            update_data = local_queue.get(timeout=1)
-            
-            if update_data:
-                update = Update.de_json(update_data, application.bot)
-                await application.process_update(update)
-                
-        except queue.Empty:
-            continue
-        except Exception as e:
-            print(f"Test Bot Error: {e}")
 
 # ==========================================
 # 🚀 রানার ফাংশন
 # ==========================================
 
 # ফাংশনটি এখন input_queue গ্রহণ করবে
-def run_bot(input_queue):
+def run_bot(input_queue, probe=None):
     if not TOKEN:
         print("❌ Test Bot Token Missing!")
         return
@@ -52,10 +33,11 @@ def run_bot(input_queue):
     loop = asyncio.new_event_loop()
     asyncio.set_event_loop(loop)
     
-    app = Application.builder().token(TOKEN).build()
+    app = build_application(TOKEN, probe)
     app.add_handler(CommandHandler("start", start))
     
     # লুপে ইনপুট কিউ পাস করা হলো
-    loop.run_until_complete(bot_loop(app, input_queue))
+    print("🧪 Test Bot Process Started...")
+    loop.run_until_complete(bot_loop(app, input_queue, probe, name="Test Bot"))
 
 
@@ -0,0 +1,226 @@
+import re
+
+# ==========================================
+# ✂️ টেলিগ্রাম HTML মেসেজ স্প্লিটার
+# ==========================================
+
+# টেলিগ্রামের HTML parse_mode যেসব ট্যাগ সাপোর্ট করে
+TELEGRAM_TAGS = frozenset({
+    "b", "strong", "i", "em", "u", "ins", "s", "strike", "del",
+    "span", "tg-spoiler", "a", "code", "pre", "blockquote", "tg-emoji",
+})
+
+# টেলিগ্রাম ট্যাগ (খোলা/বন্ধ) এবং HTML এন্টিটি চেনার জন্য
+_TAG_RE = re.compile(r"<(/?)([a-zA-Z][\w-]*)[^<>]*>")
+# findall এর জন্য: (পুরো ট্যাগ, "/", নাম) — Match অবজেক্ট তৈরি হয় না
+_TAG_PARTS_RE = re.compile(r"(<(/?)([a-zA-Z][\w-]*)[^<>]*>)")
+_ENTITY_RE = re.compile(r"&#?\w+;")
+
+
+def utf16_len(text):
+    """টেলিগ্রামের মতো করে UTF-16 কোড ইউনিটে দৈর্ঘ্য গোনে"""
+    if text.isascii():
+        return len(text)
+    return len(text.encode("utf-16-le")) // 2
+
+
+def _closers(stack):
+    return "".join(f"</{entry[0]}>" for entry in reversed(stack))
+
+
+def _openers(stack):
+    return "".join(entry[1] for entry in stack)
+
+
+def _push(stack, name, tag):
+    # প্রতিটি এন্ট্রিতে নিচের সব ট্যাগ বন্ধ করতে কত ইউনিট লাগবে তাও রাখা হয়
+    below = stack[-1][2] if stack else 0
+    return stack + ((name, tag, below + len(name) + 3),)
+
+
+def _scan_tags(stack, text, start, end):
+    """text[start:end] এর ট্যাগগুলো পড়ে খোলা ট্যাগের স্ট্যাক আপডেট করে"""
+    if text.find("<", start, end) == -1:
+        return stack
+    names = [entry[0] for entry in stack]
+    tags = [entry[1] for entry in stack]
+    for tag, slash, name in _TAG_PARTS_RE.findall(text, start, end):
+        if name not in TELEGRAM_TAGS:
+            name = name.lower()
+            if name not in TELEGRAM_TAGS:
+                continue
+        if slash:
+            # মিল নেই এমন ক্লোজিং ট্যাগ উপেক্ষা করা হয়
+            for idx in range(len(names) - 1, -1, -1):
+                if names[idx] == name:
+                    del names[idx], tags[idx]
+                    break
+        elif not tag.endswith("/>"):
+            names.append(name)
+            tags.append(tag)
+
+    stack = ()
+    for name, tag in zip(names, tags):
+        stack = _push(stack, name, tag)
+    return stack
+
+
+def _fit_end(text, start, units, ascii_only):
+    """start থেকে সর্বোচ্চ units (UTF-16) এর মধ্যে শেষ ইনডেক্স"""
+    if units <= 0:
+        return start
+    if ascii_only:
+        return min(len(text), start + units)
+    window = text[start:start + units]
+    encoded = window.encode("utf-16-le")
+    if len(encoded) <= units * 2:
+        return start + len(window)
+    # সারোগেট জোড়ার অর্ধেক পড়লে 'ignore' সেটি বাদ দেয়
+    return start + len(encoded[:units * 2].decode("utf-16-le", "ignore"))
+
+
+def _choose_cut(text, start, end):
+    """
+    [start, end) এর ভেতরে কাটার জায়গা খোঁজে: আগে নিউলাইন, তারপর স্পেস,
+    না পেলে end এ। ট্যাগ বা এন্টিটির মাঝখানে কখনো কাটে না।
+    রিটার্ন: (কাট, পরের টুকরো কোথা থেকে শুরু)
+    """
+    lt = text.rfind("<", start, end)
+    if lt != -1:
+        match = _TAG_RE.match(text, lt)
+        if match and match.end() > end:
+            end = lt
+    amp = text.rfind("&", start, end)
+    if amp != -1:
+        match = _ENTITY_RE.match(text, amp)
+        if match and match.end() > end:
+            end = amp
+
+    for sep in ("\n", " "):
+        idx = text.rfind(sep, start, end)
+        while idx > start:
+            lt = text.rfind("<", start, idx)
+            if lt == -1 or text.rfind(">", lt, idx) != -1:
+                return idx, idx + 1
+            match = _TAG_RE.match(text, lt)
+            if not match or match.end() <= idx:
+                return idx, idx + 1
+            # ট্যাগের attribute এর ভেতরের স্পেস; ট্যাগের আগে খোঁজা হবে
+            idx = text.rfind(sep, start, lt)
+    return end, end
+
+
+def smart_split(text, max_len=4000):
+    """
+    HTML মেসেজকে টেলিগ্রামের সীমার মধ্যে টুকরো করে (জেনারেটর)।
+
+    ইনডেক্স ধরে একবারই সামনে এগোয়, কোনো টুকরো বারবার কপি বা গোনা হয় না।
+    খোলা ট্যাগগুলোর স্ট্যাক রাখা হয়; টুকরোর শেষে সেগুলো বন্ধ করা হয় এবং
+    পরের টুকরোর শুরুতে আবার খোলা হয়। সম্ভব হলে নিউলাইনে, না হলে স্পেসে
+    ভাঙে; কখনো ট্যাগ বা এন্টিটির মাঝখানে ভাঙে না। দৈর্ঘ্য UTF-16 ইউনিটে গোনা হয়।
+    """
+    # প্রতিটি ক্যারেক্টার সর্বোচ্চ ২ ইউনিট, তাই এটুকু হলে গোনার দরকার নেই
+    if len(text) * 2 <= max_len or utf16_len(text) <= max_len:
+        if text.strip():
+            yield text
+        return
+    for _, _, chunk in split_spans(text, max_len):
+        yield chunk
+
+
+def split_spans(text, max_len=4000, start=0, stack=()):
+    """
+    smart_split এর মতোই, তবে text[start:] থেকে (খোলা ট্যাগ stack সহ) শুরু করে
+    প্রতিটি টুকরোর সাথে সেটি কোথা থেকে শুরু হয়েছে তাও দেয়: (start, stack, chunk)।
+    স্ট্রিমিং এ আগের মেসেজগুলো আবার না ভেঙে শেষ মেসেজ থেকে শুরু করা যায়।
+    """
+    ascii_only = text.isascii()
+    if not stack and text.find("<", start) == -1 and text.find("&", start) == -1:
+        yield from _plain_spans(text, max_len, start, ascii_only)
+        return
+
+    n = len(text)
+    prefix = _openers(stack)
+    # বাকি লেখার UTF-16 দৈর্ঘ্য একবারই গোনা হয়, প্রতি টুকরোয় কমানো হয়
+    remaining = n - start if ascii_only else utf16_len(text[start:])
+
+    while start < n:
+        limit = max_len - utf16_len(prefix)
+
+        # শেষ টুকরো: বাকি লেখা পুরোটাই আঁটে
+        if remaining <= limit:
+            body = text[start:]
+            if body.strip():
+                yield start, stack, prefix + body
+            return
+
+        units = limit - (stack[-1][2] if stack else 0)
+        while True:
+            end = _fit_end(text, start, units, ascii_only)
+            cut, resume = _choose_cut(text, start, end)
+            if cut == start:
+                # একটি ট্যাগ/এন্টিটি একাই সীমার বেশি: সেটিকে ভাঙা যাবে না
+                match = _TAG_RE.match(text, start) or _ENTITY_RE.match(text, start)
+                cut = resume = match.end() if match else start + 1
+                cut_stack = _scan_tags(stack, text, start, cut)
+                break
+            cut_stack = _scan_tags(stack, text, start, cut)
+            body_len = (cut - start) if ascii_only else utf16_len(text[start:cut])
+            excess = body_len + (cut_stack[-1][2] if cut_stack else 0) - limit
+            if excess <= 0:
+                break
+            # টুকরোর ভেতরে নতুন ট্যাগ খোলায় বন্ধ করার জায়গা লাগবে; একটু ছোট করা হয়
+            units = body_len - excess
+
+        body = text[start:cut]
+        if body.strip():
+            yield start, stack, prefix + body + _closers(cut_stack)
+
+        remaining -= (resume - start) if ascii_only else utf16_len(text[start:resume])
+        stack = cut_stack
+        prefix = _openers(stack)
+        start = resume
+
+
+def _plain_spans(text, max_len, start, ascii_only):
+    """ট্যাগ বা এন্টিটি ছাড়া লেখা: শুধু নিউলাইন/স্পেস খুঁজে কাটা হয়"""
+    n = len(text)
+    while start < n:
+        end = _fit_end(text, start, max_len, ascii_only)
+        if end >= n:
+            body = text[start:]
+            if body.strip():
+                yield start, (), body
+            return
+        cut = text.rfind("\n", start + 1, end)
+        if cut == -1:
+            cut = text.rfind(" ", start + 1, end)
+        if cut == -1:
+            cut = resume = max(end, start + 1)
+        else:
+            resume = cut + 1
+        body = text[start:cut]
+        if body.strip():
+            yield start, (), body
+        start = resume
+
+
+def strip_partial_tail(chunk):
+    """শেষের অর্ধেক লেখা ট্যাগ/এন্টিটি (যেমন স্ট্রিমিং চলাকালীন '<a hr') বাদ দেয়"""
+    lt = chunk.rfind("<")
+    if lt != -1 and re.fullmatch(r"</?(?:[a-zA-Z][^<>]*)?", chunk[lt:]):
+        chunk = chunk[:lt]
+    amp = chunk.rfind("&")
+    if amp != -1 and chunk.find(";", amp) == -1 and re.fullmatch(r"&#?\w*", chunk[amp:]):
+        chunk = chunk[:amp]
+    return chunk
+
+
+def close_open_tags(chunk):
+    """
+    অসম্পূর্ণ HTML (যেমন স্ট্রিমিং চলাকালীন লেখা) দেখানোর উপযোগী করে:
+    শেষের অর্ধেক লেখা ট্যাগ/এন্টিটি বাদ দেয় এবং খোলা ট্যাগগুলো বন্ধ করে।
+    """
+    chunk = strip_partial_tail(chunk)
+    stack = _scan_tags((), chunk, 0, len(chunk))
+    return chunk + _closers(stack)
@@ -0,0 +1,36 @@
+import time
+
+# ==========================================
+# 🪣 টোকেন বাকেট
+# ==========================================
+
+class TokenBucket:
+    """rate টোকেন/সেকেন্ড হারে ভরে ওঠে, সর্বোচ্চ capacity পর্যন্ত জমে"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    @property
+    def idle(self):
+        self._refill()
+        return self.tokens >= self.capacity
+
+    def delay(self, amount=1):
+        """amount টি টোকেন পেতে আর কত সেকেন্ড লাগবে"""
+        self._refill()
+        return 0.0 if self.tokens >= amount else (amount - self.tokens) / self.rate
+
+    def try_acquire(self, amount=1):
+        self._refill()
+        if self.tokens >= amount:
+            self.tokens -= amount
+            return True
+        return False
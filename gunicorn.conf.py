@@ -0,0 +1,41 @@
+import os
+import signal
+import multiprocessing
+
+# ==========================================
+# ⚙️ gunicorn কনফিগারেশন (প্রোডাকশন ইনগ্রেস)
+# ==========================================
+wsgi_app = "wsgi:app"
+bind = f"0.0.0.0:{os.environ.get('PORT', '8080')}"
+
+# ওয়েব ওয়ার্কার সংখ্যা কোরের সাথে বাড়ে; WEB_CONCURRENCY দিয়ে বদলানো যায়
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+worker_class = "gthread"
+threads = int(os.environ.get("WEB_THREADS", "4"))
+
+# মাস্টার প্রসেসেই অ্যাপ লোড করে বট প্রসেস চালু করা হয় (wsgi.py),
+# তারপর ওয়ার্কাররা fork হয়ে একই multiprocessing কিউ উত্তরাধিকার পায়
+preload_app = True
+
+# টেলিগ্রাম ওয়েব হুক ছোট রিকোয়েস্ট, দ্রুত উত্তর দেওয়াই লক্ষ্য
+timeout = 30
+keepalive = 75
+
+# ==========================================
+# 🛑 গুছিয়ে বন্ধ হওয়া (SIGTERM)
+# ==========================================
+
+def when_ready(server):
+    """
+    gunicorn নিজের SIGTERM হ্যান্ডলারে সাথে সাথে ওয়েব ওয়ার্কার বন্ধ করা শুরু করে।
+    তার আগে বটগুলো ড্রেন করার জন্য হ্যান্ডলারটি মোড়ানো হয়: ড্রেনের সময় ওয়েব
+    ওয়ার্কাররা সচল থেকে টেলিগ্রামকে 503 দেয়, শেষ হলে gunicorn এর আগের হ্যান্ডলার চলে।
+    """
+    from app import begin_shutdown
+
+    gunicorn_term = signal.getsignal(signal.SIGTERM)
+
+    def on_term(sig, frame):
+        begin_shutdown(lambda: gunicorn_term(sig, frame))
+
+    signal.signal(signal.SIGTERM, on_term)
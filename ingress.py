@@ -0,0 +1,377 @@
+import os
+import re
+import time
+import queue
+import ctypes
+import multiprocessing
+
+from metrics import SNAPSHOT_SIZE, envelope, payload_of
+from ingress_log import IngressLog, SharedLock, LOG_DIR
+
+# ==========================================
+# ⚙️ কনফিগারেশন
+# ==========================================
+# প্রতিটি বটের কিউতে সর্বোচ্চ কতগুলো আপডেট জমতে পারবে
+QUEUE_DEPTH = int(os.getenv("BOT_QUEUE_DEPTH", "1000"))
+# কিউ ভর্তি হলে টেলিগ্রামকে কত সেকেন্ড পর আবার পাঠাতে বলা হবে
+RETRY_AFTER = int(os.getenv("BOT_RETRY_AFTER", "5"))
+# রিস্টার্টের সময় পুরনো কিউ আটকে গেলে ব্যবহারের জন্য অতিরিক্ত কিউ
+# (fork এর আগেই তৈরি রাখতে হয়, যাতে সব ওয়েব ওয়ার্কার সেগুলো চেনে)
+SPARE_SLOTS = int(os.getenv("BOT_SPARE_SLOTS", "2"))
+# প্রতিটি বটের জন্য কতগুলো ওয়ার্কার প্রসেস চলবে
+WORKERS = int(os.getenv("BOT_WORKERS", "1"))
+# পরে সর্বোচ্চ কতগুলো ওয়ার্কার পর্যন্ত বাড়ানো যাবে (কিউগুলো fork এর আগেই তৈরি হয়)
+MAX_WORKERS = int(os.getenv("BOT_MAX_WORKERS", "0")) or os.cpu_count() or 1
+# chat_id হ্যাশ করে কতগুলো ভার্চুয়াল শার্ডে ভাগ হবে; শার্ড → ওয়ার্কার টেবিল বদলে
+# ওয়ার্কার যোগ/বাদ দেওয়া হয়, তাই ওয়ার্কার সংখ্যার চেয়ে অনেক বেশি রাখা ভালো
+SHARDS = int(os.getenv("BOT_SHARDS", "256"))
+# সর্বশেষ কতগুলো update_id মনে রেখে টেলিগ্রামের আবার পাঠানো আপডেট বাদ দেওয়া হবে
+# (প্রতি আইডিতে ১ বিট; 0 দিলে ডিডুপ্লিকেশন বন্ধ)
+DEDUP_WINDOW = int(os.getenv("BOT_DEDUP_WINDOW", "65536"))
+# এত সেকেন্ড কোনো আপডেট না এলে উইন্ডো নতুন করে শুরু হয় (টেলিগ্রাম এক সপ্তাহ চুপ থাকার
+# পর update_id এলোমেলোভাবে নতুন করে বেছে নেয়, যা উইন্ডোর ভেতরেও পড়তে পারে)
+DEDUP_IDLE_RESET = float(os.getenv("BOT_DEDUP_IDLE_RESET", "86400"))
+
+# JSON পার্স না করেই কাঁচা আপডেট থেকে chat_id (না থাকলে from.id) বের করা হয়
+_CHAT_ID_RE = re.compile(rb'"chat"\s*:\s*\{\s*"id"\s*:\s*(-?\d+)')
+_FROM_ID_RE = re.compile(rb'"from"\s*:\s*\{\s*"id"\s*:\s*(-?\d+)')
+_UPDATE_ID_RE = re.compile(rb'"update_id"\s*:\s*(\d+)')
+
+# ==========================================
+# 📥 বটের ইনগ্রেস কিউ
+# ==========================================
+
+class WorkerSlot:
+    """
+    একটি ওয়ার্কার প্রসেসের ইনপুট কিউ এবং তার হেলথ প্রোব।
+
+    - heartbeat: ওয়ার্কারের ইভেন্ট লুপ শেষ কখন সাড়া দিয়েছে (time.time())
+    - loop_lag: ইভেন্ট লুপ কত সেকেন্ড দেরিতে চলছে
+    - stop / released: সুপারভাইজার stop দিলে ওয়ার্কার কিউ পড়া বন্ধ করে
+      released জানায়, তারপর প্রসেসটি নিরাপদে বন্ধ করা যায়
+    - drain: শাটডাউনের সময় ওয়ার্কার কিউ খালি হওয়া পর্যন্ত পড়ে, তারপর থামে
+    - metrics: ওয়ার্কার হার্টবিটের সাথে তার মেট্রিক্স স্ন্যাপশট এখানে লেখে
+    - workers: একই বটের কতগুলো ওয়ার্কার এখন সচল (শেয়ার্ড)
+    - journal: লেনের ইনগ্রেস লগ (চালু থাকলে), ওয়ার্কার এখান থেকে replay ও ack করে
+    """
+
+    def __init__(self, maxsize, workers=None, journal=None):
+        self.queue = multiprocessing.Queue(maxsize)
+        # বটের মোট সচল ওয়ার্কার সংখ্যা (আউটবাউন্ড রেট লিমিট ভাগ করার জন্য)
+        self.workers = workers
+        self.journal = journal
+        self.heartbeat = multiprocessing.Value("d", 0.0)
+        self.loop_lag = multiprocessing.Value("d", 0.0)
+        self.stop = multiprocessing.Event()
+        self.released = multiprocessing.Event()
+        self.drain = multiprocessing.Event()
+        # ওয়ার্কারের মেট্রিক্স স্ন্যাপশট (JSON), /metrics এখান থেকে পড়ে
+        self.metrics = multiprocessing.Array("c", SNAPSHOT_SIZE)
+
+    def reset(self):
+        """নতুন ওয়ার্কারকে দেওয়ার আগে প্রোবগুলো শূন্য করে"""
+        self.heartbeat.value = 0.0
+        self.loop_lag.value = 0.0
+        self.stop.clear()
+        self.released.clear()
+        self.drain.clear()
+        self.metrics.value = b""
+
+    def heartbeat_age(self):
+        beat = self.heartbeat.value
+        return time.time() - beat if beat else None
+
+
+def shard_of(payload, shards=None):
+    """কাঁচা আপডেটটি কোন শার্ডে যাবে; একই চ্যাটের আপডেট সবসময় একই শার্ডে যায়"""
+    shards = shards or SHARDS
+    match = _CHAT_ID_RE.search(payload) or _FROM_ID_RE.search(payload) or _UPDATE_ID_RE.search(payload)
+    if not match:
+        return 0
+    # কাছাকাছি আইডিগুলো যাতে একই ওয়ার্কারে জড়ো না হয়, তাই গুণ করে ছড়িয়ে দেওয়া হয়
+    return (int(match.group(1)) * 2654435761 & 0xFFFFFFFF) % shards
+
+
+def update_id_of(payload):
+    match = _UPDATE_ID_RE.search(payload)
+    return int(match.group(1)) if match else None
+
+
+class UpdateWindow:
+    """
+    সম্প্রতি গ্রহণ করা update_id গুলোর স্লাইডিং উইন্ডো (শেয়ার্ড বিটম্যাপ)।
+
+    টেলিগ্রামের update_id ক্রমানুসারে বাড়ে, তাই সবচেয়ে বড় আইডির পেছনের size টি
+    আইডির প্রতিটির জন্য একটি বিট যথেষ্ট (৬৫৫৩৬ আইডি = ৮ KB)। উইন্ডোর চেয়েও
+    পুরনো আইডি বা অনেকক্ষণ চুপ থাকার পর আসা আইডি মানে টেলিগ্রাম ক্রম নতুন করে
+    শুরু করেছে; তখন উইন্ডো খালি করে সেখান থেকে শুরু হয়।
+    """
+
+    def __init__(self, size, idle_reset=None):
+        self.size = size
+        self.idle_reset = DEDUP_IDLE_RESET if idle_reset is None else idle_reset
+        self._bits = multiprocessing.RawArray("B", (size + 7) // 8)
+        self._high = multiprocessing.RawValue("q", -1)
+        self._last = multiprocessing.RawValue("d", 0.0)
+        self._lock = SharedLock("dedup window")
+
+    def _clear(self, update_id):
+        index = update_id % self.size
+        self._bits[index >> 3] &= ~(1 << (index & 7)) & 0xFF
+
+    def claim(self, update_id):
+        """আইডিটি আগে দেখা না হলে চিহ্নিত করে True দেয়, নইলে False"""
+        with self._lock.hold() as locked:
+            if not locked:
+                # লক আটকে আছে: ডুপ্লিকেট চালানো আপডেট হারানোর চেয়ে ভালো
+                return True
+            now = time.time()
+            high = self._high.value
+            if update_id <= high - self.size or now - self._last.value > self.idle_reset:
+                # নতুন ক্রম শুরু: আগের আইডিগুলোর সাথে আর মেলানো যায় না
+                high = -1
+            self._last.value = now
+            if update_id > high:
+                # উইন্ডো সামনে সরে যায়; মাঝের পুরনো বিটগুলো মুছে ফেলা হয়
+                if high < 0 or update_id - high >= self.size:
+                    ctypes.memset(self._bits, 0, len(self._bits))
+                else:
+                    for old in range(high + 1, update_id):
+                        self._clear(old)
+                self._high.value = update_id
+            index = update_id % self.size
+            mask = 1 << (index & 7)
+            if self._bits[index >> 3] & mask:
+                return False
+            self._bits[index >> 3] |= mask
+            return True
+
+    def release(self, update_id):
+        """আপডেটটি শেষ পর্যন্ত গ্রহণ করা না গেলে চিহ্ন তুলে নেয়, যাতে টেলিগ্রামের পরের চেষ্টা আসে"""
+        with self._lock.hold() as locked:
+            if locked and self._high.value - self.size < update_id <= self._high.value:
+                self._clear(update_id)
+
+
+class WorkerLane:
+    """
+    একটি ওয়ার্কার প্রসেসের কিউ (সাথে অতিরিক্ত কিউ) এবং তার তথ্য।
+
+    সক্রিয় কিউয়ের ইনডেক্স, pid, আপটাইম ও রিস্টার্ট সংখ্যা শেয়ার্ড মেমরিতে থাকে,
+    তাই সব ওয়েব ওয়ার্কার একই অবস্থা দেখে।
+    """
+
+    def __init__(self, maxsize, spare_slots, workers, journal=None):
+        self.journal = journal
+        self.slots = [WorkerSlot(maxsize, workers, journal) for _ in range(1 + spare_slots)]
+        self._active = multiprocessing.Value("i", 0)
+        # সুপারভাইজার এগুলো আপডেট করে
+        self.pid = multiprocessing.Value("i", 0)
+        self.started_at = multiprocessing.Value("d", 0.0)
+        self.restarts = multiprocessing.Value("L", 0)
+
+    @property
+    def active_index(self):
+        return self._active.value
+
+    @property
+    def slot(self):
+        return self.slots[self._active.value]
+
+    @property
+    def queue(self):
+        return self.slot.queue
+
+    def activate(self, index):
+        """নতুন আপডেটগুলো এখন থেকে index নম্বর কিউতে যাবে"""
+        self._active.value = index
+
+    def put(self, payload, received, timeout=None):
+        """
+        আপডেটটি সক্রিয় কিউতে দেয় (timeout না দিলে অপেক্ষা ছাড়াই); লগ চালু থাকলে
+        আগে লগে লেখা হয়। জায়গা না থাকলে queue.Full, লগে লেখা না গেলে OSError।
+        """
+        if self.journal is not None:
+            def put(offset, end):
+                self.queue.put(envelope(payload, received, offset, end), timeout is not None, timeout)
+
+            if self.journal.append(payload, put):
+                return
+            # লগের লক আটকে আছে; আপডেট হারানোর চেয়ে লগ ছাড়া কিউতে দেওয়া ভালো
+        self.queue.put(envelope(payload, received), timeout is not None, timeout)
+
+    def depth_of(self, index):
+        try:
+            return self.slots[index].queue.qsize()
+        except NotImplementedError:
+            # macOS এ qsize() নেই
+            return -1
+
+    def depth(self):
+        return self.depth_of(self.active_index)
+
+    def worker_stats(self):
+        started_at = self.started_at.value
+        age = self.slot.heartbeat_age()
+        return {
+            "pid": self.pid.value,
+            "restarts": self.restarts.value,
+            "uptime": round(time.time() - started_at, 1) if started_at else 0.0,
+            "heartbeat_age": round(age, 2) if age is not None else None,
+            "loop_lag": round(self.slot.loop_lag.value, 4),
+            "depth": self.depth(),
+        }
+
+
+class BotIngress:
+    """
+    একটি বটের সীমিত (bounded) ইনপুট কিউগুলো এবং তাদের কাউন্টার।
+
+    বটের একাধিক ওয়ার্কার প্রসেস থাকতে পারে। প্রতিটি আপডেটের chat_id হ্যাশ করে
+    শার্ড বের করা হয় এবং শার্ড → ওয়ার্কার টেবিল দেখে সেই ওয়ার্কারের কিউতে
+    পাঠানো হয়, ফলে একই চ্যাটের আপডেট ক্রম মেনে একই প্রসেসে চলে
+    (সেশন ও ক্যাশও সেখানেই থাকে)।
+
+    কিউ ভর্তি থাকলে offer() সাথে সাথে False দেয়; ওয়েব হুক তখন 503 ফেরত দেয়
+    যাতে টেলিগ্রাম পরে আবার পাঠায়, আর মেমরি সীমার মধ্যে থাকে।
+
+    টেলিগ্রাম একই আপডেট আবার পাঠালে (ধীর বা ব্যর্থ ওয়েব হুকের পর) update_id এর
+    উইন্ডো দেখে সেটি কিউতে না দিয়েই গ্রহণ করা হয়েছে বলে জানানো হয়।
+    INGRESS_LOG_DIR দেওয়া থাকলে প্রতিটি লেনের আপডেট ingress_log.IngressLog এ
+    লেখা হয়, যাতে ওয়ার্কার রিস্টার্টের পর অসম্পন্ন আপডেট আবার চালাতে পারে।
+    """
+
+    def __init__(self, name, maxsize=None, spare_slots=None, workers=None, max_workers=None):
+        self.name = name
+        self.maxsize = maxsize or QUEUE_DEPTH
+        spare = SPARE_SLOTS if spare_slots is None else spare_slots
+        workers = max(1, workers or WORKERS)
+        max_workers = max(workers, max_workers or MAX_WORKERS)
+        # সচল ওয়ার্কার সংখ্যা (সুপারভাইজার বদলায়) ও কাঙ্ক্ষিত সংখ্যা (যেকোনো প্রসেস বদলাতে পারে)
+        self._workers = multiprocessing.Value("i", workers)
+        self._desired = multiprocessing.Value("i", workers)
+        self.lanes = [
+            WorkerLane(self.maxsize, spare, self._workers, self._journal(index))
+            for index in range(max_workers)
+        ]
+        self._window = UpdateWindow(DEDUP_WINDOW) if DEDUP_WINDOW > 0 else None
+        # শুধু সুপারভাইজার লেখে, তাই লক ছাড়াই পড়া যায়
+        self._routes = multiprocessing.RawArray("i", SHARDS)
+        self._accepted = multiprocessing.Value("L", 0)
+        self._dropped = multiprocessing.Value("L", 0)
+        self._duplicates = multiprocessing.Value("L", 0)
+        # শাটডাউন শুরু হলে সেট হয়; তখন ওয়েব হুক নতুন আপডেট নেয় না
+        self._closed = multiprocessing.Value("b", 0)
+        self.assign(workers)
+
+    def _journal(self, index):
+        if not LOG_DIR:
+            return None
+        os.makedirs(LOG_DIR, exist_ok=True)
+        journal = IngressLog(os.path.join(LOG_DIR, f"{self.name}-{index}.log"))
+        pending = journal.recover()
+        if pending:
+            print(f"📜 {self.name}-{index}: {pending} bytes of unfinished updates will be replayed")
+        return journal
+
+    @property
+    def workers(self):
+        return self._workers.value
+
+    @property
+    def max_workers(self):
+        return len(self.lanes)
+
+    @property
+    def desired_workers(self):
+        return self._desired.value
+
+    @property
+    def closed(self):
+        return bool(self._closed.value)
+
+    def close(self):
+        """নতুন আপডেট নেওয়া বন্ধ (ওয়েব হুক 503 দেয়, টেলিগ্রাম পরে আবার পাঠায়)"""
+        self._closed.value = 1
+
+    def scale(self, count):
+        """কাঙ্ক্ষিত ওয়ার্কার সংখ্যা ঠিক করে; সুপারভাইজার পরের চেকে সেটি কার্যকর করে"""
+        count = max(1, min(int(count), self.max_workers))
+        self._desired.value = count
+        return count
+
+    def assign(self, count):
+        """
+        শার্ডগুলো প্রথম count টি ওয়ার্কারের মধ্যে সমানভাবে ভাগ করে।
+        যতটা সম্ভব কম শার্ড সরানো হয়, যাতে বেশিরভাগ চ্যাট তার প্রসেসেই থাকে।
+        """
+        routes = self._routes
+        owned = [[] for _ in range(count)]
+        orphans = []
+        for shard, lane in enumerate(routes):
+            (owned[lane] if lane < count else orphans).append(shard)
+
+        base, extra = divmod(len(routes), count)
+        quota = [base + (1 if index < extra else 0) for index in range(count)]
+        for index, shards in enumerate(owned):
+            while len(shards) > quota[index]:
+                orphans.append(shards.pop())
+        for index, shards in enumerate(owned):
+            while len(shards) < quota[index]:
+                shard = orphans.pop()
+                routes[shard] = index
+                shards.append(shard)
+        self._workers.value = count
+
+    def lane_for(self, item):
+        """কাঁচা আপডেট বা কিউয়ের আইটেমটি কোন ওয়ার্কারের কাছে যাবে"""
+        return self.lanes[self._routes[shard_of(payload_of(item), len(self._routes))]]
+
+    def offer(self, payload, received=None):
+        """
+        আপডেটটি তার চ্যাটের ওয়ার্কারের কিউতে দেওয়ার চেষ্টা করে; জায়গা না থাকলে False।
+        আগেই গ্রহণ করা আপডেট আবার এলে কিছু না করে True দেয়।
+        """
+        update_id = update_id_of(payload) if self._window is not None else None
+        if update_id is not None and not self._window.claim(update_id):
+            with self._duplicates.get_lock():
+                self._duplicates.value += 1
+            return True
+        try:
+            self.lane_for(payload).put(payload, received or time.time())
+        except BaseException as e:
+            # গ্রহণ করা হয়নি, তাই টেলিগ্রামের পরের চেষ্টা যেন ডুপ্লিকেট না ধরা হয়
+            if update_id is not None:
+                self._window.release(update_id)
+            if isinstance(e, OSError):
+                # লগে লেখা যায়নি (যেমন ডিস্ক ভর্তি); 503 পেয়ে টেলিগ্রাম পরে আবার পাঠাবে
+                print(f"⚠️ {self.name}: ingress log write failed: {e}")
+            elif not isinstance(e, queue.Full):
+                raise
+            with self._dropped.get_lock():
+                self._dropped.value += 1
+            return False
+        with self._accepted.get_lock():
+            self._accepted.value += 1
+        return True
+
+    def redirect(self, item, timeout=1):
+        """অন্য লেনে থাকা আইটেম বা লগের রেকর্ড শার্ড টেবিল অনুযায়ী এখনকার ওয়ার্কারের কিউতে দেয়"""
+        received = item[1] if isinstance(item, tuple) else None
+        self.lane_for(item).put(payload_of(item), received, timeout)
+
+    def depth(self):
+        return sum(max(0, lane.depth()) for lane in self.lanes[:self.workers])
+
+    def stats(self):
+        return {
+            "depth": self.depth(),
+            "maxsize": self.maxsize,
+            "workers": self.workers,
+            "accepted": self._accepted.value,
+            "dropped": self._dropped.value,
+            "duplicates": self._duplicates.value,
+        }
+
+    def worker_stats(self):
+        return [lane.worker_stats() for lane in self.lanes[:self.workers]]
@@ -0,0 +1,307 @@
+import os
+import time
+import errno
+import struct
+import multiprocessing
+from contextlib import contextmanager
+
+from metrics import envelope
+
+# ==========================================
+# ⚙️ কনফিগারেশন
+# ==========================================
+# ইনগ্রেস লগের ফোল্ডার; খালি থাকলে লগ বন্ধ (আপডেট শুধু মেমরির কিউতে থাকে)
+LOG_DIR = os.getenv("INGRESS_LOG_DIR", "")
+# প্রতিটি রেকর্ড লেখার পর fsync (বিদ্যুৎ চলে গেলেও টিকে থাকে, তবে ধীর)
+LOG_FSYNC = os.getenv("INGRESS_LOG_FSYNC", "0") == "1"
+# লগ এই আকারের সেগমেন্ট ফাইলে ভাগ হয়; পুরোপুরি সম্পন্ন পুরনো সেগমেন্ট মুছে ফেলা হয়
+SEGMENT_BYTES = int(os.getenv("INGRESS_LOG_SEGMENT_BYTES", str(8 * 1024 * 1024)))
+# প্রসেসগুলোর শেয়ার্ড লকের জন্য সর্বোচ্চ অপেক্ষা (সেকেন্ড)। লক ধরা অবস্থায় কোনো
+# প্রসেস মারা গেলে লকটি আর কখনো ছাড়া হয় না; তখন লক ছাড়াই কাজ চালানো হয়
+LOCK_TIMEOUT = float(os.getenv("INGRESS_LOCK_TIMEOUT", "1"))
+# একবার লক না পেলে এতক্ষণ আর অপেক্ষা না করে সাথে সাথে বিকল্প পথে যাওয়া হয়
+LOCK_RETRY = float(os.getenv("INGRESS_LOCK_RETRY", "10"))
+
+# রেকর্ড = ৪ বাইট দৈর্ঘ্য + কাঁচা আপডেট
+_HEADER = struct.Struct("<I")
+# ack ফাইলে ৮ বাইটে সম্পন্ন অংশের শেষ অফসেট থাকে
+_ACK = struct.Struct("<Q")
+
+# ==========================================
+# 🔒 টাইমআউট সহ শেয়ার্ড লক
+# ==========================================
+
+class SharedLock:
+    """
+    প্রসেসগুলোর মধ্যে শেয়ার্ড লক (fork এর আগে তৈরি), তবে অনির্দিষ্টকাল অপেক্ষা নেই।
+
+    ধরে রাখা প্রসেস SIGKILL/OOM এ মারা গেলে multiprocessing.Lock চিরকাল আটকে
+    থাকে। hold() LOCK_TIMEOUT পর্যন্ত অপেক্ষা করে; না পেলে False দেয় এবং এরপর
+    LOCK_RETRY সেকেন্ড এই প্রসেস আর অপেক্ষা না করে শুধু একবার চেষ্টা করে।
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._lock = multiprocessing.Lock()
+        # প্রসেস-লোকাল: শেষ কখন লক পাওয়া যায়নি
+        self._failed_at = None
+
+    @contextmanager
+    def hold(self):
+        timeout = LOCK_TIMEOUT
+        if self._failed_at is not None and time.monotonic() - self._failed_at < LOCK_RETRY:
+            timeout = 0
+        acquired = self._lock.acquire(timeout=timeout)
+        if acquired:
+            self._failed_at = None
+        elif self._failed_at is None:
+            self._failed_at = time.monotonic()
+            print(f"⚠️ {self.name}: shared lock not acquired in {LOCK_TIMEOUT}s, continuing without it")
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                self._lock.release()
+
+# ==========================================
+# 📜 অ্যাপেন্ড-অনলি ইনগ্রেস লগ
+# ==========================================
+
+class IngressLog:
+    """
+    একটি ওয়ার্কার লেনের গ্রহণ করা আপডেটগুলোর অ্যাপেন্ড-অনলি লগ।
+
+    ওয়েব প্রসেস শেয়ার্ড লক ধরে আগে লগে লেখে, লেখা সফল হলে তবেই কিউতে (লগের
+    অফসেটসহ) দেয়; কিউ ভর্তি থাকলে লেখাটুকু কেটে ফেলা হয়। তাই কিউ ও লগের ক্রম
+    সবসময় এক থাকে, আর ডিস্ক ভর্তি (ENOSPC) হলে আপডেট কিউতেই যায় না, টেলিগ্রাম
+    503 পেয়ে পরে আবার পাঠায়।
+
+    অফসেটগুলো পুরো লগ জুড়ে একটানা বাড়ে; লগ SEGMENT_BYTES আকারের ফাইলে
+    ({path}.{শুরুর অফসেট}) ভাগ থাকে। ওয়ার্কার প্রতিটি আপডেট শেষে তার অংশ
+    (offset, end) ack করে; শুরু থেকে টানা সম্পন্ন অংশের শেষ অফসেট .ack ফাইলে
+    থাকে, আর যে সেগমেন্টের সবটুকু সম্পন্ন সেটি মুছে ফেলা হয়। ওয়ার্কার রিস্টার্ট
+    হলে (বা পুরো সার্ভিস আবার চালু হলে) সেখান থেকে লগের শেষ পর্যন্ত আবার চালায়,
+    আর কিউতে থাকা সেই অংশের আইটেমগুলো বাদ দেয়।
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.ack_path = path + ".ack"
+        # সব ওয়েব প্রসেস, সুপারভাইজার ও ওয়ার্কার একই লক ব্যবহার করে (fork এর আগে তৈরি)
+        self.lock = SharedLock(os.path.basename(path))
+        # এখন যে সেগমেন্টে লেখা হচ্ছে তার শুরুর অফসেট
+        self._base = multiprocessing.RawValue("Q", 0)
+        self._pid = None
+        self._fd = None
+        self._fd_base = None
+        self._ack_fd = None
+        # ওয়ার্কারের নিজের হিসাব
+        self._committed = 0
+        self._done = {}
+        self._replay_end = 0
+        self._trimmed = 0
+
+    # --- ফাইল ---
+
+    def _segment_path(self, base):
+        return f"{self.path}.{base:016d}"
+
+    def _segments(self):
+        """ডিস্কে থাকা সেগমেন্টগুলোর শুরুর অফসেট (ছোট থেকে বড়)"""
+        folder, name = os.path.split(self.path)
+        prefix = name + "."
+        bases = []
+        for entry in os.listdir(folder or "."):
+            suffix = entry[len(prefix):]
+            if entry.startswith(prefix) and len(suffix) == 16 and suffix.isdigit():
+                bases.append(int(suffix))
+        return sorted(bases)
+
+    def _check_pid(self):
+        # fd প্রসেস প্রতি আলাদা খোলা হয়
+        if self._pid != os.getpid():
+            self._fd = self._fd_base = None
+            self._ack_fd = os.open(self.ack_path, os.O_RDWR | os.O_CREAT, 0o600)
+            self._pid = os.getpid()
+
+    def _writer(self, base):
+        """base সেগমেন্টে লেখার fd (প্রসেসে শুধু বর্তমান সেগমেন্টটি খোলা থাকে)"""
+        self._check_pid()
+        if self._fd_base != base:
+            if self._fd is not None:
+                os.close(self._fd)
+            self._fd = os.open(self._segment_path(base), os.O_RDWR | os.O_CREAT, 0o600)
+            self._fd_base = base
+        return self._fd
+
+    def _segment_size(self, base):
+        try:
+            return os.stat(self._segment_path(base)).st_size
+        except FileNotFoundError:
+            return 0
+
+    def _read_ack(self):
+        self._check_pid()
+        data = os.pread(self._ack_fd, _ACK.size, 0)
+        return _ACK.unpack(data)[0] if len(data) == _ACK.size else 0
+
+    def _write_ack(self, offset):
+        self._check_pid()
+        os.pwrite(self._ack_fd, _ACK.pack(offset), 0)
+        if LOG_FSYNC:
+            os.fsync(self._ack_fd)
+
+    def _records(self, start, end=None):
+        """start থেকে (end পর্যন্ত) সম্পূর্ণ রেকর্ডগুলো (offset, end, payload), সেগমেন্ট পেরিয়ে"""
+        for base in self._segments():
+            if end is not None and base >= end:
+                break
+            try:
+                with open(self._segment_path(base), "rb") as f:
+                    data = f.read()
+            except FileNotFoundError:
+                continue
+            if base + len(data) <= start:
+                continue
+            # রেকর্ড কখনো দুই সেগমেন্টে ভাগ হয় না, তাই সেগমেন্টের শুরু রেকর্ডেরও শুরু
+            position = max(start - base, 0)
+            limit = len(data) if end is None else min(len(data), end - base)
+            while position + _HEADER.size <= limit:
+                (length,) = _HEADER.unpack_from(data, position)
+                stop = position + _HEADER.size + length
+                if stop > limit:
+                    break
+                yield base + position, base + stop, data[position + _HEADER.size:stop]
+                position = stop
+
+    def size(self):
+        """লগের শেষ অফসেট (পরের রেকর্ড যেখানে বসবে)"""
+        base = self._base.value
+        return base + self._segment_size(base)
+
+    def _drop_before(self, offset):
+        """offset এর আগেই শেষ হওয়া সেগমেন্টগুলো মুছে ফেলে (শেষ সেগমেন্ট কখনো নয়)"""
+        bases = self._segments()
+        for base, next_base in zip(bases, bases[1:]):
+            if next_base > offset:
+                break
+            try:
+                os.unlink(self._segment_path(base))
+            except FileNotFoundError:
+                pass
+
+    # --- ওয়েব প্রসেস / মাস্টার ---
+
+    def recover(self):
+        """চালুর সময় (মাস্টারে) অর্ধেক লেখা শেষ রেকর্ড কেটে ফেলে; অসম্পন্ন বাইট সংখ্যা দেয়"""
+        with self.lock.hold():
+            bases = self._segments()
+            if not bases and os.path.exists(self.path):
+                # সেগমেন্টের আগের একক-ফাইল লগ: সেটিই প্রথম সেগমেন্ট
+                os.rename(self.path, self._segment_path(0))
+                bases = [0]
+            ack = self._read_ack()
+            if not bases:
+                self._base.value = ack
+                return 0
+
+            last = bases[-1]
+            end = last + self._segment_size(last)
+            if ack < bases[0] or ack > end:
+                print(f"⚠️ {self.path}: ack offset {ack} is outside the log, replaying all of it")
+                ack = bases[0]
+                self._write_ack(ack)
+
+            good = max(ack, last)
+            for _, good, _ in self._records(max(ack, last)):
+                pass
+            if good < end:
+                print(f"⚠️ {self.path}: dropping {end - good} bytes of a torn record")
+                os.truncate(self._segment_path(last), good - last)
+            self._base.value = last
+            return good - ack
+
+    def append(self, payload, put):
+        """
+        লক ধরে রেকর্ডটি লগে লেখে, তারপর put(offset, end) দিয়ে কিউতে দেয়।
+        লেখা বা put ব্যর্থ হলে (যেমন ENOSPC বা queue.Full) লেখাটুকু কেটে ফেলে
+        ত্রুটিটি আবার তোলে। লক পাওয়া না গেলে কিছু না করে False দেয়।
+        """
+        record = _HEADER.pack(len(payload)) + payload
+        with self.lock.hold() as locked:
+            if not locked:
+                return False
+            base = self._base.value
+            fd = self._writer(base)
+            position = os.lseek(fd, 0, os.SEEK_END)
+            if position >= SEGMENT_BYTES:
+                base += position
+                self._base.value = base
+                fd = self._writer(base)
+                position = 0
+            offset = base + position
+            try:
+                written = os.pwrite(fd, record, position)
+                if written != len(record):
+                    raise OSError(errno.ENOSPC, "short write to the ingress log")
+                if LOG_FSYNC:
+                    os.fsync(fd)
+                put(offset, offset + len(record))
+            except BaseException:
+                try:
+                    os.ftruncate(fd, position)
+                except OSError:
+                    pass
+                raise
+        return True
+
+    def take(self):
+        """
+        (সুপারভাইজার) অবসরে যাওয়া লেনের অসম্পন্ন রেকর্ডগুলো তুলে নিয়ে লগটি খালি করে,
+        যাতে সেগুলো অন্য ওয়ার্কারে পাঠানো যায়
+        """
+        with self.lock.hold():
+            records = list(self._records(self._read_ack()))
+            end = self.size()
+            # নতুন (খালি) সেগমেন্ট থেকে পরের লেখা শুরু, তাই পুরনোগুলো সব মুছে ফেলা যায়
+            open(self._segment_path(end), "ab").close()
+            self._base.value = end
+            self._write_ack(end)
+            self._drop_before(end)
+        return [payload for _, _, payload in records]
+
+    # --- ওয়ার্কার ---
+
+    def replay(self):
+        """ack এর পর থেকে লগের শেষ পর্যন্ত আইটেমগুলো (কিউয়ের আইটেমের মতো খাম সহ)"""
+        with self.lock.hold():
+            self._committed = self._trimmed = self._read_ack()
+            self._done = {}
+            self._drop_before(self._committed)
+            records = list(self._records(self._committed))
+        # লক ছাড়া পড়া হলে শেষে অর্ধেক লেখা রেকর্ড থাকতে পারে; সেটি কিউ থেকেই আসবে
+        self._replay_end = records[-1][1] if records else self._committed
+        return [envelope(payload, None, offset, end) for offset, end, payload in records]
+
+    def replayed(self, offset):
+        """কিউয়ের এই আইটেমটি কি replay() এ আগেই চালানো হয়েছে"""
+        return offset is not None and offset < self._replay_end
+
+    def ack(self, offset, end):
+        """একটি আপডেটের কাজ শেষ; টানা সম্পন্ন অংশ বাড়লে .ack ফাইলে লেখে"""
+        self._done[offset] = end
+        committed = self._committed
+        while committed in self._done:
+            committed = self._done.pop(committed)
+        if committed == self._committed:
+            return
+        self._committed = committed
+        self._write_ack(committed)
+        if committed - self._trimmed >= SEGMENT_BYTES:
+            # সম্পন্ন সেগমেন্টগুলো মুছে ফেলা হয়; লক লাগে না, কারণ লেখা হয় শুধু শেষটিতে
+            self._trimmed = committed
+            self._drop_before(committed)
+
+    def lag(self):
+        """লগে এখনো সম্পন্ন না হওয়া অংশ (বাইট)"""
+        return max(0, self.size() - self._committed)
@@ -0,0 +1,215 @@
+import os
+import time
+import json
+from contextvars import ContextVar
+
+# ==========================================
+# ⚙️ কনফিগারেশন
+# ==========================================
+# প্রতিটি ওয়ার্কারের মেট্রিক্স স্ন্যাপশটের জন্য শেয়ার্ড বাফারের আকার (বাইট)
+SNAPSHOT_SIZE = int(os.getenv("METRICS_SNAPSHOT_SIZE", str(64 * 1024)))
+
+# হিস্টোগ্রামের বাকেট (সেকেন্ড)
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+# ==========================================
+# 📊 প্রসেস-লোকাল মেট্রিক্স
+# ==========================================
+# প্রতিটি প্রসেস নিজের কাউন্টার/হিস্টোগ্রাম রাখে (লক ছাড়া, ইভেন্ট লুপের ভেতরে)।
+# বট ওয়ার্কার হার্টবিটের সাথে স্ন্যাপশট শেয়ার্ড বাফারে লেখে, আর ওয়েব প্রসেস
+# /metrics এ সব ওয়ার্কারের স্ন্যাপশট যোগ করে দেখায়।
+
+_counters = {}
+_gauges = {}
+_histograms = {}
+_gauge_callbacks = {}
+
+# বর্তমান আপডেটের ট্রেস (ডিসপ্যাচার প্রতিটি হ্যান্ডলার টাস্কে সেট করে)
+current_trace = ContextVar("current_trace", default=None)
+
+
+def _key(name, labels):
+    if not labels:
+        return name
+    return name + "{" + ",".join(f'{k}="{v}"' for k, v in sorted(labels.items())) + "}"
+
+
+def inc(name, value=1, **labels):
+    key = _key(name, labels)
+    _counters[key] = _counters.get(key, 0) + value
+
+
+def set_gauge(name, value, **labels):
+    _gauges[_key(name, labels)] = value
+
+
+def gauge_callback(name, func, **labels):
+    """স্ন্যাপশট নেওয়ার সময় func() ডেকে গেজের মান নেওয়া হবে"""
+    _gauge_callbacks[_key(name, labels)] = func
+
+
+def observe(name, seconds, **labels):
+    key = _key(name, labels)
+    hist = _histograms.get(key)
+    if hist is None:
+        # প্রতিটি বাকেটের গণনা, তারপর sum ও count
+        hist = _histograms[key] = [0] * (len(BUCKETS) + 2)
+    for index, bound in enumerate(BUCKETS):
+        if seconds <= bound:
+            hist[index] += 1
+            break
+    hist[-2] += seconds
+    hist[-1] += 1
+
+
+def snapshot():
+    gauges = dict(_gauges)
+    for key, func in _gauge_callbacks.items():
+        gauges[key] = func()
+    return {"c": _counters, "g": gauges, "h": _histograms}
+
+# ==========================================
+# 🧭 আপডেট ট্রেস
+# ==========================================
+
+class Trace:
+    """
+    একটি আপডেটের বিভিন্ন ধাপের সময় (time.time())।
+    received/enqueued ওয়েব প্রসেসে, বাকিগুলো বট ওয়ার্কারে লেখা হয়।
+    offset/end: ইনগ্রেস লগে আপডেটটির অবস্থান (লগ বন্ধ থাকলে None), কাজ শেষে ack এর জন্য
+    """
+
+    __slots__ = ("received", "enqueued", "dequeued", "started", "first_send", "offset", "end")
+
+    def __init__(self, received=None, enqueued=None, offset=None, end=None):
+        self.received = received
+        self.enqueued = enqueued
+        self.offset = offset
+        self.end = end
+        self.dequeued = time.time()
+        self.started = None
+        self.first_send = None
+
+    def finish(self, handler):
+        """হ্যান্ডলার শেষ হলে সব ধাপের সময় হিস্টোগ্রামে যোগ করে"""
+        now = time.time()
+        stages = (
+            ("ingress", self.received, self.enqueued),
+            ("queue", self.enqueued, self.dequeued),
+            ("dispatch", self.dequeued, self.started),
+            ("handler", self.started, now),
+            ("first_send", self.received, self.first_send),
+            ("total", self.received, now),
+        )
+        for stage, start, end in stages:
+            if start is not None and end is not None:
+                observe("bot_update_stage_seconds", max(0.0, end - start), stage=stage)
+        observe("bot_handler_seconds", now - self.started, handler=handler)
+
+
+def envelope(payload, received, offset=None, end=None):
+    """
+    ওয়েব হুক থেকে কিউতে যাওয়া আইটেম:
+    (কাঁচা আপডেট, রিসিভের সময়, কিউতে দেওয়ার সময়, লগের অফসেট, লগে রেকর্ডের শেষ)
+    """
+    return (payload, received, time.time(), offset, end)
+
+
+def open_envelope(item):
+    """কিউ থেকে পাওয়া আইটেম থেকে কাঁচা আপডেট ও তার ট্রেস বের করে"""
+    if isinstance(item, tuple):
+        payload, received, enqueued, offset, end = item
+        return payload, Trace(received, enqueued, offset, end)
+    return item, Trace()
+
+
+def payload_of(item):
+    return item[0] if isinstance(item, tuple) else item
+
+
+def offset_of(item):
+    return item[3] if isinstance(item, tuple) else None
+
+
+def mark_send():
+    """টেলিগ্রামে প্রথম মেসেজ পাঠানোর সময় ট্রেসে লেখে"""
+    trace = current_trace.get()
+    if trace is not None and trace.first_send is None:
+        trace.first_send = time.time()
+
+# ==========================================
+# 📤 প্রসেসগুলোর মধ্যে শেয়ার ও এক্সপোর্ট
+# ==========================================
+
+def publish(buffer):
+    """এই প্রসেসের স্ন্যাপশট শেয়ার্ড বাফারে (multiprocessing.Array('c')) লেখে"""
+    data = json.dumps(snapshot(), separators=(",", ":")).encode()
+    if len(data) >= len(buffer):
+        print(f"⚠️ Metrics snapshot too large ({len(data)} bytes), increase METRICS_SNAPSHOT_SIZE")
+        return
+    with buffer.get_lock():
+        buffer.value = data
+
+
+def read(buffer):
+    with buffer.get_lock():
+        data = buffer.value
+    return json.loads(data) if data else None
+
+
+def merge(snapshots):
+    """একাধিক ওয়ার্কারের স্ন্যাপশট যোগ করে একটিতে পরিণত করে"""
+    merged = {"c": {}, "g": {}, "h": {}}
+    for snap in snapshots:
+        for kind in ("c", "g"):
+            for key, value in snap.get(kind, {}).items():
+                merged[kind][key] = merged[kind].get(key, 0) + value
+        for key, values in snap.get("h", {}).items():
+            total = merged["h"].get(key)
+            merged["h"][key] = values[:] if total is None else [a + b for a, b in zip(total, values)]
+    return merged
+
+
+def _with_label(key, label):
+    name, brace, rest = key.partition("{")
+    return f"{name}{{{label},{rest}" if brace else f"{name}{{{label}}}"
+
+
+def render(ingresses):
+    """সব বটের মেট্রিক্স Prometheus টেক্সট ফরম্যাটে"""
+    lines = []
+    for ingress in ingresses:
+        bot = f'bot="{ingress.name}"'
+        stats = ingress.stats()
+        lines.append(f'bot_webhook_updates_total{{{bot},result="accepted"}} {stats["accepted"]}')
+        lines.append(f'bot_webhook_updates_total{{{bot},result="rejected"}} {stats["dropped"]}')
+        lines.append(f'bot_webhook_updates_total{{{bot},result="duplicate"}} {stats["duplicates"]}')
+        lines.append(f"bot_workers{{{bot}}} {stats['workers']}")
+        snapshots = []
+        for index, lane in enumerate(ingress.lanes[:ingress.workers]):
+            worker = f'{bot},worker="{index}"'
+            lines.append(f"bot_queue_depth{{{worker}}} {max(0, lane.depth())}")
+            lines.append(f"bot_worker_restarts_total{{{worker}}} {lane.restarts.value}")
+            lines.append(f"bot_loop_lag_seconds{{{worker}}} {lane.slot.loop_lag.value}")
+            age = lane.slot.heartbeat_age()
+            if age is not None:
+                lines.append(f"bot_heartbeat_age_seconds{{{worker}}} {age:.3f}")
+            snap = read(lane.slot.metrics)
+            if snap:
+                snapshots.append(snap)
+
+        merged = merge(snapshots)
+        for kind in ("c", "g"):
+            for key, value in sorted(merged[kind].items()):
+                lines.append(f"{_with_label(key, bot)} {value}")
+        for key, values in sorted(merged["h"].items()):
+            name, _, rest = key.partition("{")
+            labels = bot + ("," + rest[:-1] if rest else "")
+            cumulative = 0
+            for bound, count in zip(BUCKETS, values):
+                cumulative += count
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {values[-1]}')
+            lines.append(f"{name}_sum{{{labels}}} {values[-2]:.6f}")
+            lines.append(f"{name}_count{{{labels}}} {values[-1]}")
+    return "\n".join(lines) + "\n"
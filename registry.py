@@ -0,0 +1,59 @@
+import os
+import json
+import signal
+import importlib
+from functools import partial
+
+# ==========================================
+# ⚙️ কনফিগারেশন
+# ==========================================
+# কোন কোন বট চলবে তার তালিকা (নাম, মডিউল, টোকেনের env ভেরিয়েবল)
+BOTS_CONFIG = os.getenv("BOTS_CONFIG", os.path.join(os.path.dirname(os.path.abspath(__file__)), "bots.json"))
+
+# ==========================================
+# 📋 বট রেজিস্ট্রি
+# ==========================================
+# ওয়েব প্রসেস এখান থেকে শুধু নাম ও টোকেন জানে, কোনো বটের কোড ইমপোর্ট করে না।
+# বটের মডিউল (এবং python-telegram-bot) শুধু তার নিজের ওয়ার্কার প্রসেসে লোড হয়,
+# ফলে প্যারেন্ট প্রসেস দ্রুত চালু হয় এবং কম মেমরি নেয়।
+
+class BotSpec:
+    """bots.json এর একটি এন্ট্রি"""
+
+    def __init__(self, name, module, token_env, workers_env=None, max_connections=None, allowed_updates=None):
+        self.name = name
+        self.module = module
+        self.token_env = token_env
+        self.workers_env = workers_env
+        # ওয়েব হুক সেটিংস (না থাকলে webhook_setup এর ডিফল্ট)
+        self.max_connections = max_connections
+        self.allowed_updates = allowed_updates
+
+    @property
+    def token(self):
+        return os.getenv(self.token_env)
+
+    @property
+    def workers(self):
+        """workers_env দেওয়া না থাকলে বা খালি থাকলে None (ডিফল্ট BOT_WORKERS)"""
+        value = os.getenv(self.workers_env, "") if self.workers_env else ""
+        return int(value) if value else None
+
+    @property
+    def target(self):
+        """ওয়ার্কার প্রসেসের এন্ট্রি পয়েন্ট (spawn এও pickle করা যায়)"""
+        return partial(run_worker, self.module)
+
+
+def load_registry(path=None):
+    with open(path or BOTS_CONFIG, encoding="utf-8") as f:
+        return [BotSpec(**entry) for entry in json.load(f)]
+
+
+def run_worker(module, input_queue, probe=None):
+    """ওয়ার্কার প্রসেসের ভেতরে বটের মডিউল ইমপোর্ট করে তার run_bot চালায়"""
+    # মাস্টারের (gunicorn/শাটডাউন) সিগন্যাল হ্যান্ডলার উত্তরাধিকার সূত্রে আসে, সেগুলো সরানো হয়;
+    # বট লুপ চালু হলে নিজের হ্যান্ডলার বসায় (AsyncQueueBridge.drain_on_signals)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.default_int_handler)
+    importlib.import_module(module).run_bot(input_queue, probe)
@@ -0,0 +1,340 @@
+import os
+import time
+import queue
+import threading
+import multiprocessing
+
+# ==========================================
+# ⚙️ কনফিগারেশন
+# ==========================================
+# কত সেকেন্ড পর পর ওয়ার্কারদের অবস্থা দেখা হবে
+CHECK_INTERVAL = float(os.getenv("SUPERVISOR_INTERVAL", "2"))
+# হার্টবিট এত সেকেন্ড পুরনো হলে ওয়ার্কারকে আটকে যাওয়া ধরা হবে
+STALL_TIMEOUT = float(os.getenv("WORKER_STALL_TIMEOUT", "30"))
+# চালু হওয়ার পর প্রথম হার্টবিটের জন্য কত সেকেন্ড অপেক্ষা
+STARTUP_GRACE = float(os.getenv("WORKER_STARTUP_GRACE", "60"))
+# বারবার ক্র্যাশ করলে রিস্টার্টের আগে অপেক্ষা (এক্সপোনেনশিয়াল ব্যাকঅফ)
+BACKOFF_BASE = float(os.getenv("WORKER_BACKOFF_BASE", "1"))
+BACKOFF_MAX = float(os.getenv("WORKER_BACKOFF_MAX", "60"))
+# এত সেকেন্ড টিকে থাকলে ব্যাকঅফ আবার শুরু থেকে গোনা হবে
+STABLE_UPTIME = float(os.getenv("WORKER_STABLE_UPTIME", "60"))
+# stop সিগন্যালের পর কিউ ছেড়ে দেওয়ার জন্য কত সেকেন্ড অপেক্ষা
+STOP_TIMEOUT = float(os.getenv("WORKER_STOP_TIMEOUT", "5"))
+# ওয়ার্কার কমানোর সময় হাতে থাকা আপডেট শেষ করার জন্য কত সেকেন্ড দেওয়া হবে
+DRAIN_TIMEOUT = float(os.getenv("WORKER_DRAIN_TIMEOUT", "30"))
+# শাটডাউনে (SIGTERM) সব ওয়ার্কার বন্ধ হওয়ার মোট সময়সীমা; হোস্টের kill এর আগেই শেষ হওয়া উচিত
+SHUTDOWN_TIMEOUT = float(os.getenv("WORKER_SHUTDOWN_TIMEOUT", "25"))
+
+# পুরনো কিউয়ের লক সুস্থ কিনা যাচাইয়ের চিহ্ন (আপডেট সবসময় bytes, তাই মিলবে না)
+_PROBE = "__slot_probe__"
+
+# ==========================================
+# 🩺 ওয়ার্কার সুপারভাইজার
+# ==========================================
+
+def _process_alive(process):
+    if not process.is_alive():
+        return False
+    # gunicorn মাস্টার নিজের SIGCHLD হ্যান্ডলারে আমাদের প্রসেসও reap করে ফেলতে পারে,
+    # তখন is_alive() ভুল করে True দেয়; তাই সরাসরি pid চেক করা হয়
+    try:
+        os.kill(process.pid, 0)
+    except ProcessLookupError:
+        return False
+    return True
+
+
+class _Worker:
+    def __init__(self, name, target, ingress, lane):
+        self.name = name
+        self.target = target
+        self.ingress = ingress
+        self.lane = lane
+        self.process = None
+        self.failures = 0
+        self.next_start = 0.0
+        self.poisoned = set()
+
+
+class _Bot:
+    def __init__(self, target, ingress):
+        self.target = target
+        self.ingress = ingress
+        self.workers = []
+
+
+class WorkerSupervisor(threading.Thread):
+    """
+    প্রতিটি বট প্রসেসের উপর নজর রাখে (ওয়েব প্রসেস / gunicorn মাস্টারে চলে)।
+
+    - প্রসেস ক্র্যাশ করলে বা হার্টবিট থেমে গেলে (ইভেন্ট লুপ আটকে গেলে)
+      ব্যাকঅফ সহ নতুন প্রসেস চালু করে
+    - পুরনো কিউতে জমে থাকা আপডেট নতুন ওয়ার্কারের হাতে তুলে দেয়
+    - ingress এর কাঙ্ক্ষিত ওয়ার্কার সংখ্যা বদলালে ওয়ার্কার যোগ/বাদ দেয়
+    - রিস্টার্ট সংখ্যা ও আপটাইম ingress এর শেয়ার্ড কাউন্টারে লেখে
+    """
+
+    def __init__(self):
+        super().__init__(name="WorkerSupervisor", daemon=True)
+        self._bots = []
+        self._lock = threading.Lock()
+        self._closing = False
+        # শাটডাউন শুরু হলে সব অপেক্ষার শেষ সময় (monotonic)
+        self._deadline = float("inf")
+        # বাদ দেওয়া হচ্ছে এমন ওয়ার্কার: [(bot, worker, thread)]
+        self._retiring = []
+
+    def add(self, target, ingress):
+        """বটের সব ওয়ার্কার প্রসেস চালু করে নজরদারির তালিকায় যোগ করে"""
+        bot = _Bot(target, ingress)
+        with self._lock:
+            self._bots.append(bot)
+            for _ in range(ingress.workers):
+                self._add_worker(bot)
+        return [worker.process for worker in bot.workers]
+
+    def _add_worker(self, bot):
+        index = len(bot.workers)
+        name = bot.ingress.name if index == 0 else f"{bot.ingress.name}-{index}"
+        worker = _Worker(name, bot.target, bot.ingress, bot.ingress.lanes[index])
+        bot.workers.append(worker)
+        self._spawn(worker)
+        return worker
+
+    def _spawn(self, worker):
+        lane = worker.lane
+        slot = lane.slot
+        slot.reset()
+        process = multiprocessing.Process(
+            target=worker.target, args=(slot.queue, slot), name=worker.name
+        )
+        process.start()
+        worker.process = process
+        lane.pid.value = process.pid
+        lane.started_at.value = time.time()
+
+    def run(self):
+        while not self._closing:
+            time.sleep(CHECK_INTERVAL)
+            with self._lock:
+                if self._closing:
+                    break
+                self._retiring = [entry for entry in self._retiring if entry[2].is_alive()]
+                for bot in self._bots:
+                    try:
+                        self._rescale(bot)
+                    except Exception as e:
+                        print(f"Supervisor Error ({bot.ingress.name}): {e}")
+                    for worker in bot.workers:
+                        try:
+                            self._check(worker)
+                        except Exception as e:
+                            print(f"Supervisor Error ({worker.name}): {e}")
+
+    def shutdown(self, timeout=None):
+        """
+        সব বট গুছিয়ে বন্ধ করে। ওয়েব হুক নতুন আপডেট নেওয়া বন্ধ করে (503), ওয়ার্কাররা
+        অর্ধেক সময় পর্যন্ত কিউ খালি করে, বাকি সময়ে হাতে থাকা আপডেট শেষ করে বের হয়;
+        এর মধ্যে না হলে প্রসেস বন্ধ করে দেওয়া হয়।
+        """
+        started = time.monotonic()
+        timeout = timeout or SHUTDOWN_TIMEOUT
+        # বাদ পড়তে থাকা ওয়ার্কারদের অপেক্ষাও এই সময়ের মধ্যে শেষ হবে
+        self._deadline = started + timeout
+        with self._lock:
+            self._closing = True
+            for bot in self._bots:
+                bot.ingress.close()
+            workers = [
+                worker for bot in self._bots for worker in bot.workers
+                if worker.process is not None and _process_alive(worker.process)
+            ]
+            for worker in workers:
+                worker.lane.slot.drain.set()
+
+            for worker in workers:
+                worker.lane.slot.released.wait(max(0.0, started + timeout / 2 - time.monotonic()))
+            for worker in workers:
+                # কিউ এখনো খালি হয়নি; বাকিটা থাক, চলমান আপডেটগুলো শেষ হোক
+                worker.lane.slot.stop.set()
+            for worker in workers:
+                worker.process.join(max(0.0, started + timeout - time.monotonic()))
+
+            for worker in workers:
+                left = max(0, worker.lane.depth())
+                if _process_alive(worker.process):
+                    print(f"⚠️ {worker.name}: did not finish within {timeout:.0f}s, stopping it")
+                    self._stop_worker(worker)
+                if left:
+                    print(f"⚠️ {worker.name}: {left} queued updates left behind")
+
+            for _, worker, thread in self._retiring:
+                thread.join(max(0.0, started + timeout - time.monotonic()) + STOP_TIMEOUT)
+                if thread.is_alive():
+                    print(f"⚠️ {worker.name}: still retiring at shutdown")
+        print(f"🛑 All bot workers stopped in {time.monotonic() - started:.1f}s")
+
+    def _rescale(self, bot):
+        ingress = bot.ingress
+        desired = ingress.desired_workers
+        current = len(bot.workers)
+        if desired == current:
+            return
+
+        if desired > current:
+            if any(entry[0] is bot for entry in self._retiring):
+                # লেনটি এখনো আগের ওয়ার্কার ছাড়ছে; পরের চেকে আবার চেষ্টা হবে
+                return
+            # আগে প্রসেস চালু, তারপর শার্ড সরানো
+            for _ in range(desired - current):
+                self._add_worker(bot)
+            ingress.assign(desired)
+            print(f"📈 {ingress.name}: scaled up to {desired} workers")
+            return
+
+        # আগে নতুন আপডেট অন্য ওয়ার্কারে পাঠানো, তারপর বাড়তি ওয়ার্কার বন্ধ।
+        # বন্ধ হতে অনেকক্ষণ লাগতে পারে, তাই আলাদা থ্রেডে; এর মধ্যেও হেলথ চেক চলে
+        ingress.assign(desired)
+        while len(bot.workers) > desired:
+            worker = bot.workers.pop()
+            thread = threading.Thread(target=self._retire, args=(worker,), name=f"Retire-{worker.name}", daemon=True)
+            self._retiring.append((bot, worker, thread))
+            thread.start()
+        print(f"📉 {ingress.name}: scaling down to {desired} workers")
+
+    def _retire(self, worker):
+        """
+        ওয়ার্কারকে কিউ পড়া বন্ধ করতে বলে, হাতে থাকা আপডেটগুলো শেষ করার সময় দেয়,
+        তারপর কিউতে বাকি থাকা আপডেট শার্ড টেবিল অনুযায়ী অন্য ওয়ার্কারে পাঠায়।
+        ইনগ্রেস লগ চালু থাকলে কিউ নয়, লগের অসম্পন্ন রেকর্ডগুলো পাঠানো হয়
+        (কিউয়ের সবকিছু সেখানে আছে, শেষ না হওয়া চলমান আপডেটগুলোও)।
+        """
+        slot = worker.lane.slot
+        slot.stop.set()
+        slot.released.wait(STOP_TIMEOUT)
+        # শাটডাউন শুরু হলে তার সময়সীমার বেশি অপেক্ষা করা হয় না
+        deadline = time.monotonic() + DRAIN_TIMEOUT
+        while _process_alive(worker.process):
+            left = min(deadline, self._deadline) - time.monotonic()
+            if left <= 0:
+                break
+            worker.process.join(min(left, 0.5))
+        if _process_alive(worker.process):
+            self._stop_worker(worker)
+        worker.lane.pid.value = 0
+        worker.lane.started_at.value = 0.0
+
+        journal = worker.lane.journal
+        moved = 0
+        try:
+            while True:
+                item = slot.queue.get(timeout=0.2)
+                if journal is None:
+                    worker.ingress.redirect(item)
+                    moved += 1
+        except (queue.Empty, queue.Full):
+            pass
+        if journal is not None:
+            try:
+                for payload in journal.take():
+                    worker.ingress.redirect(payload)
+                    moved += 1
+            except queue.Full:
+                pass
+        leftover = worker.lane.depth()
+        if leftover > 0:
+            print(f"⚠️ {worker.name}: {leftover} queued updates could not be moved")
+        print(f"🔁 {worker.name}: retired, {moved} queued updates moved to other workers")
+
+    def _check(self, worker):
+        process = worker.process
+        lane = worker.lane
+        now = time.monotonic()
+
+        if not worker.next_start:
+            uptime = time.time() - lane.started_at.value
+            if _process_alive(process):
+                age = lane.slot.heartbeat_age()
+                stalled = age > STALL_TIMEOUT if age is not None else uptime > STARTUP_GRACE
+                if not stalled:
+                    if uptime > STABLE_UPTIME:
+                        worker.failures = 0
+                    return
+                print(f"🩺 {worker.name} looks stuck (heartbeat age: {age}), restarting...")
+                self._stop_worker(worker)
+            elif process.exitcode == 0:
+                # নিজে থেকে ঠিকভাবে বন্ধ হয়েছে (যেমন টোকেন নেই), রিস্টার্টের দরকার নেই
+                return
+            else:
+                print(f"🩺 {worker.name} died (exit code: {process.exitcode}), restarting...")
+
+            worker.failures += 1
+            worker.next_start = now + min(BACKOFF_MAX, BACKOFF_BASE * (2 ** (worker.failures - 1)))
+
+        if now < worker.next_start:
+            return
+        worker.next_start = 0.0
+
+        self._hand_over(worker)
+        with lane.restarts.get_lock():
+            lane.restarts.value += 1
+        self._spawn(worker)
+
+    def _stop_worker(self, worker):
+        """কিউয়ের লক ছেড়ে দেওয়ার সুযোগ দিয়ে তারপর প্রসেসটি বন্ধ করে"""
+        slot = worker.lane.slot
+        slot.stop.set()
+        slot.released.wait(STOP_TIMEOUT)
+        worker.process.terminate()
+        worker.process.join(STOP_TIMEOUT)
+        if _process_alive(worker.process):
+            worker.process.kill()
+            worker.process.join(STOP_TIMEOUT)
+
+    def _hand_over(self, worker):
+        """
+        পুরনো ওয়ার্কার কিউ ঠিকভাবে ছেড়ে গেলে একই কিউ নতুন ওয়ার্কার পায়
+        (জমে থাকা আপডেটসহ)। না ছাড়লে (যেমন SIGKILL/OOM) কিউয়ের লক আটকে
+        থাকতে পারে; তখন একটি অতিরিক্ত কিউতে সুইচ করে পুরনোটি খালি করা হয়।
+        """
+        lane = worker.lane
+        old_index = lane.active_index
+        old_slot = lane.slot
+        if old_slot.released.is_set():
+            return
+
+        spare = next(
+            (idx for idx in range(len(lane.slots))
+             if idx != old_index and idx not in worker.poisoned),
+            None,
+        )
+        if spare is None:
+            print(f"⚠️ {worker.name}: no spare queue left, reusing the old one")
+            return
+
+        lane.activate(spare)
+        old_queue = old_slot.queue
+        new_queue = lane.slots[spare].queue
+        moved = 0
+        try:
+            while True:
+                try:
+                    item = old_queue.get(timeout=0.2)
+                except queue.Empty:
+                    break
+                new_queue.put(item, timeout=1)
+                moved += 1
+            # খালি দেখালেও লক আটকে থাকতে পারে; একটি প্রোব ফিরিয়ে আনতে পারলে কিউটি সুস্থ
+            old_queue.put(_PROBE, timeout=1)
+            while True:
+                item = old_queue.get(timeout=1)
+                if item == _PROBE:
+                    break
+                new_queue.put(item, timeout=1)
+                moved += 1
+        except (queue.Empty, queue.Full):
+            worker.poisoned.add(old_index)
+            leftover = lane.depth_of(old_index)
+            print(f"⚠️ {worker.name}: old queue #{old_index} is locked, {max(0, leftover)} updates could not be recovered")
+        print(f"🔁 {worker.name}: switched to queue #{spare}, {moved} queued updates handed over")
+
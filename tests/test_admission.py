@@ -0,0 +1,157 @@
+import asyncio
+import types
+
+import pytest
+
+from bots.admission import AdmissionControl, Rejected
+from bots.dispatcher import ChatDispatcher
+from metrics import Trace
+
+
+def _control(**kwargs):
+    options = dict(user_rate=0.01, user_burst=10, global_rate=1000, global_burst=1000,
+                   max_inflight=1, queue_limit=10, queue_timeout=5)
+    options.update(kwargs)
+    return AdmissionControl(**options)
+
+
+def test_user_over_quota_is_rejected_at_once():
+    async def main():
+        admission = _control(user_burst=2, max_inflight=10)
+        await admission.acquire(1, 1)
+        await admission.acquire(1, 1)
+        with pytest.raises(Rejected) as rejected:
+            await admission.acquire(1, 1)
+        # অন্য ইউজারের কোটা আলাদা
+        await admission.acquire(2, 1)
+        return rejected.value
+
+    rejected = asyncio.run(main())
+    assert rejected.reason == "user"
+    assert rejected.retry_after > 0
+
+
+def test_full_queue_rejects_busy_and_release_admits_waiter():
+    async def main():
+        admission = _control(queue_limit=1)
+        first = await admission.acquire(1, 1)
+        waiter = asyncio.create_task(admission.acquire(2, 1))
+        await asyncio.sleep(0)
+        with pytest.raises(Rejected) as rejected:
+            await admission.acquire(3, 1)
+        assert rejected.value.reason == "busy"
+        assert not waiter.done()
+
+        first.release()
+        first.release()
+        ticket = await asyncio.wait_for(waiter, 1)
+        assert admission.stats()["inflight"] == 1
+        ticket.release()
+        return admission.stats()
+
+    stats = asyncio.run(main())
+    assert stats["inflight"] == 0
+    assert stats["waiting"] == 0
+    assert stats["rejected"] == 1
+
+
+def test_heavy_user_does_not_starve_light_user():
+    async def main():
+        admission = _control()
+        held = await admission.acquire(0, 1)
+        order, tickets = [], []
+
+        async def ask(user_id, cost):
+            tickets.append(await admission.acquire(user_id, cost))
+            order.append(user_id)
+
+        tasks = [asyncio.create_task(ask("heavy", 5)) for _ in range(3)]
+        tasks += [asyncio.create_task(ask("light", 1)) for _ in range(3)]
+        await asyncio.sleep(0)
+
+        held.release()
+        while len(order) < 6:
+            await asyncio.sleep(0)
+            if tickets:
+                tickets.pop().release()
+        await asyncio.gather(*tasks)
+        return order
+
+    order = asyncio.run(main())
+    assert order[:3] == ["light", "light", "light"]
+    assert order[3:] == ["heavy", "heavy", "heavy"]
+
+
+def test_global_caps_are_split_across_workers():
+    workers = types.SimpleNamespace(value=4)
+    admission = AdmissionControl(global_rate=8, global_burst=20, max_inflight=16, workers=workers)
+    stats = admission.stats()
+    assert stats["max_inflight"] == 4
+    assert stats["global_capacity"] == 5.0
+
+    workers.value = 1
+    stats = admission.stats()
+    assert stats["max_inflight"] == 16
+    assert stats["global_capacity"] == 20
+
+    workers.value = 64
+    stats = admission.stats()
+    assert stats["max_inflight"] == 1
+    assert stats["global_capacity"] == 1.0
+
+
+class _App:
+    def __init__(self, handle):
+        self.handlers = {}
+        self._handle = handle
+
+    async def process_update(self, update):
+        await self._handle(update)
+
+
+class _Ticket:
+    released = False
+
+    def release(self):
+        self.released = True
+
+
+def _update(update_id, chat_id):
+    chat = types.SimpleNamespace(id=chat_id)
+    return types.SimpleNamespace(update_id=update_id, effective_chat=chat, effective_user=None)
+
+
+def test_waiting_admission_does_not_hold_a_dispatcher_slot():
+    async def main():
+        gate = asyncio.Event()
+        ticket = _Ticket()
+        handled, acked = [], []
+
+        async def admit(update, handler):
+            if update.update_id == 1:
+                await gate.wait()
+                return ticket
+            if update.update_id == 2:
+                return False
+            return None
+
+        async def handle(update):
+            handled.append(update.update_id)
+
+        dispatcher = ChatDispatcher(_App(handle), max_concurrency=1, admit=admit,
+                                    on_done=lambda trace: acked.append(trace.offset))
+        for update_id, chat_id in ((1, 1), (2, 1), (3, 2)):
+            dispatcher.submit(_update(update_id, chat_id), Trace(offset=update_id))
+        # চ্যাট ১ ভর্তির অপেক্ষায়, তবু চ্যাট ২ এর আপডেট একমাত্র জায়গাটি পায়
+        await asyncio.sleep(0.01)
+        assert handled == [3]
+        assert not ticket.released
+
+        gate.set()
+        await dispatcher.join(timeout=1)
+        return handled, acked, ticket.released
+
+    handled, acked, released = asyncio.run(main())
+    assert handled == [3, 1]
+    assert sorted(acked) == [1, 2, 3]
+    assert released
@@ -0,0 +1,112 @@
+import asyncio
+import time
+import types
+
+from bots.ai_cache import ResponseCache
+from bots.bursts import BurstTracker, SKIP
+from bots.dispatcher import ChatDispatcher
+from metrics import Trace
+
+
+def _update(message_id, text="hi", chat_id=1, user_id=9):
+    message = types.SimpleNamespace(
+        message_id=message_id, chat_id=chat_id, text=text, photo=None,
+        from_user=types.SimpleNamespace(id=user_id),
+    )
+    return types.SimpleNamespace(
+        message=message, update_id=message_id,
+        effective_chat=types.SimpleNamespace(id=chat_id), effective_user=message.from_user,
+    )
+
+
+def test_merge_answers_an_idle_user_without_waiting():
+    async def main():
+        bursts = BurstTracker("merge", window=5)
+        update = _update(1, "a")
+        bursts.note(update)
+        started = time.monotonic()
+        assert await bursts.begin(update.message, "a") == "a"
+        return time.monotonic() - started
+
+    assert asyncio.run(main()) < 1
+
+
+def test_merge_debounces_messages_sent_while_an_answer_runs():
+    async def main():
+        bursts = BurstTracker("merge", window=0.05)
+        first, second, third = _update(1, "a"), _update(2, "b"), _update(3, "c")
+        bursts.note(first)
+        assert await bursts.begin(first.message, "a") == "a"
+        bursts.track(first.message, asyncio.get_running_loop().create_future())
+        bursts.note(second)
+        bursts.done(first.message)
+
+        merged = asyncio.create_task(bursts.begin(second.message, "b"))
+        await asyncio.sleep(0.01)
+        bursts.note(third)
+        assert await merged == "b\nc"
+        assert await bursts.begin(third.message, "c") is SKIP
+
+    asyncio.run(main())
+
+
+def test_cancel_keeps_only_the_latest_question():
+    async def main():
+        bursts = BurstTracker("cancel")
+        first, second = _update(1, "a"), _update(2, "b")
+        bursts.note(first)
+        assert await bursts.begin(first.message, "a") == "a"
+        work = asyncio.create_task(asyncio.sleep(10))
+        bursts.track(first.message, work)
+        bursts.note(second)
+        await asyncio.sleep(0)
+        assert work.cancelled() and bursts.was_cancelled(first.message)
+        assert await bursts.begin(second.message, "b") == "b"
+
+    asyncio.run(main())
+
+
+def test_cache_waiters_survive_a_cancelled_leader():
+    async def main():
+        cache = ResponseCache(max_size=10, ttl=60)
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return "answer", True
+
+        leader = asyncio.create_task(cache.get_or_fetch("k", fetch))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(cache.get_or_fetch("k", fetch))
+        await asyncio.sleep(0)
+        leader.cancel()
+        assert await waiter == "answer"
+        assert len(calls) == 2
+
+    asyncio.run(main())
+
+
+class _App:
+    def __init__(self, handle):
+        self.handlers = {}
+        self._handle = handle
+
+    async def process_update(self, update):
+        await self._handle(update)
+
+
+def test_dispatcher_acks_a_handler_that_raises_cancelled():
+    async def main():
+        async def handle(update):
+            if update.update_id == 1:
+                raise asyncio.CancelledError()
+
+        acked = []
+        dispatcher = ChatDispatcher(_App(handle), on_done=lambda trace: acked.append(trace.offset))
+        for update_id in (1, 2):
+            dispatcher.submit(_update(update_id), Trace(offset=update_id))
+        await dispatcher.join(timeout=1)
+        return acked
+
+    assert asyncio.run(main()) == [1, 2]
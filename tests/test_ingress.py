@@ -0,0 +1,99 @@
+import json
+import queue
+
+import ingress
+from ingress import BotIngress, UpdateWindow, shard_of, update_id_of
+
+
+def test_window_drops_repeats_and_accepts_new_ids():
+    window = UpdateWindow(64)
+    assert window.claim(10)
+    assert not window.claim(10)
+    assert window.claim(11)
+    assert window.claim(9)
+    assert not window.claim(9)
+
+
+def test_window_release_lets_the_retry_through():
+    window = UpdateWindow(64)
+    assert window.claim(5)
+    window.release(5)
+    assert window.claim(5)
+
+
+def test_window_slides_and_forgets_old_bits():
+    window = UpdateWindow(64)
+    assert window.claim(1)
+    # ১ আর ৬৫ একই বিটে পড়ে; উইন্ডো সরে গেলে পুরনো চিহ্ন মুছে যায়
+    assert window.claim(65)
+    assert window.claim(66)
+    assert not window.claim(65)
+
+
+def test_window_restarts_when_ids_jump_back_past_the_window():
+    window = UpdateWindow(64)
+    assert window.claim(10_000)
+    # টেলিগ্রাম ক্রম নতুন করে শুরু করেছে: পুরনোর চেয়ে অনেক ছোট আইডি বাদ পড়বে না
+    assert window.claim(100)
+    assert window.claim(101)
+    assert not window.claim(100)
+    assert window.claim(10_000)
+
+
+def test_window_restarts_after_a_long_idle_gap():
+    window = UpdateWindow(64, idle_reset=-1)
+    assert window.claim(500)
+    # উইন্ডোর ভেতরের ছোট আইডি, কিন্তু দীর্ঘ বিরতির পর: নতুন ক্রম
+    assert window.claim(480)
+    assert window.claim(490)
+
+
+def _update(update_id, chat_id=1):
+    return json.dumps({"update_id": update_id, "message": {"chat": {"id": chat_id}}}).encode()
+
+
+def test_payload_helpers():
+    payload = _update(42, chat_id=-100)
+    assert update_id_of(payload) == 42
+    assert shard_of(payload) == shard_of(_update(7, chat_id=-100))
+
+
+def test_offer_dedups_and_releases_on_full_queue(monkeypatch):
+    monkeypatch.setattr(ingress, "LOG_DIR", "")
+    bot = BotIngress("T", maxsize=1, spare_slots=0, workers=1, max_workers=1)
+    assert bot.offer(_update(1))
+    assert bot.offer(_update(1))
+    assert bot.stats()["duplicates"] == 1
+    # কিউ ভর্তি: False, আর টেলিগ্রামের পরের চেষ্টা যেন ডুপ্লিকেট না ধরা হয়
+    assert not bot.offer(_update(2))
+    bot.lanes[0].queue.get(timeout=1)
+    assert bot.offer(_update(2))
+    assert bot.stats()["accepted"] == 2
+    try:
+        bot.lanes[0].queue.get(timeout=1)
+    except queue.Empty:
+        raise AssertionError("retried update was not queued")
+
+
+def test_window_fails_open_when_its_lock_is_stuck(monkeypatch):
+    import ingress_log
+    monkeypatch.setattr(ingress_log, "LOCK_TIMEOUT", 0.05)
+    window = UpdateWindow(64)
+    assert window.claim(1)
+    window._lock._lock.acquire()
+    assert window.claim(1)
+    window._lock._lock.release()
+
+
+def test_offer_refuses_when_the_log_cannot_be_written(monkeypatch, tmp_path):
+    monkeypatch.setattr(ingress, "LOG_DIR", str(tmp_path))
+    bot = BotIngress("L", maxsize=10, spare_slots=0, workers=1, max_workers=1)
+
+    def broken(payload, put):
+        raise OSError(28, "No space left on device")
+
+    monkeypatch.setattr(bot.lanes[0].journal, "append", broken)
+    assert not bot.offer(_update(1))
+    assert bot.stats()["dropped"] == 1
+    monkeypatch.undo()
+    assert bot.offer(_update(1))
@@ -0,0 +1,135 @@
+import os
+import queue
+
+import pytest
+
+import ingress_log
+from ingress_log import IngressLog
+from metrics import offset_of, payload_of
+
+
+@pytest.fixture
+def log(tmp_path):
+    journal = IngressLog(str(tmp_path / "bot-0.log"))
+    journal.recover()
+    return journal
+
+
+def _append(journal, payload, sink):
+    return journal.append(payload, lambda offset, end: sink.append((offset, end, payload)))
+
+
+def test_append_then_replay_from_ack(log):
+    sink = []
+    for payload in (b"a", b"bb", b"ccc"):
+        assert _append(log, payload, sink)
+    items = log.replay()
+    assert [payload_of(item) for item in items] == [b"a", b"bb", b"ccc"]
+    assert [offset_of(item) for item in items] == [offset for offset, _, _ in sink]
+
+    # টানা সম্পন্ন অংশই শুধু ack এ ওঠে
+    log.ack(*sink[1][:2])
+    assert log._read_ack() == 0
+    log.ack(*sink[0][:2])
+    assert log._read_ack() == sink[1][1]
+    assert [payload_of(item) for item in log.replay()] == [b"ccc"]
+
+
+def test_put_failure_leaves_nothing_in_the_log(log):
+    def full(offset, end):
+        raise queue.Full
+
+    with pytest.raises(queue.Full):
+        log.append(b"lost", full)
+    assert log.size() == 0
+    sink = []
+    _append(log, b"kept", sink)
+    assert sink[0][0] == 0
+    assert [payload_of(item) for item in log.replay()] == [b"kept"]
+
+
+def test_write_failure_never_reaches_the_queue(log, monkeypatch):
+    def no_space(fd, data, offset):
+        raise OSError(28, "No space left on device")
+
+    sink = []
+    monkeypatch.setattr(os, "pwrite", no_space)
+    with pytest.raises(OSError):
+        _append(log, b"x", sink)
+    assert sink == []
+    monkeypatch.undo()
+    assert log.size() == 0
+
+
+def test_replayed_items_are_skipped_in_the_queue(log):
+    sink = []
+    _append(log, b"old", sink)
+    log.replay()
+    _append(log, b"new", sink)
+    assert log.replayed(sink[0][0])
+    assert not log.replayed(sink[1][0])
+    assert not log.replayed(None)
+
+
+def test_segments_rotate_and_committed_ones_are_removed(log, monkeypatch):
+    monkeypatch.setattr(ingress_log, "SEGMENT_BYTES", 64)
+    sink = []
+    for index in range(40):
+        _append(log, b"update-%02d" % index, sink)
+    assert len(log._segments()) > 3
+    # অফসেট সেগমেন্ট পেরিয়েও একটানা
+    assert all(a[1] == b[0] for a, b in zip(sink, sink[1:]))
+
+    log.replay()
+    for offset, end, _ in sink[:30]:
+        log.ack(offset, end)
+    assert log._segments()[0] > 0
+    assert [payload_of(item) for item in log.replay()] == [payload for _, _, payload in sink[30:]]
+    assert log.lag() == sink[-1][1] - sink[30][0]
+
+
+def test_recover_cuts_a_torn_tail(tmp_path):
+    path = str(tmp_path / "bot-0.log")
+    journal = IngressLog(path)
+    journal.recover()
+    sink = []
+    _append(journal, b"whole", sink)
+    with open(journal._segment_path(0), "ab") as f:
+        f.write(b"\x10\x00\x00\x00part")
+
+    again = IngressLog(path)
+    assert again.recover() == sink[0][1]
+    assert again.size() == sink[0][1]
+    assert [payload_of(item) for item in again.replay()] == [b"whole"]
+
+
+def test_recover_adopts_a_single_file_log(tmp_path):
+    path = str(tmp_path / "bot-0.log")
+    with open(path, "wb") as f:
+        f.write(b"\x03\x00\x00\x00old")
+    journal = IngressLog(path)
+    assert journal.recover() == 7
+    assert [payload_of(item) for item in journal.replay()] == [b"old"]
+
+
+def test_take_empties_the_lane(log):
+    sink = []
+    for payload in (b"a", b"b"):
+        _append(log, payload, sink)
+    log.ack(*sink[0][:2])
+    assert log.take() == [b"b"]
+    assert log.replay() == []
+    _append(log, b"c", sink)
+    assert sink[-1][0] == sink[1][1]
+    assert [payload_of(item) for item in log.replay()] == [b"c"]
+
+
+def test_stuck_lock_falls_back_instead_of_hanging(log, monkeypatch):
+    monkeypatch.setattr(ingress_log, "LOCK_TIMEOUT", 0.05)
+    # লক ধরে থাকা প্রসেস মারা গেছে এমন অবস্থা
+    log.lock._lock.acquire()
+    sink = []
+    assert log.append(b"x", lambda offset, end: sink.append(offset)) is False
+    assert sink == []
+    log.lock._lock.release()
+    assert log.append(b"x", lambda offset, end: sink.append(offset)) is True
@@ -0,0 +1,58 @@
+import asyncio
+
+from bots.session_store import SQLiteSessionStore
+
+
+def make_store(tmp_path, **kwargs):
+    kwargs.setdefault("flush_interval", 60)
+    return SQLiteSessionStore(str(tmp_path / "sessions.db"), **kwargs)
+
+
+def test_missing_user_is_not_cached(tmp_path):
+    a = make_store(tmp_path)
+    b = make_store(tmp_path)
+    try:
+        assert a.get(1, "default") == "default"
+        b[1] = "s1"
+        b.flush()
+        # আগের miss মনে রাখা হয়নি, তাই অন্য প্রসেসের সেশন সাথে সাথে দেখা যায়
+        assert a.get(1) == "s1"
+    finally:
+        a.close()
+        b.close()
+
+
+def test_cached_session_expires_after_ttl(tmp_path):
+    a = make_store(tmp_path, cache_ttl=0)
+    b = make_store(tmp_path)
+    try:
+        b[1] = "old"
+        b.flush()
+        assert a.get(1) == "old"
+        b[1] = "new"
+        b.flush()
+        assert a.get(1) == "new"
+    finally:
+        a.close()
+        b.close()
+
+
+def test_unflushed_write_wins_over_disk(tmp_path):
+    store = make_store(tmp_path, cache_ttl=0)
+    try:
+        store[1] = "pending"
+        assert store.get(1) == "pending"
+    finally:
+        store.close()
+
+
+def test_lookup_reads_from_a_thread(tmp_path):
+    store = make_store(tmp_path)
+    try:
+        store[1] = "s1"
+        store.flush()
+        store._cache.clear()
+        assert asyncio.run(store.lookup(1)) == "s1"
+        assert asyncio.run(store.lookup(2, 2)) == 2
+    finally:
+        store.close()
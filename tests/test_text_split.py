@@ -0,0 +1,66 @@
+import re
+
+import pytest
+
+from bots.text_split import (
+    smart_split, split_spans, close_open_tags, utf16_len, _scan_tags,
+)
+from benchmarks.bench_smart_split import make_model_output
+
+
+@pytest.mark.parametrize("text", ["", "   \n ", "hello", "বাংলা 😀"])
+def test_short_text_is_one_chunk(text):
+    assert list(smart_split(text, 100)) == ([text] if text.strip() else [])
+
+
+@pytest.mark.parametrize("size_kb", [4, 20, 50])
+@pytest.mark.parametrize("plain", [False, True])
+def test_chunks_fit_and_stay_balanced(size_kb, plain):
+    text = make_model_output(size_kb, plain=plain)
+    chunks = list(smart_split(text, 4000))
+    assert len(chunks) > 1
+    for chunk in chunks:
+        assert utf16_len(chunk) <= 4000
+        # প্রতিটি টুকরোয় খোলা ট্যাগ বন্ধ হয়েছে
+        assert _scan_tags((), chunk, 0, len(chunk)) == ()
+
+
+def test_plain_text_splits_on_newline_then_space():
+    text = "aaaa bbbb\ncccc dddd eeee"
+    assert list(smart_split(text, 12)) == ["aaaa bbbb", "cccc dddd", "eeee"]
+
+
+def test_long_word_is_cut_hard():
+    assert list(smart_split("x" * 25, 10)) == ["x" * 10, "x" * 10, "x" * 5]
+
+
+def test_surrogate_pairs_are_not_split():
+    chunks = list(smart_split("😀" * 9, 4))
+    assert chunks == ["😀😀"] * 4 + ["😀"]
+
+
+def test_never_cuts_inside_tag_or_entity():
+    text = ('<a href="https://example.com/a b">link</a> &amp; ' * 40).strip()
+    for chunk in smart_split(text, 120):
+        assert not re.search(r"<[^>]*$", chunk)
+        assert not re.search(r"&#?\w*$", chunk)
+
+
+def test_open_tags_are_reopened_in_next_chunk():
+    text = "<b>" + "word " * 30 + "</b>"
+    chunks = list(smart_split(text, 60))
+    assert all(c.startswith("<b>") and c.endswith("</b>") for c in chunks)
+
+
+def test_split_spans_can_resume_from_any_chunk():
+    text = make_model_output(20)
+    spans = list(split_spans(text, 1000))
+    assert [chunk for _, _, chunk in spans] == list(smart_split(text, 1000))
+    start, stack, _ = spans[3]
+    assert list(split_spans(text, 1000, start, stack)) == spans[3:]
+
+
+def test_close_open_tags_drops_partial_tail():
+    assert close_open_tags("<b>bold <i>it") == "<b>bold <i>it</i></b>"
+    assert close_open_tags('<b>x</b> <a hr') == "<b>x</b> "
+    assert close_open_tags("fish &am") == "fish "
@@ -0,0 +1,89 @@
+import os
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+# ==========================================
+# ⚙️ কনফিগারেশন
+# ==========================================
+# টেলিগ্রাম প্রতিটি বটের জন্য একসাথে কতগুলো ওয়েব হুক কানেকশন খুলবে (১-১০০)
+MAX_CONNECTIONS = int(os.getenv("WEBHOOK_MAX_CONNECTIONS", "40"))
+# কোন ধরনের আপডেট পাঠানো হবে (কমা দিয়ে আলাদা); bots.json এ বট অনুযায়ী বদলানো যায়
+ALLOWED_UPDATES = [item.strip() for item in os.getenv("WEBHOOK_ALLOWED_UPDATES", "message").split(",") if item.strip()]
+# টেলিগ্রাম প্রতিটি রিকোয়েস্টে এই সিক্রেট হেডারে পাঠাবে (খালি থাকলে বন্ধ)
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET", "")
+# Bot API কলের টাইমআউট (সেকেন্ড)
+API_TIMEOUT = float(os.getenv("WEBHOOK_API_TIMEOUT", "10"))
+
+# Bot API সার্ভার (লোকাল বেঞ্চমার্কে নকল সার্ভার দেওয়া যায়)
+TELEGRAM_API_URL = os.getenv("TELEGRAM_API_URL", "https://api.telegram.org").rstrip("/")
+
+# ==========================================
+# 🔗 ওয়েব হুক রেজিস্ট্রেশন
+# ==========================================
+
+def webhook_url(base_url, token):
+    """
+    বটের ওয়েব হুক URL। getWebhookInfo সিক্রেট ফেরত দেয় না, তাই সিক্রেটের
+    ছোট একটি ফিঙ্গারপ্রিন্ট URL এ রাখা হয়; সিক্রেট বদলালে URL ও বদলায়।
+    """
+    url = f"{base_url.rstrip('/')}/{token}"
+    if WEBHOOK_SECRET:
+        url += "?v=" + hashlib.sha256(WEBHOOK_SECRET.encode()).hexdigest()[:8]
+    return url
+
+
+def _call(token, method, **params):
+    response = requests.post(f"{TELEGRAM_API_URL}/bot{token}/{method}", json=params, timeout=API_TIMEOUT)
+    data = response.json()
+    if not data.get("ok"):
+        raise RuntimeError(f"{method}: {data.get('description', response.status_code)}")
+    return data.get("result")
+
+
+def sync_webhook(token, url, max_connections=None, allowed_updates=None):
+    """
+    বর্তমান ওয়েব হুক দেখে শুধু পার্থক্য থাকলেই setWebhook কল করে।
+    ফলাফল: "unchanged", "updated" অথবা ত্রুটির বার্তা।
+    """
+    max_connections = max_connections or MAX_CONNECTIONS
+    allowed_updates = ALLOWED_UPDATES if allowed_updates is None else allowed_updates
+
+    info = _call(token, "getWebhookInfo")
+    if (
+        info.get("url") == url
+        and info.get("max_connections") == max_connections
+        and sorted(info.get("allowed_updates") or []) == sorted(allowed_updates)
+    ):
+        return "unchanged"
+
+    params = {"url": url, "max_connections": max_connections, "allowed_updates": allowed_updates}
+    if WEBHOOK_SECRET:
+        params["secret_token"] = WEBHOOK_SECRET
+    _call(token, "setWebhook", **params)
+    return "updated"
+
+
+def sync_webhooks(base_url, bots):
+    """
+    সব বটের ওয়েব হুক একসাথে (প্যারালালে) যাচাই ও সেট করে, যাতে বুট হতে
+    বট সংখ্যার সমান নয়, মোটামুটি একটি রাউন্ড-ট্রিপের সময় লাগে।
+    bots: registry.BotSpec এর তালিকা (টোকেন আছে এমন)
+    """
+    if not bots:
+        return {}
+
+    def run(bot):
+        try:
+            return sync_webhook(bot.token, webhook_url(base_url, bot.token), bot.max_connections, bot.allowed_updates)
+        except Exception as e:
+            return f"failed ({e})"
+
+    with ThreadPoolExecutor(max_workers=len(bots)) as pool:
+        results = dict(zip((bot.name for bot in bots), pool.map(run, bots)))
+
+    for name, result in results.items():
+        icon = "❌" if result.startswith("failed") else "✅"
+        print(f"{icon} Webhook {result}: {name}")
+    return results
@@ -0,0 +1,6 @@
+# প্রোডাকশন এন্ট্রি পয়েন্ট: gunicorn -c gunicorn.conf.py
+# preload_app=True থাকায় এই ফাইল মাস্টার প্রসেসে একবারই ইমপোর্ট হয়,
+# তাই বট প্রসেস ও তাদের কিউ একবারই তৈরি হয় এবং সব ওয়েব ওয়ার্কার সেগুলো শেয়ার করে।
+from app import app, boot
+
+boot()